@@ -0,0 +1,34 @@
+from urllib.parse import urlsplit
+
+from cyberspace.transport import Transport
+
+
+class RoutingTransport(Transport):
+	"""
+	a transport that sends every request to a StandInServer instead of the host in its url,
+	while rate limits, circuits and metrics are still kept per original host
+	"""
+	def __init__(self, base_url, **kwargs):
+		"""
+		:param str base_url: the base url of the stand-in server, e.g., http://127.0.0.1:8000
+		:param kwargs: the arguments of Transport
+		"""
+		self._base_url = base_url.rstrip('/')
+		super().__init__(**kwargs)
+
+	_STATE_ATTRIBUTES_ = Transport._STATE_ATTRIBUTES_ + ['_base_url']
+
+	def __repr__(self):
+		return f'<RoutingTransport to {self._base_url}>'
+
+	def get_local_url(self, url):
+		"""
+		:type url: str
+		:rtype: str
+		"""
+		parts = urlsplit(url)
+		query = f'?{parts.query}' if parts.query else ''
+		return f'{self._base_url}/{parts.netloc.lower()}{parts.path or "/"}{query}'
+
+	def _send(self, url, params, headers, verify, **kwargs):
+		return super()._send(url=self.get_local_url(url), params=params, headers=headers, verify=verify, **kwargs)
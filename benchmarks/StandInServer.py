@@ -0,0 +1,182 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl, unquote
+import threading
+import socket
+import random
+import json
+import time
+
+from cyberspace.transport import Archive
+
+from .SyntheticWiki import SyntheticWiki
+
+
+class StandInServer:
+	"""
+	a local http server that stands in for wikipedia, bing and any other site:
+	a request for http://127.0.0.1:<port>/<host>/<path> is answered as https://<host>/<path> would be,
+	from an archive of recorded responses if it has the request and from a synthetic wiki otherwise,
+	after a latency and with errors at a given rate
+	"""
+	def __init__(self, wiki=None, archive=None, latency=0.0, error_rate=0.0, error_status=503, seed=0, port=0):
+		"""
+		:param SyntheticWiki or NoneType wiki: a synthetic wiki of 1000 articles is used if not provided
+		:param cyberspace.transport.Archive or str or NoneType archive: recorded responses, e.g., of an ArchiveTransport
+		:param float or tuple[float, float] latency: seconds before each answer, or the range it is uniformly drawn from
+		:param float error_rate: fraction of requests answered with error_status instead
+		:param int error_status: status code of the errors, 503 and 429 are retried by the transport
+		:param int seed: seed of the latencies and errors
+		:param int port: 0 picks a free port
+		"""
+		self._wiki = wiki or SyntheticWiki()
+		self._archive = Archive(path=archive) if isinstance(archive, str) else archive
+		self._latency = latency
+		self._error_rate = error_rate
+		self._error_status = error_status
+		self._random = random.Random(seed)
+		self._port = port
+		self._server = None
+		self._thread = None
+		self._lock = threading.Lock()
+		self._statistics = {'requests': 0, 'errors': 0, 'archived': 0, 'synthetic': 0, 'not_found': 0}
+
+	def __enter__(self):
+		self.start()
+		return self
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.stop()
+
+	def __repr__(self):
+		return f'<StandInServer {self.base_url} latency={self._latency} error_rate={self._error_rate}>'
+
+	@property
+	def wiki(self):
+		"""
+		:rtype: SyntheticWiki
+		"""
+		return self._wiki
+
+	@property
+	def base_url(self):
+		"""
+		:rtype: str or NoneType
+		"""
+		if self._server is None:
+			return None
+		host, port = self._server.server_address[:2]
+		return f'http://{host}:{port}'
+
+	@property
+	def statistics(self):
+		"""
+		:rtype: dict[str, int]
+		"""
+		with self._lock:
+			return dict(self._statistics)
+
+	def _count(self, name):
+		with self._lock:
+			self._statistics[name] += 1
+
+	def _draw(self):
+		with self._lock:
+			if isinstance(self._latency, (tuple, list)):
+				latency = self._random.uniform(*self._latency)
+			else:
+				latency = self._latency
+			return latency, self._random.random() < self._error_rate
+
+	def answer(self, url):
+		"""
+		the status code, content type and body that the stand-in answers to a get request for url
+		:param str url: the url the client asked for, e.g., https://en.wikipedia.org/w/api.php?action=query
+		:rtype: tuple[int, str, bytes]
+		"""
+		if self._archive is not None:
+			entry = self._archive.get(self._archive.get_key(url=url))
+			if entry is not None:
+				self._count('archived')
+				record, _ = entry
+				return record.status_code, record.headers.get('Content-Type', 'text/html'), record.content
+
+		parts = urlsplit(url)
+		host = (parts.hostname or '').lower()
+		parameters = dict(parse_qsl(parts.query, keep_blank_values=True))
+		path = unquote(parts.path)
+		wiki = self._wiki
+
+		if host == wiki.host and path == '/w/api.php':
+			self._count('synthetic')
+			body = json.dumps(wiki.answer_api(parameters=parameters))
+			return 200, 'application/json; charset=utf-8', body.encode()
+
+		if host == wiki.host and path.startswith('/wiki/'):
+			index = wiki.get_index(title=path[len('/wiki/'):])
+			if index is not None:
+				self._count('synthetic')
+				return 200, 'text/html; charset=UTF-8', wiki.get_article_html(index=index).encode()
+
+		if host.endswith('bing.com') and path == '/search':
+			self._count('synthetic')
+			return 200, 'text/html; charset=utf-8', wiki.get_bing_html(query=parameters.get('q', '')).encode()
+
+		if path.startswith('/article/') and path[len('/article/'):].isdigit():
+			index = int(path[len('/article/'):]) % wiki.num_pages
+			self._count('synthetic')
+			return 200, 'text/html; charset=UTF-8', wiki.get_article_html(index=index).encode()
+
+		self._count('not_found')
+		return 404, 'text/html', b'<html><body>Not Found</body></html>'
+
+	def _make_handler(self):
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = 'HTTP/1.1'
+
+			def setup(self):
+				super().setup()
+				# headers and body are written separately, which nagle and delayed acks would hold back
+				self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+			def do_GET(self):
+				server._count('requests')
+				latency, is_error = server._draw()
+				if latency:
+					time.sleep(latency)
+				host, _, path = self.path.lstrip('/').partition('/')
+				if is_error:
+					server._count('errors')
+					status, content_type, body = server._error_status, 'text/html', b'<html><body>Error</body></html>'
+				else:
+					status, content_type, body = server.answer(url=f'https://{host}/{path}')
+				self.send_response(status)
+				self.send_header('Content-Type', content_type)
+				self.send_header('Content-Length', str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, format, *args):
+				pass
+
+		return Handler
+
+	def start(self):
+		"""
+		serves in a background thread
+		:rtype: StandInServer
+		"""
+		if self._server is None:
+			self._server = ThreadingHTTPServer(('127.0.0.1', self._port), self._make_handler())
+			self._server.daemon_threads = True
+			self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+			self._thread.start()
+		return self
+
+	def stop(self):
+		if self._server is not None:
+			self._server.shutdown()
+			self._server.server_close()
+			self._server = None
+			self._thread = None
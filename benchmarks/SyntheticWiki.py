@@ -0,0 +1,409 @@
+from urllib.parse import quote, unquote
+import random
+import zlib
+import json
+
+
+_WORDS = (
+	'data', 'science', 'model', 'river', 'history', 'city', 'theory', 'music', 'language', 'system', 'network',
+	'energy', 'species', 'market', 'century', 'region', 'culture', 'method', 'structure', 'population', 'signal',
+	'process', 'image', 'protein', 'empire', 'island', 'engine', 'election', 'planet', 'festival'
+)
+
+
+class SyntheticWiki:
+	"""
+	a deterministic made-up wikipedia of num_pages articles, each linking to links_per_page others,
+	that answers the api.php queries of Wikipedia and serves the html of its articles
+	"""
+	EXTRACT_LIMIT = 20
+	LIST_LIMIT = 500
+
+	def __init__(
+			self, num_pages=1000, links_per_page=20, paragraphs_per_page=20, categories_per_page=3, language='en',
+			seed=0
+	):
+		"""
+		:param int num_pages: number of articles, titled 'Page 0' to 'Page <num_pages - 1>' with ids from 1
+		:param int links_per_page: links from each article to other articles
+		:param int paragraphs_per_page: paragraphs in each article, about 600 characters each
+		:param int categories_per_page: categories of each article, out of num_pages / 10
+		:param str language: the language, and subdomain, of the wiki
+		:param int seed: a different seed makes a different wiki of the same size
+		"""
+		self._num_pages = num_pages
+		self._links_per_page = min(links_per_page, num_pages - 1)
+		self._paragraphs_per_page = paragraphs_per_page
+		self._categories_per_page = categories_per_page
+		self._num_categories = max(1, num_pages // 10)
+		self._language = language
+		self._seed = seed
+
+	def __repr__(self):
+		return f'<SyntheticWiki {self.host} num_pages={self._num_pages}>'
+
+	@property
+	def num_pages(self):
+		return self._num_pages
+
+	@property
+	def host(self):
+		return f'{self._language}.wikipedia.org'
+
+	@staticmethod
+	def get_title(index):
+		"""
+		:type index: int
+		:rtype: str
+		"""
+		return f'Page {index}'
+
+	@staticmethod
+	def get_id(index):
+		"""
+		:type index: int
+		:rtype: int
+		"""
+		return index + 1
+
+	def get_url(self, index):
+		"""
+		:type index: int
+		:rtype: str
+		"""
+		return f'https://{self.host}/wiki/{quote(self.get_title(index).replace(" ", "_"))}'
+
+	def _get_random(self, index, purpose):
+		return random.Random(f'{self._seed}/{purpose}/{index}')
+
+	def get_links(self, index):
+		"""
+		indexes of the articles that an article links to
+		:type index: int
+		:rtype: list[int]
+		"""
+		others = self._get_random(index, 'links').sample(range(self._num_pages - 1), self._links_per_page)
+		return [other if other < index else other + 1 for other in others]
+
+	def get_categories(self, index):
+		"""
+		:type index: int
+		:rtype: list[str]
+		"""
+		random_generator = self._get_random(index, 'categories')
+		count = min(self._categories_per_page, self._num_categories)
+		return [f'Category {number}' for number in sorted(random_generator.sample(range(self._num_categories), count))]
+
+	def get_index(self, id=None, title=None):
+		"""
+		:type id: int or str or NoneType
+		:type title: str or NoneType
+		:rtype: int or NoneType
+		"""
+		if id is not None:
+			index = int(id) - 1
+		elif title is not None:
+			title = unquote(title).replace('_', ' ').strip()
+			if not title.startswith('Page ') or not title[5:].isdigit():
+				return None
+			index = int(title[5:])
+		else:
+			return None
+		return index if 0 <= index < self._num_pages else None
+
+	def _get_sentence(self, random_generator, length=12):
+		words = [random_generator.choice(_WORDS) for _ in range(length)]
+		return ' '.join(words).capitalize() + '.'
+
+	def get_paragraphs(self, index):
+		"""
+		the plain text of the paragraphs of an article
+		:type index: int
+		:rtype: list[str]
+		"""
+		random_generator = self._get_random(index, 'text')
+		return [
+			' '.join(self._get_sentence(random_generator) for _ in range(8))
+			for _ in range(self._paragraphs_per_page)
+		]
+
+	def get_extract(self, index, intro_only=False):
+		"""
+		:type index: int
+		:param bool intro_only: only the first paragraph
+		:rtype: str
+		"""
+		paragraphs = self.get_paragraphs(index)
+		return paragraphs[0] if intro_only else '\n'.join(paragraphs)
+
+	def _get_link_html(self, index):
+		title = self.get_title(index)
+		return f'<a href="/wiki/{quote(title.replace(" ", "_"))}" title="{title}">{title}</a>'
+
+	def get_body_html(self, index):
+		"""
+		the content of an article as the parser of mediawiki renders it
+		:type index: int
+		:rtype: str
+		"""
+		links = self.get_links(index)
+		paragraphs = []
+		for number, text in enumerate(self.get_paragraphs(index)):
+			link = links[number % len(links)] if links else None
+			link_html = f' See {self._get_link_html(link)}.' if link is not None else ''
+			paragraphs.append(f'<p>{text}{link_html}</p>')
+		items = ''.join(
+			f'<li>{self._get_link_html(link)} {self._get_sentence(self._get_random(link, "item"), 5)}</li>'
+			for link in links
+		)
+		title = self.get_title(index)
+		info_box = (
+			f'<table class="infobox"><tbody><tr><th colspan="2">{title}</th></tr>'
+			f'<tr><th scope="row">Identifier</th><td>{self.get_id(index)}</td></tr></tbody></table>'
+		)
+		return (
+			f'<div class="mw-parser-output">{info_box}{"".join(paragraphs[:2])}'
+			f'<h2><span class="mw-headline" id="Related">Related</span></h2><ul>{items}</ul>'
+			f'{"".join(paragraphs[2:])}</div>'
+		)
+
+	def get_article_html(self, index):
+		"""
+		the whole html page of an article
+		:type index: int
+		:rtype: str
+		"""
+		title = self.get_title(index)
+		configuration = json.dumps({
+			'wgArticleId': self.get_id(index), 'wgTitle': title, 'wgPageContentLanguage': self._language,
+			'wgNamespaceNumber': 0, 'wgRevisionId': self.get_revision_id(index)
+		})
+		categories = ''.join(
+			f'<li><a href="/wiki/Category:{quote(category.replace(" ", "_"))}" title="Category:{category}">'
+			f'{category}</a></li>'
+			for category in self.get_categories(index)
+		)
+		return (
+			f'<!DOCTYPE html><html lang="{self._language}"><head><title>{title} - Wikipedia</title>'
+			f'<script>RLCONF={configuration};</script></head><body>'
+			f'<div role="navigation" id="mw-navigation"><a href="/wiki/Main_Page">Main page</a></div>'
+			f'<h1 id="firstHeading">{title}</h1><div id="bodyContent"><div id="mw-content-text">'
+			f'{self.get_body_html(index)}</div></div>'
+			f'<div id="catlinks" class="catlinks"><ul>{categories}</ul></div></body></html>'
+		)
+
+	def get_revision_id(self, index):
+		"""
+		:type index: int
+		:rtype: int
+		"""
+		return 1000000 + self._seed * self._num_pages + index
+
+	def get_search_results(self, query, limit=10, offset=0):
+		"""
+		indexes of the articles that match query, the same every time
+		:type query: str
+		:type limit: int
+		:type offset: int
+		:rtype: list[int]
+		"""
+		start = zlib.crc32(query.lower().encode()) % self._num_pages
+		total = min(self._num_pages, 100)
+		return [(start + position) % self._num_pages for position in range(offset, min(offset + limit, total))]
+
+	def _get_page_result(self, index, parameters, properties):
+		page = {'pageid': self.get_id(index), 'ns': 0, 'title': self.get_title(index)}
+		if 'info' in properties:
+			page.update({
+				'contentmodel': 'wikitext', 'pagelanguage': self._language, 'pagelanguagedir': 'ltr',
+				'lastrevid': self.get_revision_id(index), 'length': len(self.get_extract(index))
+			})
+			if 'url' in parameters.get('inprop', ''):
+				page.update({'fullurl': self.get_url(index), 'canonicalurl': self.get_url(index)})
+		if 'revisions' in properties:
+			revision = {'revid': self.get_revision_id(index), 'parentid': self.get_revision_id(index) - 1}
+			if 'content' in parameters.get('rvprop', '') and 'rvparse' in parameters:
+				revision['*'] = self.get_body_html(index)
+			page['revisions'] = [revision]
+		if 'extracts' in properties:
+			page['extract'] = self.get_extract(index, intro_only='exintro' in parameters)
+		return page
+
+	def _get_missing_result(self, title, parameters, properties):
+		page = {'ns': 0, 'title': title, 'missing': ''}
+		if 'info' in properties:
+			page['pagelanguage'] = self._language
+			if 'url' in parameters.get('inprop', ''):
+				url = f'https://{self.host}/wiki/{quote(title.replace(" ", "_"))}'
+				page.update({'fullurl': url, 'canonicalurl': url})
+		return page
+
+	def _answer_parse(self, parameters):
+		redirects = []
+		if 'pageid' in parameters:
+			index = self.get_index(id=parameters['pageid'])
+			if index is None:
+				return {'error': {'code': 'nosuchpageid', 'info': f'There is no page with ID {parameters["pageid"]}.'}}
+		else:
+			title = unquote(parameters.get('page', '')).replace('_', ' ').strip()
+			title = title[:1].upper() + title[1:]
+			if title.startswith('Redirect ') and 'redirects' in parameters:
+				redirects.append({'from': title, 'to': f'Page {title[len("Redirect "):]}'})
+				title = redirects[0]['to']
+			index = self.get_index(title=title)
+			if index is None:
+				return {'error': {'code': 'missingtitle', 'info': "The page you specified doesn't exist."}}
+
+		properties = set(parameters.get('prop', 'text').split('|'))
+		title = self.get_title(index)
+		result = {'title': title, 'pageid': self.get_id(index), 'redirects': redirects}
+		if 'revid' in properties:
+			result['revid'] = self.get_revision_id(index)
+		if 'text' in properties:
+			result['text'] = {'*': self.get_body_html(index)}
+		if 'categories' in properties:
+			result['categories'] = [
+				{'sortkey': '', '*': category.replace(' ', '_')} for category in self.get_categories(index)
+			]
+		if 'properties' in properties:
+			result['properties'] = [{'name': 'wikibase_item', '*': f'Q{self.get_id(index)}'}]
+		if 'displaytitle' in properties:
+			result['displaytitle'] = title
+		return {'parse': result}
+
+	def answer_api(self, parameters):
+		"""
+		what api.php answers to a query
+		:param dict[str, str] parameters: the query parameters
+		:rtype: dict
+		"""
+		action = parameters.get('action', 'query')
+		if action == 'parse':
+			return self._answer_parse(parameters=parameters)
+		if action != 'query':
+			info = f'Unrecognized value for parameter "action": {action}.'
+			return {'error': {'code': 'unknown_action', 'info': info}}
+
+		if parameters.get('list') == 'search':
+			limit = int(parameters.get('srlimit', 10))
+			offset = int(parameters.get('sroffset', 0))
+			indexes = self.get_search_results(query=parameters.get('srsearch', ''), limit=limit, offset=offset)
+			results = [{'ns': 0, 'title': self.get_title(index), 'pageid': self.get_id(index)} for index in indexes]
+			result = {'query': {'search': results}}
+			if indexes and offset + limit < min(self._num_pages, 100):
+				result['continue'] = {'sroffset': offset + limit, 'continue': '-||'}
+			return result
+
+		properties = set(parameters.get('prop', '').split('|'))
+		query = {}
+		found = []
+		pages = {}
+		generator_continue = None
+		if parameters.get('generator') == 'search':
+			limit = int(parameters.get('gsrlimit', 10))
+			offset = int(parameters.get('gsroffset', 0))
+			found = self.get_search_results(query=parameters.get('gsrsearch', ''), limit=limit, offset=offset)
+			if found and offset + limit < min(self._num_pages, 100):
+				generator_continue = {'gsroffset': offset + limit, 'continue': 'gsroffset||'}
+		elif 'pageids' in parameters:
+			for id in parameters['pageids'].split('|'):
+				index = self.get_index(id=id)
+				if index is None:
+					pages[id] = {'pageid': int(id), 'missing': ''}
+				else:
+					found.append(index)
+		elif 'titles' in parameters:
+			for title in parameters['titles'].split('|'):
+				normalized = unquote(title).replace('_', ' ').strip()
+				normalized = normalized[:1].upper() + normalized[1:]
+				if normalized != title:
+					query.setdefault('normalized', []).append({'from': title, 'to': normalized})
+				if normalized.startswith('Redirect ') and 'redirects' in parameters:
+					target = self.get_index(title=f'Page {normalized[len("Redirect "):]}')
+					if target is not None:
+						query.setdefault('redirects', []).append({'from': normalized, 'to': self.get_title(target)})
+						found.append(target)
+						continue
+				index = self.get_index(title=normalized)
+				if index is None:
+					pages[str(-1 - len(pages))] = self._get_missing_result(
+						title=normalized, parameters=parameters, properties=properties
+					)
+				else:
+					found.append(index)
+		else:
+			return {'batchcomplete': ''}
+
+		# a page that is asked for twice, e.g., by its title and by a redirect, comes once
+		found = list(dict.fromkeys(found))
+
+		# like the api, intro extracts come at most EXTRACT_LIMIT pages at a time and the rest continue
+		offset = int(parameters.get('excontinue', 0))
+		# a continuation only has the properties that are not complete yet
+		continue_names = [name for name in ('excontinue', 'plcontinue', 'clcontinue') if name in parameters]
+		if continue_names:
+			properties = {
+				name for name in properties
+				if {'extracts': 'excontinue', 'links': 'plcontinue', 'categories': 'clcontinue'}.get(name) in
+				continue_names + [None]
+			}
+		result = {}
+		for position, index in enumerate(found):
+			with_extract = offset <= position < offset + self.EXTRACT_LIMIT
+			page = self._get_page_result(
+				index=index, parameters=parameters, properties=properties if with_extract else properties - {'extracts'}
+			)
+			if 'generator' in parameters:
+				page['index'] = int(parameters.get('gsroffset', 0)) + position + 1
+			pages[str(self.get_id(index))] = page
+
+		property_continue = {}
+		if 'extracts' in properties and len(found) > offset + self.EXTRACT_LIMIT:
+			property_continue['excontinue'] = offset + self.EXTRACT_LIMIT
+		# like the api, links and categories come at most LIST_LIMIT at a time for all the pages together
+		for name, continue_name, get_titles in (
+			('links', 'plcontinue', lambda index: [self.get_title(link) for link in self.get_links(index)]),
+			('categories', 'clcontinue', lambda index: [f'Category:{name}' for name in self.get_categories(index)])
+		):
+			if name not in properties:
+				continue
+			items = [(index, title) for index in found for title in get_titles(index)]
+			start = int(parameters.get(continue_name, 0))
+			for index, title in items[start:start + self.LIST_LIMIT]:
+				page = pages[str(self.get_id(index))]
+				page.setdefault(name, []).append({'ns': 14 if name == 'categories' else 0, 'title': title})
+			if len(items) > start + self.LIST_LIMIT:
+				property_continue[continue_name] = start + self.LIST_LIMIT
+
+		if property_continue:
+			# the generator stays on the same results until their properties are complete
+			result['continue'] = {**property_continue, 'continue': '||'}
+			if generator_continue is not None:
+				result['continue'].update({'gsroffset': parameters.get('gsroffset', 0), 'continue': 'gsroffset||'})
+		else:
+			result['batchcomplete'] = ''
+			if generator_continue is not None:
+				result['continue'] = generator_continue
+		query['pages'] = pages
+		result['query'] = query
+		return result
+
+	def get_bing_html(self, query):
+		"""
+		a bing search result page whose results are articles of the wiki and a few other sites
+		:type query: str
+		:rtype: str
+		"""
+		results = []
+		for index in self.get_search_results(query=query, limit=10):
+			results.append(
+				f'<li class="b_algo"><h2><a href="{self.get_url(index)}">{self.get_title(index)} - Wikipedia</a></h2>'
+				f'<p>{self.get_extract(index, intro_only=True)[:160]}</p></li>'
+			)
+			results.append(
+				f'<li class="b_algo"><h2><a href="https://example.org/article/{index}">{self.get_title(index)}</a></h2></li>'
+			)
+		return (
+			f'<!DOCTYPE html><html><head><title>{query} - Search</title></head>'
+			f'<body><ol id="b_results">{"".join(results)}</ol></body></html>'
+		)
@@ -0,0 +1,4 @@
+from .SyntheticWiki import SyntheticWiki
+from .StandInServer import StandInServer
+from .RoutingTransport import RoutingTransport
+from .run_benchmarks import run_benchmarks, run_scenario, compare_reports, SCENARIOS
@@ -0,0 +1,42 @@
+from argparse import ArgumentParser
+from pandas import read_json
+import pandas
+
+from .run_benchmarks import run_benchmarks, compare_reports, SCENARIOS
+
+
+def main(arguments=None):
+	"""
+	python -m benchmarks --concurrency 1 4 16 --operations 40 --latency 0.02 --output report.json --baseline old.json
+	"""
+	parser = ArgumentParser(description='measures the throughput of the clients against a local stand-in server')
+	parser.add_argument('--scenarios', nargs='*', choices=list(SCENARIOS), default=None)
+	parser.add_argument('--concurrency', nargs='*', type=int, default=[1, 4, 16])
+	parser.add_argument('--operations', type=int, default=40, help='operations per scenario and concurrency level')
+	parser.add_argument('--latency', type=float, default=0.02, help='seconds the stand-in server takes to answer')
+	parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+	parser.add_argument('--pages', type=int, default=1000, help='number of articles of the synthetic wiki')
+	parser.add_argument('--archive', default=None, help='recorded responses served before the synthetic ones')
+	parser.add_argument('--output', default=None, help='json file the report is written to')
+	parser.add_argument('--baseline', default=None, help='json report of an earlier run to compare with')
+	parser.add_argument('--no-isolate', action='store_true', help='run every scenario in this process')
+	parsed = parser.parse_args(arguments)
+
+	report = run_benchmarks(
+		scenarios=parsed.scenarios, concurrency_levels=tuple(parsed.concurrency), num_operations=parsed.operations,
+		latency=parsed.latency, error_rate=parsed.error_rate, wiki_options={'num_pages': parsed.pages},
+		archive=parsed.archive, isolate=not parsed.no_isolate
+	)
+	with pandas.option_context('display.width', 200, 'display.max_columns', 20):
+		print(report.drop(columns=['first_error']))
+		if parsed.output:
+			report.to_json(parsed.output, orient='records', indent=1)
+		if parsed.baseline:
+			comparison = compare_reports(report=report, baseline=read_json(parsed.baseline, orient='records'))
+			print(comparison)
+			if comparison['regressed'].any():
+				raise SystemExit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,218 @@
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import resource
+import sys
+import time
+
+from pandas import DataFrame
+
+from cyberspace.transport import RateLimiter, CircuitBreaker, Metrics
+
+from .SyntheticWiki import SyntheticWiki
+from .StandInServer import StandInServer
+from .RoutingTransport import RoutingTransport
+
+
+def _get_page(clients, wiki, index):
+	page = clients['wikipedia'].get_page(title=wiki.get_title(index))
+	page['paragraphs']
+	page['categories']
+	return 1
+
+
+def _get_pages(clients, wiki, index):
+	indexes = [(index * 50 + offset) % wiki.num_pages for offset in range(50)]
+	pages = clients['wikipedia'].get_pages(ids=[wiki.get_id(index) for index in indexes])
+	for page in pages:
+		page['summary']
+	return len(pages)
+
+
+def _search(clients, wiki, index):
+	pages = clients['wikipedia'].search(query=f'query {index}', num_results=10, batch=True)
+	for page in pages:
+		page['url']
+	return len(pages)
+
+
+def _get_page_graph(clients, wiki, index):
+	graph = clients['wikipedia'].get_page_graph(title=wiki.get_title(index), max_depth=1, echo=0)
+	return len(graph.nodes)
+
+
+def _get_page_graph_from_api(clients, wiki, index):
+	graph = clients['wikipedia'].get_page_graph(title=wiki.get_title(index), max_depth=1, echo=0, source='api')
+	return len(graph.nodes)
+
+
+def _get_soup(clients, wiki, index):
+	clients['scraper'].get_soup(url=f'https://example.org/article/{index}')
+	return 1
+
+
+def _search_bing(clients, wiki, index):
+	clients['search_engine'].search_bing(query=f'query {index}')['wikipedia_links']
+	return 1
+
+
+SCENARIOS = {
+	'wikipedia.get_page': _get_page,
+	'wikipedia.get_pages': _get_pages,
+	'wikipedia.search': _search,
+	'wikipedia.get_page_graph': _get_page_graph,
+	'wikipedia.get_page_graph.api': _get_page_graph_from_api,
+	'scraper.get_soup': _get_soup,
+	'search_engine.search_bing': _search_bing
+}
+
+
+def _make_clients(base_url, concurrency):
+	from cyberspace.wikipedia import Wikipedia
+	from cyberspace.Scraper import Scraper
+	from cyberspace.search.SearchEngine import SearchEngine
+
+	# a transport of its own so that neither limits nor circuits nor metrics leak between runs
+	transport = RoutingTransport(
+		base_url=base_url, pool_connections=8, pool_maxsize=max(16, concurrency), rate_limiter=RateLimiter(),
+		circuit_breaker=CircuitBreaker(), metrics=Metrics()
+	)
+	return transport, {
+		'wikipedia': Wikipedia(cache=False, transport=transport, rate_limit_wait_seconds=None),
+		'scraper': Scraper(name='benchmark', cache=False, transport=transport, rate_limit_wait_seconds=None),
+		'search_engine': SearchEngine(cache=False, transport=transport, rate_limit_wait_seconds=None)
+	}
+
+
+def _get_percentile(values, percentile):
+	if not values:
+		return None
+	values = sorted(values)
+	return values[min(len(values) - 1, int(len(values) * percentile / 100))]
+
+
+def _get_peak_rss_mb():
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# kilobytes on linux, bytes on macos
+	return peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+
+
+def run_scenario(scenario, base_url, concurrency, num_operations, wiki_options=None, offset=0):
+	"""
+	runs num_operations operations of a scenario, concurrency at a time, against a stand-in server
+	:param str scenario: one of the names in SCENARIOS
+	:param str base_url: the base url of a running StandInServer
+	:param int concurrency: number of operations run at the same time
+	:param int num_operations: number of operations, each on a different article
+	:param dict or NoneType wiki_options: the arguments of the SyntheticWiki of the server
+	:param int offset: index of the first article
+	:rtype: dict
+	"""
+	wiki = SyntheticWiki(**(wiki_options or {}))
+	function = SCENARIOS[scenario]
+	transport, clients = _make_clients(base_url=base_url, concurrency=concurrency)
+	latencies = []
+	errors = []
+
+	def _run(index):
+		start = time.perf_counter()
+		try:
+			pages = function(clients=clients, wiki=wiki, index=index % wiki.num_pages)
+		except Exception as error:
+			errors.append(f'{error.__class__.__name__}: {error}')
+			return 0
+		latencies.append(time.perf_counter() - start)
+		return pages
+
+	start = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=concurrency) as executor:
+		num_pages = sum(executor.map(_run, range(offset, offset + num_operations)))
+	seconds = time.perf_counter() - start
+
+	http = transport.metrics.get_host_statistics()
+	transport.close()
+	return {
+		'scenario': scenario, 'concurrency': concurrency, 'operations': num_operations, 'errors': len(errors),
+		'pages': num_pages, 'seconds': seconds, 'pages_per_second': num_pages / seconds if seconds else None,
+		'latency_p50_ms': _to_ms(_get_percentile(latencies, 50)),
+		'latency_p95_ms': _to_ms(_get_percentile(latencies, 95)),
+		'latency_p99_ms': _to_ms(_get_percentile(latencies, 99)),
+		'http_requests': sum(host['requests'] for host in http.values()),
+		'http_retries': sum(host['retries'] for host in http.values()),
+		'http_bytes': sum(host['bytes'] for host in http.values()),
+		'peak_rss_mb': _get_peak_rss_mb(),
+		'first_error': errors[0] if errors else None
+	}
+
+
+def _to_ms(seconds):
+	return None if seconds is None else seconds * 1000
+
+
+def _run_scenario_in_process(queue, kwargs):
+	try:
+		queue.put(run_scenario(**kwargs))
+	except Exception as error:
+		queue.put({'scenario': kwargs['scenario'], 'concurrency': kwargs['concurrency'], 'first_error': repr(error)})
+
+
+def run_benchmarks(
+		scenarios=None, concurrency_levels=(1, 4, 16), num_operations=40, latency=0.02, error_rate=0.0,
+		wiki_options=None, archive=None, isolate=True, echo=1
+):
+	"""
+	runs every scenario at every concurrency level against a local stand-in server
+	:param list[str] or NoneType scenarios: names in SCENARIOS, all of them if not provided
+	:param tuple[int] concurrency_levels: numbers of operations run at the same time
+	:param int num_operations: operations per scenario and concurrency level
+	:param float or tuple[float, float] latency: seconds the stand-in server takes to answer
+	:param float error_rate: fraction of requests the stand-in server answers with 503
+	:param dict or NoneType wiki_options: the arguments of the SyntheticWiki, e.g., {'num_pages': 5000}
+	:param cyberspace.transport.Archive or str or NoneType archive: recorded responses served before synthetic ones
+	:param bool isolate: run each scenario in a new process so that its peak memory is its own
+	:param int echo: prints each result if 1 or more
+	:rtype: DataFrame
+	"""
+	scenarios = scenarios or list(SCENARIOS)
+	wiki = SyntheticWiki(**(wiki_options or {}))
+	rows = []
+	with StandInServer(wiki=wiki, archive=archive, latency=latency, error_rate=error_rate) as server:
+		context = multiprocessing.get_context('spawn')
+		for scenario in scenarios:
+			for number, concurrency in enumerate(concurrency_levels):
+				kwargs = {
+					'scenario': scenario, 'base_url': server.base_url, 'concurrency': concurrency,
+					'num_operations': num_operations, 'wiki_options': wiki_options,
+					'offset': number * num_operations
+				}
+				if isolate:
+					queue = context.Queue()
+					process = context.Process(target=_run_scenario_in_process, args=(queue, kwargs))
+					process.start()
+					row = queue.get()
+					process.join()
+				else:
+					row = run_scenario(**kwargs)
+				rows.append(row)
+				if echo:
+					print(
+						f'{scenario} x{concurrency}: {row.get("pages_per_second") or 0:.1f} pages/s, '
+						f'p95 {row.get("latency_p95_ms") or 0:.0f} ms, {row.get("errors")} errors'
+					)
+	return DataFrame(rows)
+
+
+def compare_reports(report, baseline, tolerance=0.1):
+	"""
+	puts a report next to a baseline report, a scenario regressed if its throughput dropped or its p95 latency
+	rose by more than tolerance
+	:type report: DataFrame
+	:type baseline: DataFrame
+	:param float tolerance: relative change that is not a regression
+	:rtype: DataFrame
+	"""
+	columns = ['scenario', 'concurrency', 'pages_per_second', 'latency_p95_ms', 'peak_rss_mb']
+	data = report[columns].merge(baseline[columns], on=['scenario', 'concurrency'], suffixes=('', '_baseline'))
+	data['throughput_change'] = data['pages_per_second'] / data['pages_per_second_baseline'] - 1
+	data['p95_change'] = data['latency_p95_ms'] / data['latency_p95_ms_baseline'] - 1
+	data['regressed'] = (data['throughput_change'] < -tolerance) | (data['p95_change'] > tolerance)
+	return data
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import threading
+
+
+class AsyncRunner:
+	"""
+	runs the blocking request functions of a client in a bounded pool of threads so that they can be awaited,
+	the functions keep their cache, retry and rate limit behaviour
+	"""
+	def __init__(self, max_concurrency=32):
+		"""
+		:param int max_concurrency: maximum number of calls running at the same time, the rest wait in a queue
+		"""
+		self._max_concurrency = max_concurrency
+		self._executor = None
+		self._lock = threading.Lock()
+
+	def __getstate__(self):
+		return {'max_concurrency': self._max_concurrency}
+
+	def __setstate__(self, state):
+		self.__init__(max_concurrency=state['max_concurrency'])
+
+	@property
+	def max_concurrency(self):
+		return self._max_concurrency
+
+	@property
+	def executor(self):
+		"""
+		:rtype: ThreadPoolExecutor
+		"""
+		with self._lock:
+			if self._executor is None:
+				self._executor = ThreadPoolExecutor(
+					max_workers=self._max_concurrency, thread_name_prefix='cyberspace_async'
+				)
+			return self._executor
+
+	async def run(self, function, *args, **kwargs):
+		"""
+		:param callable function: a blocking function
+		:return: the result of function(*args, **kwargs)
+		"""
+		loop = asyncio.get_event_loop()
+		return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+	async def run_cached(self, function, **kwargs):
+		"""
+		like run but if function is a CachedFunction its cached result is returned without waiting for a free thread
+		:param callable function: a blocking function, usually a client's request function
+		"""
+		check = getattr(function, 'check', None)
+		if check is not None:
+			loop = asyncio.get_event_loop()
+			checked = await loop.run_in_executor(None, functools.partial(check, **kwargs))
+			if checked[0] == 'hit':
+				return checked[1]
+			# a miss is not read from the cache and counted a second time
+			return await self.run(function.call_after_check, checked, **kwargs)
+		return await self.run(function, **kwargs)
+
+	def shutdown(self, wait=True):
+		with self._lock:
+			if self._executor is not None:
+				self._executor.shutdown(wait=wait)
+				self._executor = None
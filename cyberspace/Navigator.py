@@ -7,20 +7,21 @@ from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.common.by import By
 from selenium.webdriver import Chrome, Firefox
 """
-import requests
-from requests.adapters import SSLError
 from bs4 import BeautifulSoup
 
 import time
 import warnings
 from chronometry import MeasurementSet
 
+from .transport import TRANSPORT
+
 
 class Navigator:
-	def __init__(self, driver=None, user_agent=None, request_method='urllib', timeout=10):
+	def __init__(self, driver=None, user_agent=None, request_method='urllib', timeout=10, transport=None):
 		"""
 		:type driver: str or ChromeDriver or FirefoxDriver or NoneType
 		:param str user_agent: the default user agent, one of random, ie, ff, chrome, etc.
+		:param cyberspace.transport.Transport or NoneType transport: the shared transport is used if not provided
 		"""
 
 		'''
@@ -44,15 +45,16 @@ class Navigator:
 
 		self._default_request_method = request_method
 		self._timeout = timeout
+		self._transport = transport or TRANSPORT
 		self._url = None
 		self._page_source = None
 		self._parsed_html = None
 		self._measurement_set = MeasurementSet()
 
-		#self.get = self._measurement_set.measure(function=self._get, name='get')
-		#self.parse_html = self._measurement_set.measure(function=self._parse_html, name='parse_html')
 		self.get = self._get
-		self.parse_html = self._parse_html
+		self.parse_html = self._measurement_set.measure(function=self._parse_html, name='parsing', unit='sec')
+		self._get_by_urllib = self._measurement_set.measure(function=self._get_by_urllib, name='loading', unit='sec')
+		self._get_by_driver = self._measurement_set.measure(function=self._get_by_driver, name='loading', unit='sec')
 
 	def __del__(self):
 		self.driver.quit()
@@ -82,31 +84,13 @@ class Navigator:
 		return self.driver.page_source
 
 	def _get_by_urllib(self, url, headers=None, json=False):
-		headers = headers or {
-			'user-agent': self._user_agent
-		}
-		request = requests.get(url=url, headers={'User-Agent': self._user_agent})
-		'''
-		request = urllib.request.Request(url)
-		
-		#for key, value in headers.items():
-			request.add_header(key=key, val=value)
-
+		headers = headers or {'User-Agent': self._user_agent}
+		# timeout bounds each attempt, the retry policy of the transport bounds the whole request
+		response = self._transport.get(url, headers=headers, timeout=self._timeout)
 		if json:
-			response = urllib.request.urlopen(request, timeout=self._timeout)
-			return load_json(response)
+			return response.json()
 		else:
-			with urllib.request.urlopen(request, timeout=self._timeout) as response:
-				html = response #.read().decode(encoding)
-			return html
-		'''
-		if format == 'json':
-			try:
-				r = requests.get(url, params=parameters, headers=headers)
-				result = r.json()
-			except SSLError as e:
-				warnings.warn(str(e))
-				result = None
+			return response.text
 
 	def _get(
 			self, url, request_method=None, element_id=None, get_json_back=False,
@@ -149,10 +133,30 @@ class Navigator:
 		self._parsed_html = BeautifulSoup(html, parser)
 		return self._parsed_html
 
+	def _get_mean_duration(self, name):
+		if name in self._measurement_set.measurements:
+			return self._measurement_set.measurements[name].mean_duration
+		else:
+			return None
+
 	@property
 	def loading_time(self):
-		return self._get_timer.get_mean_elapsed(unit='sec')
+		"""
+		mean seconds spent loading a page, None before the first page
+		:rtype: float or NoneType
+		"""
+		return self._get_mean_duration(name='loading')
 
 	@property
 	def parsing_time(self):
-		return self._parse_timer.get_mean_elapsed(unit='sec')
+		"""
+		mean seconds spent parsing a page, None before the first page
+		:rtype: float or NoneType
+		"""
+		return self._get_mean_duration(name='parsing')
+
+	def get_performance(self):
+		"""
+		:rtype: DataFrame
+		"""
+		return self._measurement_set.performance_summary
@@ -1,40 +1,57 @@
-import requests
-from requests.adapters import SSLError
-from time import sleep
-import warnings
 from bs4 import BeautifulSoup
-from disk import Cache, Path
-from chronometry import get_now, get_elapsed
+from disk import Cache
 
+from .transport import TRANSPORT, ResponseRecord, get_conditional_headers, get_canonical_url
+from .caching import make_cached, get_cache, SingleFlight
+from .fetch_many import fetch_many
+from .AsyncRunner import AsyncRunner
 
-class Scraper:
-	def __init__(self, name, expire_in=None, rate_limit_wait_seconds=0.01, cache=None, num_request_tries=4):
-		if isinstance(cache, (str, Path)):
-			cache = Cache(path=cache)
 
+class Scraper:
+	def __init__(
+			self, name, expire_in=None, rate_limit_wait_seconds=0.01, cache=None, num_request_tries=4, transport=None,
+			max_concurrency=32
+	):
+		"""
+		:type name: str
+		:param str or NoneType expire_in: if provided cached requests expire, e.g., '1 year'
+		:param float rate_limit_wait_seconds: wait between requests
+		:param str or Path or Cache or SQLiteCache or MemoryCache or NoneType cache: a path ending with .sqlite
+		selects an SQLiteCache
+		:type num_request_tries: int
+		:param cyberspace.transport.Transport or NoneType transport: the shared transport is used if not provided
+		:param int max_concurrency: maximum number of requests in flight for the async methods
+		"""
 		self._name = name
 		self._rate_limit_wait = rate_limit_wait_seconds
-		self._rate_limit_last_call = None
 		self._num_request_tries = num_request_tries
 		self._expire_in = expire_in
-		self._cache = cache
+		self._cache = get_cache(cache)
+		self._transport = transport or TRANSPORT
+		self._async_runner = AsyncRunner(max_concurrency=max_concurrency)
 		self._create_cached_functions()
 
 	def _create_cached_functions(self):
+		self._single_flight = SingleFlight()
 		if self.cache:
-			self.request = self.cache.make_cached(
+			self.request = make_cached(
+				cache=self.cache,
 				id=f'{self._name}_request',
 				function=self._request,
 				sub_directory=f'{self._name}_request',
-				expire_in=self._expire_in
+				expire_in=self._expire_in,
+				revalidate=self._revalidate,
+				single_flight=self._single_flight,
+				key_function=self._get_canonical_request
 			)
 			self.get_request_soup = self._get_request_soup
 		else:
-			self.request = self._request
+			self.request = self._single_flight.make_coalesced(function=self._request, id=f'{self._name}_request')
 			self.get_request_soup = self._get_request_soup
+		self.transport.metrics.add_cached_function(self.request, name=f'{self._name}_request')
 
 	def _get_state_attribute_names(self):
-		return ['_name', '_rate_limit_wait', '_rate_limit_last_call', '_num_request_tries', '_expire_in', '_cache']
+		return ['_name', '_rate_limit_wait', '_num_request_tries', '_expire_in', '_cache', '_transport', '_async_runner']
 
 	def __getstate__(self):
 		return {attribute_name: getattr(self, attribute_name) for attribute_name in self._get_state_attribute_names()}
@@ -51,30 +68,64 @@ class Scraper:
 		"""
 		return self._cache
 
-	def _request(self, url, verify=False):
-		error = None
-		for i in range(1, self._num_request_tries + 1):
-			try:
-				if self._rate_limit_wait and self._rate_limit_last_call:
-					wait_time = self._rate_limit_wait - get_elapsed(start=self._rate_limit_last_call, unit='s')
-					if wait_time > 0:
-						sleep(wait_time)
-				with warnings.catch_warnings():
-					warnings.simplefilter('ignore')
-					result = requests.get(url, verify=verify)
-				break
-			except SSLError as error:
-				print(f'try {i}, error with get request with url="{url}"')
-				warnings.warn(str(e))
-				sleep(0.001 * 10 ** i)
-		else:
-			print(f'failed after {self._num_request_tries} requests!')
-			raise error
+	@property
+	def single_flight(self):
+		"""
+		:rtype: SingleFlight
+		"""
+		return self._single_flight
+
+	@property
+	def transport(self):
+		"""
+		:rtype: cyberspace.transport.Transport
+		"""
+		return self._transport
+
+	@property
+	def metrics(self):
+		"""
+		http metrics of the transport and hit ratios of the cached requests
+		:rtype: cyberspace.transport.Metrics
+		"""
+		return self._transport.metrics
 
+	@property
+	def _requests_per_second(self):
 		if self._rate_limit_wait:
-			self._rate_limit_last_call = get_now()
+			return 1 / self._rate_limit_wait
+		else:
+			return None
+
+	@staticmethod
+	def _get_canonical_request(url, verify=False, headers=None):
+		return {'url': get_canonical_url(url), 'verify': verify, 'headers': headers}
+
+	def _request(self, url, verify=False, headers=None):
+		# the transport retries failed requests as its retry policy allows
+		return ResponseRecord.from_response(self.transport.get(
+			url, headers=headers, verify=verify, rate=self._requests_per_second, max_tries=self._num_request_tries
+		))
 
-		return result
+	def _revalidate(self, response, url, verify=False, headers=None):
+		"""
+		asks the server whether an expired cached response has changed and returns it if it has not
+		:type response: ResponseRecord
+		:type url: str
+		:type verify: bool
+		:param dict or NoneType headers: the headers of the original request, sent with the conditional ones
+		:rtype: ResponseRecord
+		"""
+		conditional_headers = get_conditional_headers(response=response)
+		if not conditional_headers:
+			return self._request(url=url, verify=verify, headers=headers)
+
+		headers = {**(headers or {}), **conditional_headers}
+		new_response = self._request(url=url, verify=verify, headers=headers)
+		if new_response.status_code == 304:
+			return response
+		else:
+			return new_response
 
 	def _get_request_soup(self, content, features='lxml'):
 		return BeautifulSoup(content, features)
@@ -85,3 +136,47 @@ class Scraper:
 		:rtype: BeautifulSoup
 		"""
 		return self.get_request_soup(content=self.request(url=url, verify=verify).content)
+
+	async def arequest(self, url, verify=False):
+		"""
+		:type url: str
+		:type verify: bool
+		:rtype: ResponseRecord
+		"""
+		return await self._async_runner.run_cached(self.request, url=url, verify=verify)
+
+	async def aget_soup(self, url, verify=False):
+		"""
+		:type url: str
+		:rtype: BeautifulSoup
+		"""
+		response = await self.arequest(url=url, verify=verify)
+		return self.get_request_soup(content=response.content)
+
+	def request_many(self, urls, verify=False, max_workers=8, ordered=True):
+		"""
+		requests many urls in a pool of threads, cached responses are returned right away
+		and only the urls that are not cached take up a thread
+		:type urls: iterable[str]
+		:type verify: bool
+		:param int max_workers: maximum number of requests sent at the same time
+		:param bool ordered: if True results are yielded in the order of urls, otherwise as they complete
+		:rtype: generator of tuple[str, ResponseRecord]
+		"""
+		results = fetch_many(
+			function=self.request, kwargs_list=({'url': url, 'verify': verify} for url in urls),
+			max_workers=max_workers, ordered=ordered
+		)
+		for kwargs, response in results:
+			yield kwargs['url'], response
+
+	def get_soup_many(self, urls, verify=False, max_workers=8, ordered=True):
+		"""
+		:type urls: iterable[str]
+		:type verify: bool
+		:param int max_workers: maximum number of requests sent at the same time
+		:param bool ordered: if True results are yielded in the order of urls, otherwise as they complete
+		:rtype: generator of tuple[str, BeautifulSoup]
+		"""
+		for url, response in self.request_many(urls=urls, verify=verify, max_workers=max_workers, ordered=ordered):
+			yield url, self.get_request_soup(content=response.content)
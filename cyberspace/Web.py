@@ -1,24 +1,34 @@
-import requests
 from disk import Cache
-from requests.adapters import SSLError
-from time import sleep
-from chronometry import get_now, get_elapsed
-import warnings
+
+from .transport import TRANSPORT, Hedging, ResponseRecord, get_conditional_headers, get_canonical_url, get_canonical_parameters
+from .caching import make_cached, get_cache
 
 
 class Web:
 	def __init__(
 			self, id=0, cache=None, expire_in=None, num_request_tries=4, rate_limit_wait_seconds=0.001,
-			headers=None, parameters=None
+			headers=None, parameters=None, transport=None, hedging=None
 	):
+		"""
+		:param int or str id: identifies the cached request function
+		:param str or Cache or SQLiteCache or MemoryCache or bool or NoneType cache: a new cache in 'internet_cache'
+		is used if not provided and no cache is used if False, a path ending with .sqlite selects an SQLiteCache
+		:param str or NoneType expire_in: if provided cached requests expire, e.g., '2 days'
+		:type num_request_tries: int
+		:param float rate_limit_wait_seconds: wait between requests
+		:param dict or NoneType headers: default headers
+		:param dict or NoneType parameters: default query parameters
+		:param cyberspace.transport.Transport or NoneType transport: the shared transport is used if not provided
+		:param cyberspace.transport.Hedging or bool or NoneType hedging: hedges slow requests if provided or True
+		"""
 		if cache is None:
 			self._cache = Cache(path='internet_cache')
 		elif isinstance(cache, str):
-			self._cache = Cache(path=cache)
-		elif isinstance(cache, Cache):
-			self._cache = cache
-		elif cache == False:
+			self._cache = get_cache(cache)
+		elif cache is False:
 			self._cache = None
+		else:
+			self._cache = cache
 
 		self._expire_in = expire_in
 		self._id = id
@@ -26,17 +36,24 @@ class Web:
 		self._rate_limit_wait = rate_limit_wait_seconds
 		self._headers = headers
 		self._parameters = parameters
+		self._transport = transport or TRANSPORT
+		self._hedging = Hedging() if hedging is True else (hedging or None)
+		self._create_cached_functions()
 
 	def _create_cached_functions(self):
 		if self.cache:
-			self.request = self.cache.make_cached(
+			self.request = make_cached(
+				cache=self.cache,
 				id=f'{self._id}_request',
 				function=self._request,
 				sub_directory=f'{self._id}_request',
-				expire_in=self._expire_in
+				expire_in=self._expire_in,
+				revalidate=self._revalidate,
+				key_function=self._get_canonical_request
 			)
 		else:
 			self.request = self._request
+		self.transport.metrics.add_cached_function(self.request, name=f'{self._id}_request')
 
 	@property
 	def cache(self):
@@ -45,37 +62,58 @@ class Web:
 		"""
 		return self._cache
 
-	def _request(self, url, verify=False, headers=None, parameters=None):
-		headers = headers or self._headers
-		parameters = parameters or self._parameters
-		error = None
-		for i in range(self._num_request_tries):
-			if i > 0:
-				sleep(0.001 * 10 ** (i-1))
-			try:
-				if self._rate_limit_wait and self._rate_limit_last_call:
-					wait_time = self._rate_limit_wait - get_elapsed(start=self._rate_limit_last_call, unit='s')
-					if wait_time > 0:
-						sleep(wait_time)
-				with warnings.catch_warnings():
-					warnings.simplefilter('ignore')
-					result = requests.get(url, params=parameters, headers=headers, verify=verify)
-				break
-			except SSLError as caught_error:
-				print(f'try {i + 1}, error with get request with url="{url}"')
-				warnings.warn(str(caught_error))
-				error = caught_error
-		else:
-			print(f'failed after {self._num_request_tries} requests!')
-			if error is None:
-				raise RuntimeError(f'failed after {self._num_request_tries} requests!')
-			else:
-				raise error
+	@property
+	def transport(self):
+		"""
+		:rtype: cyberspace.transport.Transport
+		"""
+		return self._transport
 
+	@property
+	def metrics(self):
+		"""
+		http metrics of the transport and hit ratios of the cached requests
+		:rtype: cyberspace.transport.Metrics
+		"""
+		return self._transport.metrics
+
+	@property
+	def _requests_per_second(self):
 		if self._rate_limit_wait:
-			self._rate_limit_last_call = get_now()
+			return 1 / self._rate_limit_wait
+		else:
+			return None
 
-		return result
+	@staticmethod
+	def _get_canonical_request(url, verify=False, headers=None, parameters=None):
+		return {
+			'url': get_canonical_url(url), 'verify': verify, 'headers': headers,
+			'parameters': get_canonical_parameters(parameters)
+		}
 
+	def _request(self, url, verify=False, headers=None, parameters=None):
+		headers = headers or self._headers
+		parameters = parameters or self._parameters
+		# the transport retries failed requests as its retry policy allows
+		return ResponseRecord.from_response(self.transport.get(
+			url, params=parameters, headers=headers, verify=verify, rate=self._requests_per_second,
+			max_tries=self._num_request_tries, hedging=self._hedging
+		))
 
+	def _revalidate(self, response, url, verify=False, headers=None, parameters=None):
+		"""
+		asks the server whether an expired cached response has changed and returns it if it has not
+		:type response: ResponseRecord
+		:type url: str
+		:rtype: ResponseRecord
+		"""
+		conditional_headers = get_conditional_headers(response=response)
+		if not conditional_headers:
+			return self._request(url=url, verify=verify, headers=headers, parameters=parameters)
 
+		headers = {**(headers or self._headers or {}), **conditional_headers}
+		new_response = self._request(url=url, verify=verify, headers=headers, parameters=parameters)
+		if new_response.status_code == 304:
+			return response
+		else:
+			return new_response
@@ -4,3 +4,5 @@ from .wikipedia import Wikipedia
 from .Scraper import Scraper
 from .get_id_token import get_id_token
 from .imdb import IMDB
+from .transport import Transport
+from .caching import MemoryCache
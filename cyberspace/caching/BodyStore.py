@@ -0,0 +1,208 @@
+import threading
+import sqlite3
+import os
+
+from ..transport import ResponseRecord
+
+
+BODY_STORE_FILE_NAME = '_bodies.sqlite'
+
+_CREATE_TABLES = (
+	"""
+	CREATE TABLE IF NOT EXISTS bodies (
+		hash TEXT PRIMARY KEY,
+		compression TEXT,
+		content BLOB NOT NULL,
+		size INTEGER NOT NULL
+	) WITHOUT ROWID
+	""",
+	"""
+	CREATE TABLE IF NOT EXISTS body_references (
+		owner TEXT PRIMARY KEY,
+		hash TEXT NOT NULL
+	) WITHOUT ROWID
+	""",
+	'CREATE INDEX IF NOT EXISTS body_references_hash ON body_references (hash)'
+)
+_DELETE_UNREFERENCED = """
+DELETE FROM bodies WHERE NOT EXISTS (SELECT 1 FROM body_references WHERE body_references.hash = bodies.hash)
+"""
+
+
+class BodyStore:
+	"""
+	keeps each distinct response body once, by its content hash, in an SQLite file.
+	Every cache entry that points at a body is a reference to it and a body is deleted
+	when its last reference is released
+	"""
+	_instances = {}
+	_instances_lock = threading.Lock()
+
+	def __init__(self, path):
+		"""
+		:param str path: path of the database file
+		"""
+		self._path = str(path)
+		self._local = threading.local()
+		with self._connection as connection:
+			for statement in _CREATE_TABLES:
+				connection.execute(statement)
+
+	@classmethod
+	def get(cls, path):
+		"""
+		the body store of a file, shared by every cache that uses it in this process
+		:type path: str
+		:rtype: BodyStore
+		"""
+		path = os.path.abspath(str(path))
+		with cls._instances_lock:
+			if path not in cls._instances:
+				cls._instances[path] = cls(path=path)
+			return cls._instances[path]
+
+	def __getstate__(self):
+		return {'path': self._path}
+
+	def __setstate__(self, state):
+		self.__init__(path=state['path'])
+
+	def __repr__(self):
+		return f'<BodyStore:{self._path}>'
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def _connection(self):
+		connection = getattr(self._local, 'connection', None)
+		if connection is None:
+			connection = sqlite3.connect(self._path, timeout=60)
+			connection.execute('PRAGMA journal_mode=WAL')
+			connection.execute('PRAGMA synchronous=NORMAL')
+			self._local.connection = connection
+		return connection
+
+	def put(self, owner, content):
+		"""
+		keeps content, if it is not already kept, and makes owner point at it instead of what it pointed at before
+		:param str owner: identifies the cache entry
+		:type content: bytes
+		:rtype: str
+		:return: the hash of content
+		"""
+		body_hash = ResponseRecord.get_body_hash(content)
+		with self._connection as connection:
+			self.add(connection=connection, bodies=[(owner, body_hash, content)])
+		return body_hash
+
+	def add(self, connection, bodies):
+		"""
+		does what put does for many bodies in the transaction of a connection to the file of the store,
+		e.g., that of a cache which commits them together with its entries
+		:type connection: sqlite3.Connection
+		:param list[tuple[str, str, bytes]] bodies: the owner, hash and content of each body
+		"""
+		compression = ResponseRecord._get_compression()
+		for owner, body_hash, content in bodies:
+			exists = connection.execute('SELECT 1 FROM bodies WHERE hash = ?', (body_hash,)).fetchone()
+			if exists is None:
+				connection.execute(
+					'INSERT OR IGNORE INTO bodies (hash, compression, content, size) VALUES (?, ?, ?, ?)',
+					(body_hash, compression, ResponseRecord._compress(content, compression=compression), len(content))
+				)
+			previous = connection.execute('SELECT hash FROM body_references WHERE owner = ?', (owner,)).fetchone()
+			connection.execute('INSERT OR REPLACE INTO body_references (owner, hash) VALUES (?, ?)', (owner, body_hash))
+			if previous is not None and previous[0] != body_hash:
+				self._delete_if_unreferenced(connection=connection, hashes=[previous[0]])
+
+	def get_content(self, body_hash):
+		"""
+		:type body_hash: str
+		:rtype: bytes
+		"""
+		row = self._connection.execute('SELECT compression, content FROM bodies WHERE hash = ?', (body_hash,)).fetchone()
+		if row is None:
+			raise KeyError(f'body {body_hash} does not exist in {self}!')
+		compression, content = row
+		return ResponseRecord._decompress(content, compression=compression)
+
+	@staticmethod
+	def _delete_if_unreferenced(connection, hashes):
+		connection.executemany(
+			'DELETE FROM bodies WHERE hash = ? AND NOT EXISTS (SELECT 1 FROM body_references WHERE hash = ?)',
+			[(body_hash, body_hash) for body_hash in hashes]
+		)
+
+	def release(self, owners):
+		"""
+		removes the references of deleted cache entries and the bodies nothing points at anymore
+		:type owners: list[str]
+		:rtype: int
+		:return: number of bodies deleted
+		"""
+		owners = list(owners)
+		if not owners:
+			return 0
+		with self._connection as connection:
+			hashes = set()
+			for owner in owners:
+				row = connection.execute('SELECT hash FROM body_references WHERE owner = ?', (owner,)).fetchone()
+				if row is not None:
+					hashes.add(row[0])
+			connection.executemany('DELETE FROM body_references WHERE owner = ?', [(owner,) for owner in owners])
+			before = connection.total_changes
+			self._delete_if_unreferenced(connection=connection, hashes=hashes)
+			return connection.total_changes - before
+
+	def collect(self, live_owners=None):
+		"""
+		deletes references whose owners are not in live_owners, if provided, and every body nothing points at
+		:type live_owners: set[str] or NoneType
+		:rtype: int
+		:return: number of bodies deleted
+		"""
+		with self._connection as connection:
+			if live_owners is not None:
+				owners = [row[0] for row in connection.execute('SELECT owner FROM body_references')]
+				connection.executemany(
+					'DELETE FROM body_references WHERE owner = ?',
+					[(owner,) for owner in owners if owner not in live_owners]
+				)
+			return connection.execute(_DELETE_UNREFERENCED).rowcount
+
+	def get_shares(self):
+		"""
+		the bytes each owner would free if every owner of the same body were deleted with it,
+		i.e., the size of its body divided by the number of references to the body
+		:rtype: dict[str, float]
+		"""
+		return dict(self._connection.execute(
+			"""
+			SELECT body_references.owner, bodies.size * 1.0 / counts.num_references
+			FROM body_references
+			JOIN bodies ON bodies.hash = body_references.hash
+			JOIN (SELECT hash, COUNT(*) AS num_references FROM body_references GROUP BY hash) AS counts
+			ON counts.hash = body_references.hash
+			"""
+		))
+
+	@property
+	def statistics(self):
+		"""
+		:rtype: dict
+		"""
+		connection = self._connection
+		num_bodies, num_bytes = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM bodies').fetchone()
+		num_references, referenced_bytes = connection.execute(
+			'SELECT COUNT(*), COALESCE(SUM(bodies.size), 0) FROM body_references '
+			'JOIN bodies ON bodies.hash = body_references.hash'
+		).fetchone()
+		return {
+			'bodies': num_bodies, 'bytes': num_bytes, 'references': num_references,
+			'bytes_saved': referenced_bytes - num_bytes
+		}
@@ -0,0 +1,316 @@
+from chronometry import get_elapsed, get_now
+from datetime import datetime
+import pickle
+import time
+import os
+
+from .TrackedStore import ACCESS_LOG_FILE_NAME, get_access_log_path, read_access_log, get_users
+from .BodyStore import BodyStore, BODY_STORE_FILE_NAME
+
+
+_METADATA_SUFFIX = '_metadata.pickle'
+_KEYS_FILE_NAME = 'keys.pickle'
+_VALUE_EXTENSIONS = ('.pickle', '.dill')
+# an entry missing its value or metadata file for less than this long may still be being written
+_ORPHAN_GRACE_SECONDS = 3600
+
+
+class CacheEntry:
+	def __init__(self, directory, name, file_names, size, written_at, last_access, num_accesses):
+		"""
+		:param str directory: the directory of the cache that holds the entry
+		:param str name: hash of the key, the name of its files without extension
+		:param list[str] file_names: value and metadata files of the entry
+		:param int size: bytes taken by the files
+		:param float written_at: timestamp of when the value was saved
+		:param float last_access: timestamp of the last read, or of the write if it was never read
+		:param int num_accesses: number of reads recorded in the access log
+		"""
+		self.directory = directory
+		self.name = name
+		self.file_names = file_names
+		self.size = size
+		self.written_at = written_at
+		self.last_access = last_access
+		self.num_accesses = num_accesses
+
+	def __repr__(self):
+		return f'<CacheEntry:{os.path.join(self.directory, self.name)} {self.size} bytes>'
+
+	def delete(self):
+		for file_name in self.file_names:
+			try:
+				os.remove(os.path.join(self.directory, file_name))
+			except FileNotFoundError:
+				pass
+
+
+class CacheInUseError(RuntimeError):
+	pass
+
+
+class CacheMaintainer:
+	"""
+	keeps a disk cache, and the sub directories that make_cached creates in it, within a budget of bytes or entries
+	by purging expired entries and evicting the least recently (lru) or least frequently (lfu) used ones
+	"""
+	def __init__(self, path, max_bytes=None, max_entries=None, policy='lru', expire_in=None):
+		"""
+		:param str or disk.Path or disk.Cache path: directory of the cache
+		:param int or NoneType max_bytes: total size the cache is allowed to take
+		:param int or NoneType max_entries: total number of entries the cache is allowed to hold
+		:param str policy: 'lru' or 'lfu'
+		:param str or NoneType expire_in: entries saved longer ago than this are purged, e.g., '30 days'
+		"""
+		if policy not in ('lru', 'lfu'):
+			raise ValueError(f'policy should be lru or lfu, not {policy}!')
+		path = getattr(path, 'path', path)
+		self._path = str(getattr(path, 'path', path))
+		self._max_bytes = max_bytes
+		self._max_entries = max_entries
+		self._policy = policy
+		self._expire_in = expire_in
+
+	@property
+	def body_store(self):
+		"""
+		the store of the response bodies of the cache, if it has one
+		:rtype: BodyStore or NoneType
+		"""
+		path = os.path.join(self._path, BODY_STORE_FILE_NAME)
+		return BodyStore.get(path=path) if os.path.exists(path) else None
+
+	def _get_owner(self, entry):
+		return f'{os.path.relpath(entry.directory, self._path)}/{entry.name}'
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def directories(self):
+		"""
+		the cache directory and every directory inside it that holds cache entries
+		:rtype: list[str]
+		"""
+		return [
+			directory for directory, _, file_names in os.walk(self._path)
+			if directory == self._path or _KEYS_FILE_NAME in file_names
+			or any(file_name.endswith(_METADATA_SUFFIX) for file_name in file_names)
+		]
+
+	@staticmethod
+	def _get_entries(directory):
+		"""
+		:type directory: str
+		:rtype: list[CacheEntry]
+		"""
+		accesses = read_access_log(directory=directory)
+		files = {}
+		for dir_entry in os.scandir(directory):
+			file_name = dir_entry.name
+			if not dir_entry.is_file() or file_name in (_KEYS_FILE_NAME, ACCESS_LOG_FILE_NAME):
+				continue
+			if file_name.endswith(_METADATA_SUFFIX):
+				name = file_name[:-len(_METADATA_SUFFIX)]
+			else:
+				name, extension = os.path.splitext(file_name)
+				if extension not in _VALUE_EXTENSIONS:
+					continue
+			files.setdefault(name, []).append((file_name, dir_entry.stat()))
+
+		entries = []
+		for name, name_files in files.items():
+			value_stats = [stat for file_name, stat in name_files if not file_name.endswith(_METADATA_SUFFIX)]
+			written_at = max(stat.st_mtime for stat in (value_stats or [stat for _, stat in name_files]))
+			last_access, num_accesses = accesses.get(name, (written_at, 0))
+			entries.append(CacheEntry(
+				directory=directory, name=name, file_names=[file_name for file_name, _ in name_files],
+				size=sum(stat.st_size for _, stat in name_files), written_at=written_at,
+				last_access=max(last_access, written_at), num_accesses=num_accesses
+			))
+		return entries
+
+	def get_entries(self):
+		"""
+		:rtype: list[CacheEntry]
+		"""
+		return [entry for directory in self.directories for entry in self._get_entries(directory=directory)]
+
+	@property
+	def statistics(self):
+		"""
+		:rtype: dict
+		"""
+		entries = self.get_entries()
+		result = {
+			'directories': len(self.directories), 'entries': len(entries), 'bytes': sum(entry.size for entry in entries)
+		}
+		body_store = self.body_store
+		if body_store is not None:
+			result['bodies'] = body_store.statistics
+		return result
+
+	def _is_expired(self, entry, expire_in):
+		value, unit = expire_in.split()
+		elapsed = get_elapsed(start=datetime.fromtimestamp(entry.written_at), end=get_now(), unit=unit)
+		return elapsed >= float(value)
+
+	@staticmethod
+	def _is_orphan(entry):
+		has_value = any(not file_name.endswith(_METADATA_SUFFIX) for file_name in entry.file_names)
+		has_metadata = any(file_name.endswith(_METADATA_SUFFIX) for file_name in entry.file_names)
+		is_old = entry.written_at < time.time() - _ORPHAN_GRACE_SECONDS
+		return is_old and not (has_value and has_metadata)
+
+	def purge_expired(self, expire_in=None):
+		"""
+		deletes entries saved longer ago than expire_in
+		:param str or NoneType expire_in: e.g., '30 days', the expire_in of the maintainer is used if not provided
+		:rtype: dict
+		"""
+		expire_in = expire_in or self._expire_in
+		if expire_in is None:
+			raise ValueError('expire_in is needed to purge expired entries!')
+
+		expired = [entry for entry in self.get_entries() if self._is_expired(entry=entry, expire_in=expire_in)]
+		return self._delete(entries=expired)
+
+	def evict(self, max_bytes=None, max_entries=None, policy=None):
+		"""
+		deletes the least recently or least frequently used entries until the cache is within budget,
+		each entry counts its share of the response body it points at
+		:rtype: dict
+		"""
+		max_bytes = max_bytes if max_bytes is not None else self._max_bytes
+		max_entries = max_entries if max_entries is not None else self._max_entries
+		policy = policy or self._policy
+
+		entries = [entry for entry in self.get_entries() if not self._is_orphan(entry=entry)]
+		if policy == 'lfu':
+			entries.sort(key=lambda entry: (entry.num_accesses, entry.last_access))
+		else:
+			entries.sort(key=lambda entry: entry.last_access)
+
+		body_store = self.body_store
+		shares = body_store.get_shares() if body_store is not None else {}
+		for entry in entries:
+			entry.size += int(shares.get(self._get_owner(entry=entry), 0))
+
+		num_entries = len(entries)
+		num_bytes = sum(entry.size for entry in entries)
+		evicted = []
+		for entry in entries:
+			within_bytes = max_bytes is None or num_bytes <= max_bytes
+			within_entries = max_entries is None or num_entries <= max_entries
+			if within_bytes and within_entries:
+				break
+			evicted.append(entry)
+			num_entries -= 1
+			num_bytes -= entry.size
+		return self._delete(entries=evicted)
+
+	@property
+	def users(self):
+		"""
+		the running processes that use the cache, including this one if it does
+		:rtype: list[int]
+		"""
+		return sorted({pid for directory in self.directories for pid in get_users(directory=directory)})
+
+	def _check_not_in_use(self):
+		users = self.users
+		if users:
+			raise CacheInUseError(
+				f'{self._path} is used by processes {users}, which save its key indices when they exit and would '
+				f'undo the compaction, compact it when they have stopped or use force=True!'
+			)
+
+	def compact(self, force=False):
+		"""
+		deletes half-written entries and the response bodies no entry points at, drops deleted entries from the
+		key indices and rewrites each access log as one line per entry,
+		CacheInUseError is raised if a running process uses the cache
+		:param bool force: compact even if a running process uses the cache
+		:rtype: dict
+		"""
+		if not force:
+			self._check_not_in_use()
+		result = {'orphans_deleted': 0, 'keys_dropped': 0, 'access_lines_dropped': 0}
+		live_owners = set()
+		for directory in self.directories:
+			entries = self._get_entries(directory=directory)
+			orphans = [entry for entry in entries if self._is_orphan(entry=entry)]
+			for entry in orphans:
+				entry.delete()
+			result['orphans_deleted'] += len(orphans)
+
+			names = {entry.name for entry in entries} - {entry.name for entry in orphans}
+			live_owners.update(self._get_owner(entry=entry) for entry in entries if entry.name in names)
+			result['keys_dropped'] += self._compact_keys(directory=directory, names=names)
+			result['access_lines_dropped'] += self._compact_access_log(directory=directory, names=names)
+
+		body_store = self.body_store
+		if body_store is not None:
+			result['bodies_deleted'] = body_store.collect(live_owners=live_owners)
+		return result
+
+	@staticmethod
+	def _compact_keys(directory, names):
+		path = os.path.join(directory, _KEYS_FILE_NAME)
+		if not os.path.exists(path):
+			return 0
+		with open(path, 'rb') as file:
+			keys = pickle.load(file)
+		compacted = {name: key for name, key in keys.items() if name in names}
+		if len(compacted) == len(keys):
+			return 0
+		with open(path + '.tmp', 'wb') as file:
+			pickle.dump(compacted, file)
+		os.replace(path + '.tmp', path)
+		return len(keys) - len(compacted)
+
+	@staticmethod
+	def _compact_access_log(directory, names):
+		path = get_access_log_path(directory=directory)
+		if not os.path.exists(path):
+			return 0
+		with open(path, 'r') as file:
+			num_lines = sum(1 for _ in file)
+		accesses = read_access_log(directory=directory)
+		lines = ''.join(
+			f'{name} {timestamp} {count}\n' for name, (timestamp, count) in accesses.items() if name in names
+		)
+		with open(path + '.tmp', 'w') as file:
+			file.write(lines)
+		os.replace(path + '.tmp', path)
+		return num_lines - len(lines.splitlines())
+
+	def _delete(self, entries):
+		for entry in entries:
+			entry.delete()
+		result = {'entries_deleted': len(entries), 'bytes_deleted': sum(entry.size for entry in entries)}
+		body_store = self.body_store
+		if body_store is not None:
+			result['bodies_deleted'] = body_store.release(owners=[self._get_owner(entry=entry) for entry in entries])
+		return result
+
+	def run(self, force=False):
+		"""
+		purges expired entries if expire_in is set, evicts entries beyond the budget and compacts the cache,
+		CacheInUseError is raised before anything is done if a running process uses the cache
+		:param bool force: run even if a running process uses the cache
+		:rtype: dict
+		"""
+		if not force:
+			self._check_not_in_use()
+		result = {}
+		if self._expire_in is not None:
+			result['expired'] = self.purge_expired()
+		if self._max_bytes is not None or self._max_entries is not None:
+			result['evicted'] = self.evict()
+		result['compacted'] = self.compact(force=True)
+		return result
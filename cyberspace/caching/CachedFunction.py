@@ -0,0 +1,247 @@
+from disk.Cache import TimedObject
+
+from collections import OrderedDict
+from threading import Lock
+import functools
+import warnings
+
+
+_MAX_FIRST_FORMS = 100000
+
+
+class CachedFunction:
+	"""
+	a cached version of a function that, unlike the wrapper returned by disk.Cache.make_cached,
+	can be asked whether a call is already cached without making it.
+	Keys and stored values are the same as those of disk.Cache.make_cached so existing caches keep working.
+	"""
+	def __init__(
+			self, function, cache, id=None, condition_function=None, expire_in=None, if_error='warning',
+			revalidate=None, single_flight=None, key_function=None, raw_key_function=None
+	):
+		"""
+		:param callable function: function to be cached
+		:param disk.Cache cache: any object that supports `in`, `[]` and `[]=` with the keys of this function
+		:param int or str id: a unique identifier for function
+		:param callable condition_function: a function that determines if the result is worthy of caching
+		:param NoneType or str expire_in: if provided the cached value will expire, e.g., '2 days', '6 months'
+		:param str if_error: what to do if reading from the cache fails: warning, error, print, ignore
+		:param callable or NoneType revalidate: called as revalidate(expired_result, *args, **kwargs) instead of
+		function when a cached result has expired, it should return the expired result itself if it is still valid
+		:param SingleFlight or NoneType single_flight: if provided, identical calls that miss the cache at the same
+		time are made and saved only once
+		:param callable or NoneType key_function: takes the arguments of function and returns the canonical keyword
+		arguments that make the key, so that calls asking for the same thing in different ways share one entry
+		:param callable or NoneType raw_key_function: takes the arguments of function and returns the args and kwargs
+		that made the key of the call before key_function was used, if function used to change them before they were
+		saved, so that entries saved under those keys are still found
+		"""
+		functools.update_wrapper(self, function)
+		self._function = function
+		self._cache = cache
+		self._id = id
+		self._condition_function = condition_function
+		self._expire_in = expire_in
+		self._if_error = if_error.lower()[0]
+		self._revalidate = revalidate
+		self._single_flight = single_flight
+		self._key_function = key_function
+		self._raw_key_function = raw_key_function
+		# the form each canonical key was first asked for in, to tell which hits were merged duplicates
+		self._first_forms = OrderedDict()
+		self._statistics = {'hits': 0, 'expired': 0, 'misses': 0, 'merged': 0}
+		self._statistics_lock = Lock()
+
+	@property
+	def cache(self):
+		return self._cache
+
+	@property
+	def function(self):
+		"""
+		:rtype: callable
+		"""
+		return self._function
+
+	@property
+	def statistics(self):
+		"""
+		hits, expired and misses of the calls and lookups so far, merged is the number of hits for a call
+		written differently from the call that first asked for the entry, which only matched because of the key function
+		:rtype: dict
+		"""
+		with self._statistics_lock:
+			return dict(self._statistics)
+
+	def _count(self, name):
+		with self._statistics_lock:
+			self._statistics[name] += 1
+
+	def _get_raw_key(self, *args, **kwargs):
+		return self._id, self._function.__name__, self._function.__doc__, args, kwargs
+
+	def _get_fallback_key(self, *args, **kwargs):
+		if self._raw_key_function is None:
+			return self._get_raw_key(*args, **kwargs)
+		raw_args, raw_kwargs = self._raw_key_function(*args, **kwargs)
+		return self._get_raw_key(*raw_args, **raw_kwargs)
+
+	def get_key(self, *args, **kwargs):
+		if self._key_function is None:
+			return self._get_raw_key(*args, **kwargs)
+		return self._id, self._function.__name__, self._function.__doc__, (), self._key_function(*args, **kwargs)
+
+	def _is_merged(self, key, args, kwargs):
+		"""
+		remembers the form of a call for its canonical key and tells if an earlier call had a different form
+		:rtype: bool
+		"""
+		canonical_form = repr(key[-1])
+		form = repr((args, kwargs))
+		with self._statistics_lock:
+			first_form = self._first_forms.setdefault(canonical_form, form)
+			self._first_forms.move_to_end(canonical_form)
+			if len(self._first_forms) > _MAX_FIRST_FORMS:
+				self._first_forms.popitem(last=False)
+		return first_form != form
+
+	def _read(self, key):
+		"""
+		:rtype: tuple[str, object]
+		:return: ('hit', result), ('expired', expired_result) or ('miss', None)
+		"""
+		if key not in self._cache:
+			return 'miss', None
+
+		try:
+			result = self._cache[key]
+		except (KeyError, FileNotFoundError):
+			# the entry was deleted, e.g., by CacheMaintainer, after it was found
+			return 'miss', None
+		except EOFError as e:
+			if self._if_error == 'w':
+				warnings.warn(str(e))
+			elif self._if_error == 'e':
+				raise e
+			elif self._if_error == 'p':
+				print(e)
+			return 'miss', None
+
+		if isinstance(result, TimedObject):
+			if self._expire_in is not None and result.is_expired(expire_in=self._expire_in):
+				return 'expired', result.obj
+			return 'hit', result.obj
+		else:
+			return 'hit', result
+
+	def _find(self, key, args, kwargs):
+		"""
+		reads the entry of a call and, if a key function is used and the canonical key misses, the entry
+		saved under the key of the call as it is, which is then copied to the canonical key
+		:rtype: tuple[str, object]
+		"""
+		status, result = self._read(key=key)
+		if status == 'miss' and self._key_function is not None:
+			raw_key = self._get_fallback_key(*args, **kwargs)
+			if raw_key != key:
+				status, result = self._read(key=raw_key)
+				if status == 'hit':
+					self._cache[key] = self._cache[raw_key]
+
+		is_merged = self._key_function is not None and self._is_merged(key=key, args=args, kwargs=kwargs)
+		if status == 'hit':
+			self._count('hits')
+			if is_merged:
+				self._count('merged')
+		else:
+			self._count('misses' if status == 'miss' else 'expired')
+		return status, result
+
+	def check(self, *args, **kwargs):
+		"""
+		looks for the result of a call in the cache without calling the function,
+		the outcome can be given to call_after_check so that a miss is not read and counted again
+		:rtype: tuple[str, object]
+		:return: ('hit', result), ('expired', expired_result) or ('miss', None)
+		"""
+		return self._find(key=self.get_key(*args, **kwargs), args=args, kwargs=kwargs)
+
+	def lookup(self, *args, **kwargs):
+		"""
+		looks for the result of a call in the cache without calling the function
+		:rtype: tuple[bool, object]
+		:return: (True, result) if a valid unexpired result is cached, otherwise (False, None)
+		"""
+		status, result = self.check(*args, **kwargs)
+		if status == 'hit':
+			return True, result
+		else:
+			return False, None
+
+	def is_cached(self, *args, **kwargs):
+		"""
+		:rtype: bool
+		"""
+		return self.lookup(*args, **kwargs)[0]
+
+	def _should_save(self, result, kwargs):
+		if self._condition_function is None:
+			return True
+
+		code = self._condition_function.__code__
+		condition_args = list(code.co_varnames)[:code.co_argcount]
+		condition_kwargs = {key: value for key, value in kwargs.items() if key in condition_args}
+		if 'result' in condition_args:
+			condition_kwargs['result'] = result
+		return bool(self._condition_function(**condition_kwargs))
+
+	def save(self, result, *args, **kwargs):
+		"""
+		stores the result of a call in the cache if the condition function accepts it
+		:rtype: bool
+		"""
+		return self._save(key=self.get_key(*args, **kwargs), result=result, kwargs=kwargs)
+
+	def _save(self, key, result, kwargs):
+		if not self._should_save(result=result, kwargs=kwargs):
+			return False
+
+		if self._expire_in is not None:
+			self._cache[key] = TimedObject(obj=result)
+		else:
+			self._cache[key] = result
+		return True
+
+	def _call_and_save(self, cache_key, status, result, args, kwargs):
+		if status == 'expired' and self._revalidate is not None:
+			result = self._revalidate(result, *args, **kwargs)
+		else:
+			result = self._function(*args, **kwargs)
+		self._save(key=cache_key, result=result, kwargs=kwargs)
+		return result
+
+	def _call_after_find(self, key, status, result, args, kwargs):
+		if status == 'hit':
+			return result
+		if self._single_flight is None:
+			return self._call_and_save(cache_key=key, status=status, result=result, args=args, kwargs=kwargs)
+		else:
+			return self._single_flight.do(
+				key, self._call_and_save, cache_key=key, status=status, result=result, args=args, kwargs=kwargs
+			)
+
+	def call_after_check(self, checked, *args, **kwargs):
+		"""
+		calls the function for a call that was already checked, without reading the cache again
+		:param tuple[str, object] checked: what check returned for the same arguments
+		"""
+		status, result = checked
+		key = self.get_key(*args, **kwargs)
+		return self._call_after_find(key=key, status=status, result=result, args=args, kwargs=kwargs)
+
+	def __call__(self, *args, update_cache=False, **kwargs):
+		key = self.get_key(*args, **kwargs)
+		status, result = 'miss', None
+		if not update_cache:
+			status, result = self._find(key=key, args=args, kwargs=kwargs)
+		return self._call_after_find(key=key, status=status, result=result, args=args, kwargs=kwargs)
@@ -0,0 +1,77 @@
+from disk.Cache import TimedObject
+from slytherin.hash import hash_object
+
+from ..transport import ResponseRecord
+
+
+class DeduplicatedStore:
+	"""
+	a store whose ResponseRecord bodies are kept once in a BodyStore, by content hash,
+	while its entries only keep the rest of the record and the hash
+	"""
+	MIN_SIZE = 1024
+
+	def __init__(self, store, body_store, owner_prefix):
+		"""
+		:param store: the store that keeps the entries, e.g., a TrackedStore
+		:type body_store: BodyStore
+		:param str owner_prefix: identifies the store among the stores that share body_store
+		"""
+		self._store = store
+		self._body_store = body_store
+		self._owner_prefix = owner_prefix
+
+	@property
+	def store(self):
+		return self._store
+
+	@property
+	def body_store(self):
+		"""
+		:rtype: BodyStore
+		"""
+		return self._body_store
+
+	def __getattr__(self, name):
+		# flush and the other methods of the wrapped store
+		if name.startswith('_'):
+			raise AttributeError(name)
+		return getattr(self._store, name)
+
+	def get_owner(self, key):
+		"""
+		:rtype: str
+		"""
+		return f'{self._owner_prefix}/{hash_object(key, base=32)}'
+
+	def __contains__(self, key):
+		return key in self._store
+
+	def __getitem__(self, key):
+		value = self._store[key]
+		record = value.obj if isinstance(value, TimedObject) else value
+		if not isinstance(record, ResponseRecord) or record.body_hash is None:
+			return value
+
+		record = record.with_content(self._body_store.get_content(record.body_hash))
+		if isinstance(value, TimedObject):
+			value._obj = record
+			return value
+		return record
+
+	def __setitem__(self, key, value):
+		record = value.obj if isinstance(value, TimedObject) else value
+		if isinstance(record, ResponseRecord) and len(record.content) >= self.MIN_SIZE:
+			body_hash = self._body_store.put(owner=self.get_owner(key), content=record.content)
+			record = record.without_content(body_hash=body_hash)
+			if isinstance(value, TimedObject):
+				timed_value = TimedObject(obj=record)
+				timed_value._time = value.time
+				value = timed_value
+			else:
+				value = record
+		self._store[key] = value
+
+	def __delitem__(self, key):
+		del self._store[key]
+		self._body_store.release(owners=[self.get_owner(key)])
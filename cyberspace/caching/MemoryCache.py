@@ -0,0 +1,206 @@
+from disk import Cache
+from disk.Cache import TimedObject
+from slytherin import get_size
+from slytherin.hash import hash_object
+from collections import OrderedDict
+import threading
+
+from .CachedFunction import CachedFunction
+from .get_store import get_store
+from .get_cache import get_cache
+
+
+def _get_size(value):
+	"""
+	approximate number of bytes a cached value takes in memory
+	:rtype: int
+	"""
+	if isinstance(value, TimedObject):
+		value = value.obj
+	content = getattr(value, 'content', None)
+	if isinstance(content, bytes):
+		return len(content) + 512
+	try:
+		return get_size(value)
+	except Exception:
+		return 512
+
+
+class _MemoryTier:
+	"""
+	the store of one sub directory: reads come from memory when possible and writes go to both tiers
+	"""
+	def __init__(self, memory_cache, sub_directory, store):
+		"""
+		:type memory_cache: MemoryCache
+		:type sub_directory: str or NoneType
+		:param store: the slower store behind memory, or None for memory only
+		"""
+		self._memory_cache = memory_cache
+		self._sub_directory = sub_directory
+		self._store = store
+
+	def _get_memory_key(self, key):
+		return self._sub_directory, hash_object(key)
+
+	def __contains__(self, key):
+		if self._memory_cache._contains(self._get_memory_key(key)):
+			return True
+		return self._store is not None and key in self._store
+
+	def __getitem__(self, key):
+		memory_key = self._get_memory_key(key)
+		found, value = self._memory_cache._get(memory_key)
+		if found:
+			return value
+		if self._store is None:
+			raise KeyError(key)
+		value = self._store[key]
+		self._memory_cache._set(memory_key, value)
+		return value
+
+	def __setitem__(self, key, value):
+		if self._store is not None:
+			self._store[key] = value
+		self._memory_cache._set(self._get_memory_key(key), value)
+
+	def __delitem__(self, key):
+		self._memory_cache._delete(self._get_memory_key(key))
+		if self._store is not None:
+			del self._store[key]
+
+
+class MemoryCache:
+	"""
+	a least recently used in-memory cache with a byte budget that sits in front of another cache,
+	it has the make_cached method of disk.Cache and can be passed as the cache of any client
+	"""
+	def __init__(self, cache=None, max_bytes=256 * 1024 ** 2, max_entries=None):
+		"""
+		:param str or Path or Cache or SQLiteCache or NoneType cache: the cache behind memory,
+		if None results are only kept in memory, paths are turned into caches by get_cache
+		:param int max_bytes: approximate number of bytes kept in memory
+		:param int or NoneType max_entries: maximum number of results kept in memory
+		"""
+		self._cache = get_cache(cache)
+		self._max_bytes = max_bytes
+		self._max_entries = max_entries
+		self._lock = threading.Lock()
+		self._entries = OrderedDict()
+		self._bytes = 0
+		self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+	def __getstate__(self):
+		return {'cache': self._cache, 'max_bytes': self._max_bytes, 'max_entries': self._max_entries}
+
+	def __setstate__(self, state):
+		self.__init__(cache=state['cache'], max_bytes=state['max_bytes'], max_entries=state['max_entries'])
+
+	def __hashkey__(self):
+		return self.__class__.__name__, self._cache
+
+	def __repr__(self):
+		return f'<MemoryCache {len(self._entries)} entries, {self._bytes} bytes in front of {self._cache}>'
+
+	@property
+	def cache(self):
+		"""
+		:rtype: Cache or NoneType
+		"""
+		return self._cache
+
+	@property
+	def statistics(self):
+		"""
+		:rtype: dict[str, int]
+		"""
+		with self._lock:
+			requests = self._stats['hits'] + self._stats['misses']
+			return {
+				**self._stats,
+				'hit_ratio': self._stats['hits'] / requests if requests else None,
+				'entries': len(self._entries),
+				'bytes': self._bytes
+			}
+
+	def _contains(self, memory_key):
+		# every lookup of a cached function starts with `in` so hits and misses are counted here
+		with self._lock:
+			if memory_key in self._entries:
+				self._stats['hits'] += 1
+				return True
+			else:
+				self._stats['misses'] += 1
+				return False
+
+	def _get(self, memory_key):
+		with self._lock:
+			if memory_key in self._entries:
+				self._entries.move_to_end(memory_key)
+				return True, self._entries[memory_key][0]
+			else:
+				return False, None
+
+	def _set(self, memory_key, value):
+		size = _get_size(value)
+		if size > self._max_bytes:
+			return
+		with self._lock:
+			if memory_key in self._entries:
+				self._bytes -= self._entries.pop(memory_key)[1]
+			self._entries[memory_key] = (value, size)
+			self._bytes += size
+			while self._entries and (
+				self._bytes > self._max_bytes or
+				(self._max_entries is not None and len(self._entries) > self._max_entries)
+			):
+				_, (_, evicted_size) = self._entries.popitem(last=False)
+				self._bytes -= evicted_size
+				self._stats['evictions'] += 1
+
+	def _delete(self, memory_key):
+		with self._lock:
+			if memory_key in self._entries:
+				self._bytes -= self._entries.pop(memory_key)[1]
+
+	def clear(self):
+		"""
+		empties the memory tier, the cache behind it is not touched
+		"""
+		with self._lock:
+			self._entries.clear()
+			self._bytes = 0
+
+	def get_store(self, sub_directory=None, function=None, id=None):
+		"""
+		:rtype: _MemoryTier
+		"""
+		if self._cache is None:
+			store = None
+		else:
+			store = get_store(cache=self._cache, sub_directory=sub_directory, function=function, id=id)
+		return _MemoryTier(memory_cache=self, sub_directory=sub_directory, store=store)
+
+	def make_cached(
+			self, function, id=None, condition_function=None, sub_directory=None, expire_in=None, revalidate=None,
+			single_flight=None, key_function=None, raw_key_function=None, **kwargs
+	):
+		"""
+		:param callable function: function to be cached
+		:param int or str id: a unique identifier for function
+		:param callable condition_function: a function that determines if the result is worthy of caching
+		:param str sub_directory: name of a sub directory inside the cache directory to be used, optional
+		:param NoneType or str expire_in: if provided the cached value will expire, e.g., '2 days', '6 months'
+		:param callable or NoneType revalidate: called as revalidate(expired_result, *args, **kwargs) instead of
+		function when a cached result has expired
+		:param SingleFlight or NoneType single_flight: coalesces identical calls that miss the cache at the same time
+		:param callable or NoneType key_function: turns the arguments of a call into the canonical keyword arguments of its key
+		:param callable or NoneType raw_key_function: turns the arguments of a call into the args and kwargs its key had
+		before key_function, to find entries saved under those keys
+		:rtype: CachedFunction
+		"""
+		return CachedFunction(
+			function=function, cache=self.get_store(sub_directory=sub_directory, function=function, id=id),
+			id=id, condition_function=condition_function, expire_in=expire_in, revalidate=revalidate,
+			single_flight=single_flight, key_function=key_function, raw_key_function=raw_key_function
+		)
@@ -0,0 +1,391 @@
+from slytherin.hash import hash_object
+import threading
+import weakref
+import sqlite3
+import atexit
+import pickle
+import time
+import os
+
+from .CachedFunction import CachedFunction
+from .BodyStore import BodyStore
+from .DeduplicatedStore import DeduplicatedStore
+from ..transport import ResponseRecord
+
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS entries (
+	sub_directory TEXT NOT NULL,
+	name TEXT NOT NULL,
+	value BLOB NOT NULL,
+	size INTEGER NOT NULL,
+	written_at REAL NOT NULL,
+	last_access REAL NOT NULL,
+	num_accesses INTEGER NOT NULL DEFAULT 0,
+	PRIMARY KEY (sub_directory, name)
+) WITHOUT ROWID
+"""
+_CREATE_ACCESS_INDEX = 'CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)'
+_SECONDS_PER_UNIT = {
+	'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400, 'month': 30 * 86400,
+	'year': 365 * 86400
+}
+_CACHES = weakref.WeakSet()
+
+
+def _exit():
+	for sqlite_cache in list(_CACHES):
+		sqlite_cache.flush()
+
+
+atexit.register(_exit)
+
+
+class _SQLiteStore:
+	"""
+	the entries of one sub directory of an SQLiteCache
+	"""
+	def __init__(self, sqlite_cache, sub_directory):
+		"""
+		:type sqlite_cache: SQLiteCache
+		:type sub_directory: str or NoneType
+		"""
+		self._sqlite_cache = sqlite_cache
+		self._sub_directory = sub_directory or ''
+
+	def __contains__(self, key):
+		return self._sqlite_cache._contains(sub_directory=self._sub_directory, key=key)
+
+	def __getitem__(self, key):
+		return self._sqlite_cache._get(sub_directory=self._sub_directory, key=key)
+
+	def __setitem__(self, key, value):
+		self._sqlite_cache._set(sub_directory=self._sub_directory, key=key, value=value)
+
+	def __delitem__(self, key):
+		self._sqlite_cache._delete(sub_directory=self._sub_directory, key=key)
+
+
+class _PendingBodyStore:
+	"""
+	the body store of an SQLiteCache as its entries see it: new bodies wait with the pending writes of the cache
+	and are committed in the same transaction as the entries that point at them
+	"""
+	def __init__(self, sqlite_cache):
+		"""
+		:type sqlite_cache: SQLiteCache
+		"""
+		self._sqlite_cache = sqlite_cache
+
+	def put(self, owner, content):
+		"""
+		:rtype: str
+		:return: the hash of content
+		"""
+		body_hash = ResponseRecord.get_body_hash(content)
+		self._sqlite_cache._put_body(owner=owner, body_hash=body_hash, content=content)
+		return body_hash
+
+	def get_content(self, body_hash):
+		"""
+		:rtype: bytes
+		"""
+		return self._sqlite_cache._get_body_content(body_hash=body_hash)
+
+	def release(self, owners):
+		"""
+		:rtype: int
+		"""
+		return self._sqlite_cache._release_bodies(owners=owners)
+
+
+class SQLiteCache:
+	"""
+	a cache that keeps every entry in one indexed SQLite file instead of a file per entry,
+	it has the make_cached method of disk.Cache and can be passed as the cache of any client.
+	Writes are batched in transactions and the database is in WAL mode so readers do not wait for writers.
+	Response bodies are kept once per content in a BodyStore in the same file.
+	"""
+	def __init__(self, path, batch_size=64):
+		"""
+		:param str path: path of the database file, e.g., 'wikipedia_cache.sqlite'
+		:param int batch_size: number of writes kept in memory before they are committed in one transaction
+		"""
+		self._path = str(path)
+		self._batch_size = batch_size
+		self._local = threading.local()
+		self._lock = threading.Lock()
+		self._pending = {}
+		self._pending_bodies = {}
+		self._accesses = {}
+
+		directory = os.path.dirname(os.path.abspath(self._path))
+		os.makedirs(directory, exist_ok=True)
+		connection = self._connection
+		connection.execute('PRAGMA journal_mode=WAL')
+		with connection:
+			connection.execute(_CREATE_TABLE)
+			connection.execute(_CREATE_ACCESS_INDEX)
+		self._body_store = BodyStore.get(path=self._path)
+		_CACHES.add(self)
+
+	def __del__(self):
+		# the writes of a cache that is collected before the process exits are not lost
+		if hasattr(self, '_pending_bodies'):
+			self.flush()
+
+	def __getstate__(self):
+		self.flush()
+		return {'path': self._path, 'batch_size': self._batch_size}
+
+	def __setstate__(self, state):
+		self.__init__(path=state['path'], batch_size=state['batch_size'])
+
+	def __hashkey__(self):
+		return self.__class__.__name__, os.path.abspath(self._path)
+
+	def __repr__(self):
+		return f'<SQLiteCache:{self._path}>'
+
+	@property
+	def path(self):
+		"""
+		:rtype: str
+		"""
+		return self._path
+
+	@property
+	def _connection(self):
+		# sqlite3 connections cannot be shared between threads so each thread gets its own
+		connection = getattr(self._local, 'connection', None)
+		if connection is None:
+			connection = sqlite3.connect(self._path, timeout=60)
+			connection.execute('PRAGMA synchronous=NORMAL')
+			self._local.connection = connection
+		return connection
+
+	@property
+	def body_store(self):
+		"""
+		:rtype: BodyStore
+		"""
+		return self._body_store
+
+	@staticmethod
+	def _get_name(key):
+		return hash_object(key, base=32)
+
+	@staticmethod
+	def _get_owner(sub_directory, name):
+		return f'{sub_directory or "."}/{name}'
+
+	def _contains(self, sub_directory, key):
+		name = self._get_name(key)
+		with self._lock:
+			if (sub_directory, name) in self._pending:
+				return True
+		row = self._connection.execute(
+			'SELECT 1 FROM entries WHERE sub_directory = ? AND name = ?', (sub_directory, name)
+		).fetchone()
+		return row is not None
+
+	def _get(self, sub_directory, key):
+		name = self._get_name(key)
+		with self._lock:
+			pending = self._pending.get((sub_directory, name))
+		if pending is not None:
+			blob = pending[0]
+		else:
+			row = self._connection.execute(
+				'SELECT value FROM entries WHERE sub_directory = ? AND name = ?', (sub_directory, name)
+			).fetchone()
+			if row is None:
+				raise KeyError(key)
+			blob = row[0]
+
+		stored_key, value = pickle.loads(blob)
+		if stored_key != key:
+			raise ValueError(f'item:"{key}" and key:"{stored_key}" are different!')
+
+		with self._lock:
+			count = self._accesses.get((sub_directory, name), (None, 0))[1]
+			self._accesses[(sub_directory, name)] = (time.time(), count + 1)
+			should_flush = len(self._accesses) >= self._batch_size
+		if should_flush:
+			self.flush()
+		return value
+
+	def _set(self, sub_directory, key, value):
+		blob = pickle.dumps((key, value), protocol=pickle.HIGHEST_PROTOCOL)
+		with self._lock:
+			self._pending[(sub_directory, self._get_name(key))] = (blob, time.time())
+			should_flush = len(self._pending) >= self._batch_size
+		if should_flush:
+			self.flush()
+
+	def _put_body(self, owner, body_hash, content):
+		with self._lock:
+			self._pending_bodies[owner] = (body_hash, content)
+
+	def _get_body_content(self, body_hash):
+		with self._lock:
+			for pending_hash, content in self._pending_bodies.values():
+				if pending_hash == body_hash:
+					return content
+		return self._body_store.get_content(body_hash)
+
+	def _release_bodies(self, owners):
+		owners = list(owners)
+		with self._lock:
+			for owner in owners:
+				self._pending_bodies.pop(owner, None)
+		return self._body_store.release(owners=owners)
+
+	def _delete(self, sub_directory, key):
+		name = self._get_name(key)
+		with self._lock:
+			pending = self._pending.pop((sub_directory, name), None)
+		with self._connection as connection:
+			cursor = connection.execute(
+				'DELETE FROM entries WHERE sub_directory = ? AND name = ?', (sub_directory, name)
+			)
+		if pending is None and cursor.rowcount == 0:
+			raise KeyError(f'{key} does not exist in cache!')
+
+	def flush(self):
+		"""
+		commits the pending writes, with the bodies they point at, and recorded reads in one transaction
+		"""
+		with self._lock:
+			pending, self._pending = self._pending, {}
+			pending_bodies, self._pending_bodies = self._pending_bodies, {}
+			accesses, self._accesses = self._accesses, {}
+		if not pending and not pending_bodies and not accesses:
+			return
+
+		with self._connection as connection:
+			self._body_store.add(
+				connection=connection,
+				bodies=[(owner, body_hash, content) for owner, (body_hash, content) in pending_bodies.items()]
+			)
+			connection.executemany(
+				'INSERT OR REPLACE INTO entries (sub_directory, name, value, size, written_at, last_access, num_accesses) '
+				'VALUES (?, ?, ?, ?, ?, ?, 0)',
+				[
+					(sub_directory, name, blob, len(blob), written_at, written_at)
+					for (sub_directory, name), (blob, written_at) in pending.items()
+				]
+			)
+			connection.executemany(
+				'UPDATE entries SET last_access = MAX(last_access, ?), num_accesses = num_accesses + ? '
+				'WHERE sub_directory = ? AND name = ?',
+				[
+					(last_access, count, sub_directory, name)
+					for (sub_directory, name), (last_access, count) in accesses.items()
+				]
+			)
+
+	def get_store(self, sub_directory=None, function=None, id=None):
+		"""
+		:rtype: DeduplicatedStore
+		"""
+		return DeduplicatedStore(
+			store=_SQLiteStore(sqlite_cache=self, sub_directory=sub_directory),
+			body_store=_PendingBodyStore(sqlite_cache=self), owner_prefix=sub_directory or '.'
+		)
+
+	def make_cached(
+			self, function, id=None, condition_function=None, sub_directory=None, expire_in=None, revalidate=None,
+			single_flight=None, key_function=None, raw_key_function=None, **kwargs
+	):
+		"""
+		:param callable function: function to be cached
+		:param int or str id: a unique identifier for function
+		:param callable condition_function: a function that determines if the result is worthy of caching
+		:param str sub_directory: name of a group of entries inside the database, optional
+		:param NoneType or str expire_in: if provided the cached value will expire, e.g., '2 days', '6 months'
+		:param callable or NoneType revalidate: called as revalidate(expired_result, *args, **kwargs) instead of
+		function when a cached result has expired
+		:param SingleFlight or NoneType single_flight: coalesces identical calls that miss the cache at the same time
+		:param callable or NoneType key_function: turns the arguments of a call into the canonical keyword arguments of its key
+		:param callable or NoneType raw_key_function: turns the arguments of a call into the args and kwargs its key had
+		before key_function, to find entries saved under those keys
+		:rtype: CachedFunction
+		"""
+		return CachedFunction(
+			function=function, cache=self.get_store(sub_directory=sub_directory, function=function, id=id),
+			id=id, condition_function=condition_function, expire_in=expire_in, revalidate=revalidate,
+			single_flight=single_flight, key_function=key_function, raw_key_function=raw_key_function
+		)
+
+	@property
+	def statistics(self):
+		"""
+		:rtype: dict
+		"""
+		self.flush()
+		rows = self._connection.execute(
+			'SELECT sub_directory, COUNT(*), SUM(size) FROM entries GROUP BY sub_directory'
+		).fetchall()
+		result = {sub_directory: {'entries': entries, 'bytes': size} for sub_directory, entries, size in rows}
+		result['_bodies'] = self._body_store.statistics
+		return result
+
+	def evict(self, max_bytes=None, max_entries=None, policy='lru'):
+		"""
+		deletes the least recently (lru) or least frequently (lfu) used entries until the database is within budget,
+		each entry counts its share of the body it points at
+		:rtype: dict
+		"""
+		self.flush()
+		order = 'num_accesses, last_access' if policy == 'lfu' else 'last_access'
+		shares = self._body_store.get_shares()
+		connection = self._connection
+		num_entries, num_bytes = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+		num_bytes += self._body_store.statistics['bytes']
+		evicted = []
+		cursor = connection.execute(f'SELECT sub_directory, name, size FROM entries ORDER BY {order}')
+		for sub_directory, name, size in cursor:
+			within_bytes = max_bytes is None or num_bytes <= max_bytes
+			within_entries = max_entries is None or num_entries <= max_entries
+			if within_bytes and within_entries:
+				break
+			evicted.append((sub_directory, name))
+			num_entries -= 1
+			num_bytes -= size + shares.get(self._get_owner(sub_directory=sub_directory, name=name), 0)
+		cursor.close()
+		return self._delete_entries(entries=evicted)
+
+	def _delete_entries(self, entries):
+		with self._connection as connection:
+			connection.executemany('DELETE FROM entries WHERE sub_directory = ? AND name = ?', entries)
+		bodies_deleted = self._body_store.release(
+			owners=[self._get_owner(sub_directory=sub_directory, name=name) for sub_directory, name in entries]
+		)
+		return {'entries_deleted': len(entries), 'bodies_deleted': bodies_deleted}
+
+	def purge_expired(self, expire_in):
+		"""
+		deletes entries written longer ago than expire_in, e.g., '30 days'
+		:rtype: dict
+		"""
+		self.flush()
+		value, unit = expire_in.split()
+		seconds = float(value) * _SECONDS_PER_UNIT[unit.rstrip('s')]
+		expired = self._connection.execute(
+			'SELECT sub_directory, name FROM entries WHERE written_at < ?', (time.time() - seconds,)
+		).fetchall()
+		return self._delete_entries(entries=expired)
+
+	def compact(self):
+		"""
+		deletes bodies no entry points at and returns the space of deleted entries to the file system
+		"""
+		self.flush()
+		live_owners = {
+			self._get_owner(sub_directory=sub_directory, name=name)
+			for sub_directory, name in self._connection.execute('SELECT sub_directory, name FROM entries')
+		}
+		self._body_store.collect(live_owners=live_owners)
+		self._connection.execute('VACUUM')
+
@@ -0,0 +1,80 @@
+from slytherin.hash import hash_object
+import functools
+import threading
+
+
+class _Call:
+	def __init__(self):
+		self.event = threading.Event()
+		self.result = None
+		self.error = None
+
+
+class SingleFlight:
+	"""
+	coalesces identical calls that are in flight at the same time:
+	the first caller runs the function and the others wait for its result instead of running it again
+	"""
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._calls = {}
+		self._stats = {'calls': 0, 'coalesced': 0}
+
+	def __getstate__(self):
+		return {}
+
+	def __setstate__(self, state):
+		self.__init__()
+
+	@property
+	def statistics(self):
+		"""
+		:rtype: dict[str, int]
+		"""
+		with self._lock:
+			return {**self._stats, 'in_flight': len(self._calls)}
+
+	def do(self, key, function, *args, **kwargs):
+		"""
+		:param key: calls with equal keys are coalesced, it can hold dictionaries and lists
+		:param callable function: called with args and kwargs by the first caller only
+		:return: the result of function, or raises its error, for every caller
+		"""
+		hash_key = hash_object(key)
+		with self._lock:
+			self._stats['calls'] += 1
+			call = self._calls.get(hash_key)
+			is_leader = call is None
+			if is_leader:
+				call = _Call()
+				self._calls[hash_key] = call
+			else:
+				self._stats['coalesced'] += 1
+
+		if is_leader:
+			try:
+				call.result = function(*args, **kwargs)
+			except BaseException as error:
+				call.error = error
+				raise
+			finally:
+				with self._lock:
+					del self._calls[hash_key]
+				call.event.set()
+			return call.result
+
+		call.event.wait()
+		if call.error is not None:
+			raise call.error
+		return call.result
+
+	def make_coalesced(self, function, id=None):
+		"""
+		:param callable function: function whose identical concurrent calls should be coalesced
+		:param int or str id: a unique identifier for function
+		:rtype: callable
+		"""
+		@functools.wraps(function)
+		def wrapper(*args, **kwargs):
+			return self.do((id, function.__name__, args, kwargs), function, *args, **kwargs)
+		return wrapper
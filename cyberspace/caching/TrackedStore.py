@@ -0,0 +1,189 @@
+from slytherin.hash import hash_object
+from collections import defaultdict
+import threading
+import weakref
+import atexit
+import time
+import os
+
+
+ACCESS_LOG_FILE_NAME = '_access.log'
+# a process that uses a cache directory marks it with a file named after its id, removed when it exits
+IN_USE_FILE_PREFIX = '_in_use_'
+
+_STORES = weakref.WeakSet()
+_IN_USE_PATHS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_access_log_path(directory):
+	"""
+	:type directory: str
+	:rtype: str
+	"""
+	return os.path.join(directory, ACCESS_LOG_FILE_NAME)
+
+
+def read_access_log(directory):
+	"""
+	reads the access log of a cache directory
+	:type directory: str
+	:rtype: dict[str, list]
+	:return: [last access timestamp, number of accesses] of each file name (without extension) that was read
+	"""
+	accesses = {}
+	path = get_access_log_path(directory=directory)
+	if not os.path.exists(path):
+		return accesses
+
+	with open(path, 'r') as file:
+		for line in file:
+			try:
+				name, timestamp, count = line.split()
+				timestamp, count = float(timestamp), int(count)
+			except ValueError:
+				continue
+			if name in accesses:
+				accesses[name][0] = max(accesses[name][0], timestamp)
+				accesses[name][1] += count
+			else:
+				accesses[name] = [timestamp, count]
+	return accesses
+
+
+def _is_running(pid):
+	if os.name == 'nt':
+		# on windows os.kill ends the process instead of checking it
+		return True
+	try:
+		os.kill(pid, 0)
+	except ProcessLookupError:
+		return False
+	except PermissionError:
+		return True
+	return True
+
+
+def get_users(directory):
+	"""
+	the running processes that use a cache directory, disk.Cache saves the key index of the directory when they exit
+	:type directory: str
+	:rtype: list[int]
+	:return: the process ids
+	"""
+	pids = []
+	if not os.path.isdir(directory):
+		return pids
+	for file_name in os.listdir(directory):
+		if file_name.startswith(IN_USE_FILE_PREFIX):
+			try:
+				pid = int(file_name[len(IN_USE_FILE_PREFIX):])
+			except ValueError:
+				continue
+			# a process that crashed leaves its file behind
+			if _is_running(pid):
+				pids.append(pid)
+	return pids
+
+
+def _mark_in_use(directory):
+	pid = os.getpid()
+	path = os.path.join(directory, f'{IN_USE_FILE_PREFIX}{pid}')
+	with _REGISTRY_LOCK:
+		if path in _IN_USE_PATHS:
+			return
+		_IN_USE_PATHS[path] = pid
+	if os.path.isdir(directory):
+		open(path, 'a').close()
+
+
+def _exit():
+	for store in list(_STORES):
+		store.flush()
+	for path, pid in list(_IN_USE_PATHS.items()):
+		# a forked process does not unmark the directories of its parent
+		if pid == os.getpid() and os.path.exists(path):
+			os.remove(path)
+
+
+# registered once, when the package is imported, which is usually before any disk.Cache registers saving its keys
+atexit.register(_exit)
+
+
+class TrackedStore:
+	"""
+	a disk.Cache that records when and how often each entry is read, in an append-only log in its directory,
+	so that CacheMaintainer can evict the least recently or least frequently used entries
+	"""
+	def __init__(self, cache, flush_every=1000):
+		"""
+		:param disk.Cache cache: the cache of one directory
+		:param int flush_every: number of reads kept in memory before they are appended to the log
+		"""
+		self._cache = cache
+		self._flush_every = flush_every
+		self._directory = cache.path.path
+		self._accesses = defaultdict(lambda: [0.0, 0])
+		self._num_pending = 0
+		self._lock = threading.Lock()
+		# only a weak reference is kept, so stores that are no longer used can be collected
+		_STORES.add(self)
+		_mark_in_use(self._directory)
+
+	def __del__(self):
+		# the reads of a store that is collected before the process exits are not lost
+		if hasattr(self, '_accesses'):
+			self.flush()
+
+	def __getstate__(self):
+		self.flush()
+		return {'cache': self._cache, 'flush_every': self._flush_every}
+
+	def __setstate__(self, state):
+		self.__init__(cache=state['cache'], flush_every=state['flush_every'])
+
+	@property
+	def cache(self):
+		"""
+		:rtype: disk.Cache
+		"""
+		return self._cache
+
+	def _record(self, key):
+		name = hash_object(key, base=32)
+		with self._lock:
+			access = self._accesses[name]
+			access[0] = time.time()
+			access[1] += 1
+			self._num_pending += 1
+			should_flush = self._num_pending >= self._flush_every
+		if should_flush:
+			self.flush()
+
+	def flush(self):
+		"""
+		appends the reads recorded in memory to the access log
+		"""
+		with self._lock:
+			accesses, self._accesses = self._accesses, defaultdict(lambda: [0.0, 0])
+			self._num_pending = 0
+		if not accesses or not os.path.isdir(self._directory):
+			return
+
+		lines = ''.join(f'{name} {timestamp} {count}\n' for name, (timestamp, count) in accesses.items())
+		with open(get_access_log_path(directory=self._directory), 'a') as file:
+			file.write(lines)
+
+	def __contains__(self, key):
+		return key in self._cache
+
+	def __getitem__(self, key):
+		value = self._cache[key]
+		self._record(key)
+		return value
+
+	def __setitem__(self, key, value):
+		self._cache[key] = value
+
+	def __delitem__(self, key):
+		del self._cache[key]
@@ -0,0 +1,11 @@
+from .CachedFunction import CachedFunction
+from .make_cached import make_cached
+from .get_store import get_store
+from .MemoryCache import MemoryCache
+from .SingleFlight import SingleFlight
+from .TrackedStore import TrackedStore
+from .CacheMaintainer import CacheMaintainer, CacheEntry, CacheInUseError
+from .SQLiteCache import SQLiteCache
+from .get_cache import get_cache
+from .BodyStore import BodyStore
+from .DeduplicatedStore import DeduplicatedStore
@@ -0,0 +1,31 @@
+from argparse import ArgumentParser
+from pprint import pprint
+
+from .CacheMaintainer import CacheMaintainer
+
+
+def main(arguments=None):
+	"""
+	python -m cyberspace.caching internet_cache --max-bytes 50000000000 --policy lfu --expire-in "90 days"
+	"""
+	parser = ArgumentParser(description='purges, evicts and compacts a cache directory')
+	parser.add_argument('path', help='directory of the cache')
+	parser.add_argument('--max-bytes', type=int, default=None)
+	parser.add_argument('--max-entries', type=int, default=None)
+	parser.add_argument('--policy', choices=['lru', 'lfu'], default='lru')
+	parser.add_argument('--expire-in', default=None, help='e.g., "30 days"')
+	parser.add_argument(
+		'--force', action='store_true', help='run even if a running process uses the cache and would undo the compaction'
+	)
+	parsed = parser.parse_args(arguments)
+
+	maintainer = CacheMaintainer(
+		path=parsed.path, max_bytes=parsed.max_bytes, max_entries=parsed.max_entries, policy=parsed.policy,
+		expire_in=parsed.expire_in
+	)
+	pprint(maintainer.run(force=parsed.force))
+	pprint(maintainer.statistics)
+
+
+if __name__ == '__main__':
+	main()
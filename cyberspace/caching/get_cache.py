@@ -0,0 +1,21 @@
+from disk import Cache, Path
+
+from .SQLiteCache import SQLiteCache
+
+
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+
+def get_cache(cache):
+	"""
+	turns a path into a cache: an SQLiteCache if it ends with .sqlite, .sqlite3 or .db and a disk.Cache otherwise,
+	anything else is returned as it is
+	:type cache: str or Path or Cache or SQLiteCache or MemoryCache or NoneType
+	"""
+	if isinstance(cache, Path):
+		cache = cache.path
+	if isinstance(cache, str):
+		if cache.lower().endswith(SQLITE_EXTENSIONS):
+			return SQLiteCache(path=cache)
+		return Cache(path=cache)
+	return cache
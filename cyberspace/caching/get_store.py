@@ -0,0 +1,32 @@
+from disk import Cache
+import os
+
+from .TrackedStore import TrackedStore
+from .BodyStore import BodyStore, BODY_STORE_FILE_NAME
+from .DeduplicatedStore import DeduplicatedStore
+
+
+def get_store(cache, sub_directory=None, function=None, id=None):
+	"""
+	the object that holds the results of a cached function in cache
+	:type cache: Cache
+	:param str or NoneType sub_directory: name of a sub directory inside the cache directory, optional
+	:param callable or NoneType function: the function whose results are stored
+	:param int or str id: a unique identifier for function
+	:return: an object that supports `in`, `[]`, `[]=` and `del` with the keys of a CachedFunction,
+	reads from disk caches are recorded for CacheMaintainer and response bodies are kept once in the cache directory
+	"""
+	if not isinstance(cache, Cache):
+		return cache.get_store(sub_directory=sub_directory, function=function, id=id)
+
+	if sub_directory is None:
+		store = cache
+	else:
+		# disk.Cache creates and registers the sub cache as one of its children
+		store = cache.make_cached(function=function or get_store, id=id, sub_directory=sub_directory).cache
+
+	root = cache.path.path
+	return DeduplicatedStore(
+		store=TrackedStore(cache=store), body_store=BodyStore.get(path=os.path.join(root, BODY_STORE_FILE_NAME)),
+		owner_prefix=os.path.relpath(store.path.path, root)
+	)
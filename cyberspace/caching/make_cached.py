@@ -0,0 +1,39 @@
+from disk import Cache
+
+from .CachedFunction import CachedFunction
+from .get_store import get_store
+
+
+def make_cached(
+		cache, function, id=None, condition_function=None, sub_directory=None, expire_in=None, revalidate=None,
+		single_flight=None, key_function=None, raw_key_function=None
+):
+	"""
+	makes a cached version of function the same way cache.make_cached does but
+	returns a CachedFunction when cache is a disk.Cache so that hits can be told apart from misses
+	:param Cache or MemoryCache cache: a disk.Cache or any cache of this package
+	:param callable function: function to be cached
+	:param int or str id: a unique identifier for function
+	:param callable condition_function: a function that determines if the result is worthy of caching
+	:param str sub_directory: name of a sub directory inside the cache directory to be used, optional
+	:param NoneType or str expire_in: if provided the cached value will expire, e.g., '2 days', '6 months'
+	:param callable or NoneType revalidate: called as revalidate(expired_result, *args, **kwargs) instead of
+	function when a cached result has expired
+	:param SingleFlight or NoneType single_flight: coalesces identical calls that miss the cache at the same time
+	:param callable or NoneType key_function: turns the arguments of a call into the canonical keyword arguments of its key
+	:param callable or NoneType raw_key_function: turns the arguments of a call into the args and kwargs its key had
+	before key_function, to find entries saved under those keys
+	:rtype: CachedFunction
+	"""
+	if not isinstance(cache, Cache):
+		return cache.make_cached(
+			id=id, function=function, condition_function=condition_function,
+			sub_directory=sub_directory, expire_in=expire_in, revalidate=revalidate, single_flight=single_flight,
+			key_function=key_function, raw_key_function=raw_key_function
+		)
+
+	return CachedFunction(
+		function=function, cache=get_store(cache=cache, sub_directory=sub_directory, function=function, id=id),
+		id=id, condition_function=condition_function, expire_in=expire_in, revalidate=revalidate,
+		single_flight=single_flight, key_function=key_function, raw_key_function=raw_key_function
+	)
@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import functools
+
+
+def _check(function, kwargs):
+	"""
+	:return: (result, None) for a cached call, otherwise (None, the function to call with kwargs)
+	"""
+	check = getattr(function, 'check', None)
+	if check is None:
+		return None, function
+
+	checked = check(**kwargs)
+	if checked[0] == 'hit':
+		return checked[1], None
+	# the call is not read from the cache and counted a second time
+	return None, functools.partial(function.call_after_check, checked)
+
+
+def fetch_many(function, kwargs_list, max_workers=8, ordered=True):
+	"""
+	calls function once for each of the kwargs in kwargs_list in a pool of threads,
+	if function is a CachedFunction the cached results are returned right away without taking a thread
+	:param callable function: usually a client's request function
+	:param iterable[dict] kwargs_list: keyword arguments of each call
+	:param int max_workers: maximum number of calls that run at the same time
+	:param bool ordered: if True results are yielded in the order of kwargs_list, otherwise as they complete
+	:rtype: generator of tuple[dict, object]
+	:return: (kwargs, result) for each call, an error raised by a call is raised when its result is reached
+	"""
+	max_pending = max_workers * 2
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		if ordered:
+			queue = deque()
+			for kwargs in kwargs_list:
+				result, call = _check(function=function, kwargs=kwargs)
+				if call is None:
+					queue.append((kwargs, None, result))
+				else:
+					queue.append((kwargs, executor.submit(call, **kwargs), None))
+
+				while queue and (queue[0][1] is None or queue[0][1].done() or len(queue) > max_pending):
+					kwargs, future, result = queue.popleft()
+					yield kwargs, result if future is None else future.result()
+
+			while queue:
+				kwargs, future, result = queue.popleft()
+				yield kwargs, result if future is None else future.result()
+
+		else:
+			pending = {}
+			for kwargs in kwargs_list:
+				result, call = _check(function=function, kwargs=kwargs)
+				if call is None:
+					yield kwargs, result
+					continue
+
+				pending[executor.submit(call, **kwargs)] = kwargs
+				if len(pending) >= max_pending:
+					done, _ = wait(pending, return_when=FIRST_COMPLETED)
+					for future in done:
+						yield pending.pop(future), future.result()
+
+			while pending:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					yield pending.pop(future), future.result()
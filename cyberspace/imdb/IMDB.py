@@ -1,13 +1,19 @@
 from imdb import IMDb
 from imdb.Movie import Movie
 
+from ..caching import get_cache
+
 _IMDb = IMDb()
 
 
 class IMDB:
 	def __init__(self, cache=None):
+		"""
+		:param str or disk.Cache or cyberspace.caching.SQLiteCache or NoneType cache: a path ending with .sqlite
+		selects an SQLiteCache
+		"""
 		self._imdb = _IMDb
-		self._cache = cache
+		self._cache = get_cache(cache)
 		if self._cache:
 			self.search = self._cache.make_cached(
 				id='imdb_search',
@@ -1,37 +1,69 @@
 from .SearchResults import BingSearchResults, YahooSearchResults
 
-from chronometry import MeasurementSet, get_elapsed, get_now
+from ..transport import TRANSPORT, ResponseRecord, get_canonical_url
+from ..caching import make_cached, get_cache, SingleFlight
+
+from chronometry import MeasurementSet
 
-import requests
 from requests.utils import quote
 import warnings
-import time
 
 
 class SearchEngine:
-	def __init__(self, rate_limit_wait_seconds=0.01, cache=None):
+	def __init__(self, rate_limit_wait_seconds=0.01, cache=None, transport=None):
 		"""
 		:param float rate_limit_wait_seconds: wait between requests
-		:param disk.cache_class.Cache cache:
+		:param str or disk.Cache or cyberspace.caching.SQLiteCache or cyberspace.caching.MemoryCache or NoneType cache:
+		a path ending with .sqlite selects an SQLiteCache
+		:param cyberspace.transport.Transport or NoneType transport: the shared transport is used if not provided
 		"""
 		self._rate_limit_wait = rate_limit_wait_seconds
-		self._rate_limit_last_call = None
+		self._transport = transport or TRANSPORT
 
-		self._cache = cache
+		self._cache = get_cache(cache)
+		self._single_flight = SingleFlight()
 
 		if self._cache:
-			self.request = self._cache.make_cached(
+			self.request = make_cached(
+				cache=self._cache,
 				id='search_engine_request_function',
 				function=self._request,
 				condition_function=self._request_result_valid,
-				sub_directory='request'
+				sub_directory='request',
+				single_flight=self._single_flight,
+				key_function=self._get_canonical_request
 			)
 
 		else:
-			self.request = self._request
+			self.request = self._single_flight.make_coalesced(
+				function=self._request, id='search_engine_request_function'
+			)
+		self._transport.metrics.add_cached_function(self.request, name='search_engine_request_function')
 
 		self._function_durations = MeasurementSet()
 
+	@property
+	def single_flight(self):
+		"""
+		:rtype: SingleFlight
+		"""
+		return self._single_flight
+
+	@property
+	def transport(self):
+		"""
+		:rtype: cyberspace.transport.Transport
+		"""
+		return self._transport
+
+	@property
+	def metrics(self):
+		"""
+		http metrics of the transport and hit ratios of the cached requests
+		:rtype: cyberspace.transport.Metrics
+		"""
+		return self._transport.metrics
+
 	@staticmethod
 	def get_bing_search_url(query, site=None):
 		"""
@@ -76,6 +108,17 @@ class SearchEngine:
 			warnings.warn(f'response status code: {response.status_code}')
 			return False
 
+	@property
+	def _requests_per_second(self):
+		if self._rate_limit_wait:
+			return 1 / self._rate_limit_wait
+		else:
+			return None
+
+	@staticmethod
+	def _get_canonical_request(url=None, header=None):
+		return {'url': get_canonical_url(url), 'header': header}
+
 	def _request(self, url=None, header=None):
 		"""
 		:type parameters: dict
@@ -86,14 +129,4 @@ class SearchEngine:
 
 		# headers = {'User-Agent': self._user_agent}
 
-		if self._rate_limit_wait and self._rate_limit_last_call:
-			wait_time = self._rate_limit_wait - get_elapsed(start=self._rate_limit_last_call, unit='s')
-			if wait_time > 0:
-				time.sleep(wait_time)
-		with warnings.catch_warnings():
-			warnings.filterwarnings('ignore')
-			result = requests.get(url, verify=False)
-
-		if self._rate_limit_wait:
-			self._rate_limit_last_call = get_now()
-		return result
+		return ResponseRecord.from_response(self.transport.get(url, verify=False, rate=self._requests_per_second))
@@ -0,0 +1,115 @@
+from requests import Request
+import threading
+import pickle
+import os
+
+from .canonicalize import get_canonical_url
+
+
+class Archive:
+	"""
+	responses kept by request in a single append-only file of pickled ResponseRecords, whose bodies are compressed,
+	a request recorded more than once keeps its last response.
+	Only whole answers are kept: the key has no headers, so a 304 Not Modified, which has no body,
+	would otherwise be replayed for the unconditional request
+	"""
+	CONDITIONAL_HEADERS = ('if-none-match', 'if-modified-since')
+
+	def __init__(self, path):
+		"""
+		:param str path: the archive file, created when the first response is added
+		"""
+		self._path = str(path)
+		self._entries = {}
+		self._file = None
+		self._lock = threading.Lock()
+		self._load()
+
+	def __repr__(self):
+		return f'<Archive {self._path} entries={len(self._entries)}>'
+
+	@property
+	def path(self):
+		return self._path
+
+	def _load(self):
+		if not os.path.exists(self._path):
+			return
+		with open(self._path, 'rb') as file:
+			while True:
+				try:
+					key, record, elapsed = pickle.load(file)
+				except EOFError:
+					break
+				except (pickle.UnpicklingError, ValueError, TypeError):
+					# the last entry of an archive whose recording was interrupted
+					break
+				# archives recorded before 304s were left out can have them
+				if record.status_code != 304:
+					self._entries[key] = (record, elapsed)
+
+	@staticmethod
+	def get_key(url, params=None):
+		"""
+		the canonical url of a get request with its query parameters
+		:type url: str
+		:type params: dict or NoneType
+		:rtype: str
+		"""
+		if params:
+			url = Request('GET', url, params=params).prepare().url
+		return get_canonical_url(url)
+
+	@classmethod
+	def should_add(cls, record, headers=None):
+		"""
+		whether the response to a request is a whole answer that can be replayed for its key
+		:type record: ResponseRecord
+		:param dict or NoneType headers: the headers of the request
+		:rtype: bool
+		"""
+		if record.status_code == 304:
+			return False
+		return not any(name.lower() in cls.CONDITIONAL_HEADERS for name in (headers or {}))
+
+	def __contains__(self, key):
+		return key in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def keys(self):
+		return self._entries.keys()
+
+	def get(self, key):
+		"""
+		:type key: str
+		:rtype: tuple[ResponseRecord, float] or NoneType
+		:return: the response and the seconds it took when it was recorded
+		"""
+		return self._entries.get(key)
+
+	def add(self, key, record, elapsed):
+		"""
+		:type key: str
+		:type record: ResponseRecord
+		:param float elapsed: seconds the response took
+		"""
+		if record.status_code == 304:
+			return
+		data = pickle.dumps((key, record, elapsed), protocol=pickle.HIGHEST_PROTOCOL)
+		with self._lock:
+			if self._file is None:
+				directory = os.path.dirname(self._path)
+				if directory:
+					os.makedirs(directory, exist_ok=True)
+				self._file = open(self._path, 'ab')
+			self._file.write(data)
+			self._file.flush()
+			self._entries[key] = (record, elapsed)
+
+	def close(self):
+		with self._lock:
+			if self._file is not None:
+				self._file.close()
+				self._file = None
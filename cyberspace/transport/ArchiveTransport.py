@@ -0,0 +1,89 @@
+from requests.exceptions import RequestException
+import time
+
+from .Transport import Transport
+from .RateLimiter import RateLimiter
+from .ResponseRecord import ResponseRecord
+from .Archive import Archive
+
+
+class ReplayMissError(RequestException):
+	pass
+
+
+class ArchiveTransport(Transport):
+	"""
+	a transport that records every response it receives into an archive,
+	or replays the archived responses without touching the network
+	"""
+	RECORD = 'record'
+	REPLAY = 'replay'
+
+	def __init__(self, path, mode='replay', latency=None, **kwargs):
+		"""
+		:param str path: the archive file
+		:param str mode: 'record' sends requests and archives their responses, 'replay' answers from the archive
+		and raises ReplayMissError for requests that are not in it
+		:param float or str or NoneType latency: when replaying, seconds each response takes,
+		'recorded' for the time it took when it was recorded, or None to answer at once
+		:param kwargs: the arguments of Transport, a replaying transport has its own rate limiter if not provided
+		"""
+		if mode not in (self.RECORD, self.REPLAY):
+			raise ValueError(f'mode should be "{self.RECORD}" or "{self.REPLAY}", not "{mode}"!')
+		if mode == self.REPLAY and kwargs.get('rate_limiter') is None:
+			kwargs['rate_limiter'] = RateLimiter()
+		self._path = str(path)
+		self._mode = mode
+		self._latency = latency
+		self._archive = Archive(path=self._path)
+		super().__init__(**kwargs)
+
+	_STATE_ATTRIBUTES_ = Transport._STATE_ATTRIBUTES_ + ['_path', '_mode', '_latency']
+
+	def __setstate__(self, state):
+		super().__setstate__(state)
+		self._archive = Archive(path=self._path)
+
+	def __repr__(self):
+		return f'<ArchiveTransport {self._mode} {self._path} entries={len(self._archive)}>'
+
+	@property
+	def archive(self):
+		"""
+		:rtype: Archive
+		"""
+		return self._archive
+
+	@property
+	def mode(self):
+		return self._mode
+
+	def get(self, url, params=None, rate=None, burst=None, **kwargs):
+		if self._mode == self.REPLAY:
+			# the default rates of the clients are for live hosts, a snapshot is read as fast as it can be
+			rate = burst = None
+		return super().get(url, params=params, rate=rate, burst=burst, **kwargs)
+
+	def _send(self, url, params, headers, verify, **kwargs):
+		key = self._archive.get_key(url=url, params=params)
+		if self._mode == self.REPLAY:
+			entry = self._archive.get(key)
+			if entry is None:
+				raise ReplayMissError(f'no archived response for url: {key}')
+			record, elapsed = entry
+			delay = elapsed if self._latency == 'recorded' else self._latency
+			if delay:
+				time.sleep(delay)
+			return record.to_response(elapsed=delay or 0.0)
+
+		start = time.monotonic()
+		response = super()._send(url=url, params=params, headers=headers, verify=verify, **kwargs)
+		record = ResponseRecord.from_response(response)
+		# a revalidation is answered from the archive with the whole response instead
+		if self._archive.should_add(record=record, headers=headers):
+			self._archive.add(key=key, record=record, elapsed=time.monotonic() - start)
+		return response
+
+	def close(self):
+		super().close()
+		self._archive.close()
@@ -0,0 +1,183 @@
+from requests.exceptions import ConnectionError
+import threading
+import time
+
+from .get_host import get_host
+
+
+class CircuitOpenError(ConnectionError):
+	pass
+
+
+def _to_host(url_or_host):
+	return get_host(url_or_host) if '://' in url_or_host else url_or_host.lower()
+
+
+class _Circuit:
+	def __init__(self):
+		self.state = 'closed'
+		self.consecutive_failures = 0
+		self.opened_at = None
+		self.probes_in_flight = 0
+		self.times_opened = 0
+		self.rejected = 0
+
+
+class CircuitBreaker:
+	"""
+	keeps a circuit per host: a circuit opens after failure_threshold consecutive failures and requests to the host
+	fail fast with CircuitOpenError until cool_down seconds have passed, then up to half_open_probes requests are let
+	through (half-open) and the circuit closes if they succeed or opens again if one fails
+	"""
+	CLOSED = 'closed'
+	OPEN = 'open'
+	HALF_OPEN = 'half_open'
+
+	def __init__(self, failure_threshold=5, cool_down=30, half_open_probes=1):
+		"""
+		:param int failure_threshold: number of consecutive failures that opens a circuit
+		:param float cool_down: seconds an open circuit rejects requests before it lets a probe through
+		:param int half_open_probes: number of probes allowed at once while half-open
+		"""
+		self._failure_threshold = failure_threshold
+		self._cool_down = cool_down
+		self._half_open_probes = half_open_probes
+		self._circuits = {}
+		self._lock = threading.Lock()
+
+	def __reduce__(self):
+		# the shared circuit breaker stays shared after unpickling
+		if self is CIRCUIT_BREAKER:
+			return 'CIRCUIT_BREAKER'
+		else:
+			return super().__reduce__()
+
+	def __getstate__(self):
+		return {
+			'failure_threshold': self._failure_threshold, 'cool_down': self._cool_down,
+			'half_open_probes': self._half_open_probes
+		}
+
+	def __setstate__(self, state):
+		self.__init__(**state)
+
+	def __repr__(self):
+		return f'<CircuitBreaker failure_threshold={self._failure_threshold} cool_down={self._cool_down}>'
+
+	def _get_circuit(self, host):
+		if host not in self._circuits:
+			self._circuits[host] = _Circuit()
+		return self._circuits[host]
+
+	def _update(self, circuit):
+		if circuit.state == self.OPEN and time.monotonic() - circuit.opened_at >= self._cool_down:
+			circuit.state = self.HALF_OPEN
+			circuit.probes_in_flight = 0
+
+	def get_state(self, url):
+		"""
+		:param str url: a url or a host
+		:rtype: str
+		:return: 'closed', 'open' or 'half_open'
+		"""
+		host = _to_host(url)
+		with self._lock:
+			if host not in self._circuits:
+				return self.CLOSED
+			circuit = self._circuits[host]
+			self._update(circuit)
+			return circuit.state
+
+	def is_available(self, url):
+		"""
+		whether a request to the host of url would be let through now
+		:type url: str
+		:rtype: bool
+		"""
+		host = _to_host(url)
+		with self._lock:
+			if host not in self._circuits:
+				return True
+			circuit = self._circuits[host]
+			self._update(circuit)
+			if circuit.state == self.OPEN:
+				return False
+			if circuit.state == self.HALF_OPEN:
+				return circuit.probes_in_flight < self._half_open_probes
+			return True
+
+	def before_request(self, url):
+		"""
+		lets a request through or raises CircuitOpenError
+		:type url: str
+		"""
+		host = get_host(url)
+		with self._lock:
+			circuit = self._get_circuit(host)
+			self._update(circuit)
+			if circuit.state == self.CLOSED:
+				return
+			if circuit.state == self.HALF_OPEN and circuit.probes_in_flight < self._half_open_probes:
+				circuit.probes_in_flight += 1
+				return
+			circuit.rejected += 1
+			retry_in = max(0.0, self._cool_down - (time.monotonic() - circuit.opened_at))
+		raise CircuitOpenError(f'circuit of {host} is {circuit.state}, retry in {retry_in:.1f} seconds')
+
+	def record(self, url, success):
+		"""
+		records the outcome of a request that before_request let through
+		:type url: str
+		:param bool or NoneType success: None if the outcome says nothing about the health of the host
+		"""
+		with self._lock:
+			circuit = self._get_circuit(get_host(url))
+			if circuit.state == self.HALF_OPEN:
+				circuit.probes_in_flight = max(0, circuit.probes_in_flight - 1)
+			if success is None:
+				return
+
+			if success:
+				circuit.consecutive_failures = 0
+				circuit.state = self.CLOSED
+			else:
+				circuit.consecutive_failures += 1
+				threshold_reached = circuit.consecutive_failures >= self._failure_threshold
+				if circuit.state == self.HALF_OPEN or (circuit.state == self.CLOSED and threshold_reached):
+					circuit.state = self.OPEN
+					circuit.opened_at = time.monotonic()
+					circuit.times_opened += 1
+
+	def reset(self, url=None):
+		"""
+		closes the circuit of the host of url, or every circuit if url is not provided
+		:type url: str or NoneType
+		"""
+		with self._lock:
+			if url is None:
+				self._circuits = {}
+			else:
+				self._circuits.pop(_to_host(url), None)
+
+	@property
+	def states(self):
+		"""
+		state, consecutive failures, number of times opened, rejected requests and seconds until a probe
+		is let through, per host
+		:rtype: dict[str, dict]
+		"""
+		with self._lock:
+			result = {}
+			for host, circuit in self._circuits.items():
+				self._update(circuit)
+				retry_in = None
+				if circuit.state == self.OPEN:
+					retry_in = max(0.0, self._cool_down - (time.monotonic() - circuit.opened_at))
+				result[host] = {
+					'state': circuit.state, 'consecutive_failures': circuit.consecutive_failures,
+					'times_opened': circuit.times_opened, 'rejected': circuit.rejected, 'retry_in': retry_in
+				}
+			return result
+
+
+CIRCUIT_BREAKER = CircuitBreaker()
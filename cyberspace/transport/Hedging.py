@@ -0,0 +1,151 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+import threading
+import time
+
+from .get_host import get_host
+
+
+class Hedging:
+	"""
+	sends a second identical request when the first has not answered within a percentile of the recent latencies
+	of its host, the first answer wins and the other is discarded, at most max_fraction of requests are hedged
+	"""
+	def __init__(self, percentile=95, min_delay=0.05, max_fraction=0.05, window=200, min_samples=20, max_workers=32):
+		"""
+		:param float percentile: a request is hedged once it has taken longer than this percentile of recent latencies
+		:param float min_delay: shortest wait, in seconds, before a request is hedged
+		:param float max_fraction: largest fraction of requests that can be hedged
+		:param int window: number of recent latencies kept per host
+		:param int min_samples: requests to a host are not hedged until this many latencies are known
+		:param int max_workers: maximum number of requests in flight at once, hedges included
+		"""
+		if not 0 < percentile < 100:
+			raise ValueError(f'percentile should be between 0 and 100, not {percentile}!')
+		self._percentile = percentile
+		self._min_delay = min_delay
+		self._max_fraction = max_fraction
+		self._window = window
+		self._min_samples = min_samples
+		self._max_workers = max_workers
+		self._latencies = {}
+		self._counts = {'requests': 0, 'hedged': 0, 'hedge_won': 0}
+		self._lock = threading.Lock()
+		self._executor = None
+
+	def __getstate__(self):
+		return {
+			'percentile': self._percentile, 'min_delay': self._min_delay, 'max_fraction': self._max_fraction,
+			'window': self._window, 'min_samples': self._min_samples, 'max_workers': self._max_workers
+		}
+
+	def __setstate__(self, state):
+		self.__init__(**state)
+
+	def __repr__(self):
+		return f'<Hedging percentile={self._percentile} max_fraction={self._max_fraction}>'
+
+	@property
+	def statistics(self):
+		"""
+		number of requests, of hedged requests and of hedges that answered first
+		:rtype: dict[str, int]
+		"""
+		with self._lock:
+			return dict(self._counts)
+
+	@property
+	def _pool(self):
+		with self._lock:
+			if self._executor is None:
+				self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='hedging')
+			return self._executor
+
+	def _record_latency(self, host, seconds):
+		with self._lock:
+			if host not in self._latencies:
+				self._latencies[host] = deque(maxlen=self._window)
+			self._latencies[host].append(seconds)
+
+	def get_delay(self, url):
+		"""
+		seconds to wait for a request to url before hedging it, None if too little is known about its host
+		:type url: str
+		:rtype: float or NoneType
+		"""
+		with self._lock:
+			latencies = sorted(self._latencies.get(get_host(url), ()))
+		if len(latencies) < self._min_samples:
+			return None
+		index = min(len(latencies) - 1, int(len(latencies) * self._percentile / 100))
+		return max(self._min_delay, latencies[index])
+
+	def _allow_hedge(self):
+		with self._lock:
+			if self._counts['hedged'] + 1 > self._max_fraction * self._counts['requests']:
+				return False
+			self._counts['hedged'] += 1
+			return True
+
+	def _timed(self, host, send, started=None):
+		if started is not None:
+			started.set()
+		start = time.monotonic()
+		response = send()
+		self._record_latency(host=host, seconds=time.monotonic() - start)
+		return response
+
+	@staticmethod
+	def _discard(future):
+		def close(done_future):
+			if not done_future.cancelled() and done_future.exception() is None:
+				done_future.result().close()
+
+		if not future.cancel():
+			future.add_done_callback(close)
+
+	def send(self, url, send, hedge=None):
+		"""
+		calls send, and calls hedge if the first call is slow, returning whichever answers first
+		:param str url: the url send requests, whose host's latencies decide when to hedge
+		:param callable send: sends the request and returns a requests.Response
+		:param callable or NoneType hedge: sends the same request as send, e.g., after waiting for a rate limiter,
+		send is called again if not provided
+		:rtype: requests.Response
+		"""
+		host = get_host(url)
+		with self._lock:
+			self._counts['requests'] += 1
+
+		delay = self.get_delay(url=url)
+		if delay is None:
+			return self._timed(host=host, send=send)
+
+		started = threading.Event()
+		first = self._pool.submit(self._timed, host, send, started)
+		# the delay counts from when the first request is sent, not from when it is waiting for a free thread
+		started.wait()
+		done, _ = wait([first], timeout=delay)
+		if done or not self._allow_hedge():
+			return first.result()
+
+		second = self._pool.submit(self._timed, host, hedge or send)
+		pending = {first, second}
+		while True:
+			done, pending = wait(pending, return_when=FIRST_COMPLETED)
+			answered = [future for future in done if future.exception() is None]
+			# a failed request loses to one that is still running
+			if answered or not pending:
+				winner = answered[0] if answered else done.pop()
+				for other in pending | (done - {winner}):
+					self._discard(other)
+				if winner is second and answered:
+					with self._lock:
+						self._counts['hedge_won'] += 1
+				return winner.result()
+
+	def shutdown(self):
+		with self._lock:
+			executor, self._executor = self._executor, None
+		if executor is not None:
+			executor.shutdown(wait=False)
@@ -0,0 +1,268 @@
+from pandas import DataFrame
+import threading
+import weakref
+import json
+
+from .get_host import get_host
+
+
+# upper bounds, in seconds, of the buckets of the latency histograms, the last bucket has no upper bound
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+	def __init__(self, buckets=LATENCY_BUCKETS):
+		"""
+		:param tuple[float] buckets: upper bounds of the buckets, in increasing order
+		"""
+		self._buckets = tuple(buckets)
+		self._counts = [0] * (len(self._buckets) + 1)
+		self._count = 0
+		self._sum = 0.0
+		self._max = 0.0
+
+	def add(self, value):
+		"""
+		:type value: float
+		"""
+		for index, bound in enumerate(self._buckets):
+			if value <= bound:
+				break
+		else:
+			index = len(self._buckets)
+		self._counts[index] += 1
+		self._count += 1
+		self._sum += value
+		self._max = max(self._max, value)
+
+	@property
+	def count(self):
+		return self._count
+
+	@property
+	def mean(self):
+		return self._sum / self._count if self._count else None
+
+	def get_percentile(self, percentile):
+		"""
+		the upper bound of the bucket that holds the percentile, or the maximum if it is lower
+		:type percentile: float
+		:rtype: float or NoneType
+		"""
+		if self._count == 0:
+			return None
+		rank = self._count * percentile / 100
+		cumulative = 0
+		for index, count in enumerate(self._counts):
+			cumulative += count
+			if cumulative >= rank and count > 0:
+				return min(self._buckets[index], self._max) if index < len(self._buckets) else self._max
+		return self._max
+
+	def to_dict(self):
+		"""
+		:rtype: dict
+		"""
+		labels = [f'<={bound}' for bound in self._buckets] + [f'>{self._buckets[-1]}']
+		return {
+			'count': self._count, 'mean': self.mean, 'max': self._max,
+			'p50': self.get_percentile(50), 'p90': self.get_percentile(90), 'p99': self.get_percentile(99),
+			'buckets': dict(zip(labels, self._counts))
+		}
+
+
+class _HostMetrics:
+	def __init__(self):
+		self.requests = 0
+		self.responses = 0
+		self.errors = {}
+		self.retries = 0
+		self.bytes = 0
+		self.status_codes = {}
+		self.latency = Histogram()
+		self.time_to_first_byte = Histogram()
+
+
+class Metrics:
+	"""
+	http metrics of every request through the transports that share it: per host requests, responses, errors,
+	retries, bytes received, status codes and histograms of latency and time to first byte,
+	and the hits, misses and expired entries of the cached functions added to it
+	"""
+	def __init__(self):
+		self._hosts = {}
+		self._cached_functions = {}
+		self._lock = threading.Lock()
+
+	def __reduce__(self):
+		# the shared metrics stay shared after unpickling
+		if self is METRICS:
+			return 'METRICS'
+		else:
+			return super().__reduce__()
+
+	def __getstate__(self):
+		return {}
+
+	def __setstate__(self, state):
+		self.__init__()
+
+	def _get_host_metrics(self, url):
+		host = get_host(url)
+		if host not in self._hosts:
+			self._hosts[host] = _HostMetrics()
+		return self._hosts[host]
+
+	def record_request(self, url):
+		with self._lock:
+			self._get_host_metrics(url).requests += 1
+
+	def record_retry(self, url):
+		with self._lock:
+			self._get_host_metrics(url).retries += 1
+
+	def record_response(self, url, response, latency):
+		"""
+		:type url: str
+		:type response: requests.Response
+		:param float latency: seconds from sending the request to receiving the whole response
+		"""
+		elapsed = getattr(response, 'elapsed', None)
+		if getattr(response, '_content_consumed', True):
+			size = len(response.content or b'')
+		else:
+			size = int(response.headers.get('Content-Length', 0) or 0)
+		with self._lock:
+			host_metrics = self._get_host_metrics(url)
+			host_metrics.responses += 1
+			host_metrics.bytes += size
+			status_code = response.status_code
+			host_metrics.status_codes[status_code] = host_metrics.status_codes.get(status_code, 0) + 1
+			host_metrics.latency.add(latency)
+			if elapsed is not None:
+				# requests measures elapsed until the headers are parsed
+				host_metrics.time_to_first_byte.add(elapsed.total_seconds())
+
+	def record_error(self, url, error, latency):
+		"""
+		:type url: str
+		:type error: Exception
+		:type latency: float
+		"""
+		name = error.__class__.__name__
+		with self._lock:
+			host_metrics = self._get_host_metrics(url)
+			host_metrics.errors[name] = host_metrics.errors.get(name, 0) + 1
+			host_metrics.latency.add(latency)
+
+	def add_cached_function(self, cached_function, name=None):
+		"""
+		includes the hits, misses and expired entries of a cached function, which is not kept alive by the metrics
+		:param CachedFunction cached_function: any object with a statistics dictionary
+		:param str or NoneType name: functions with the same name are added up
+		"""
+		if not hasattr(cached_function, 'statistics'):
+			return
+		name = name or getattr(cached_function, '_id', None) or cached_function.__name__
+		with self._lock:
+			if name not in self._cached_functions:
+				self._cached_functions[name] = weakref.WeakSet()
+			self._cached_functions[name].add(cached_function)
+
+	def get_cache_statistics(self):
+		"""
+		:rtype: dict[str, dict]
+		"""
+		with self._lock:
+			cached_functions = {name: list(functions) for name, functions in self._cached_functions.items()}
+		result = {}
+		for name, functions in cached_functions.items():
+			totals = {'hits': 0, 'misses': 0, 'expired': 0, 'merged': 0}
+			for function in functions:
+				for key, value in function.statistics.items():
+					totals[key] = totals.get(key, 0) + value
+			lookups = totals['hits'] + totals['misses'] + totals['expired']
+			for status in ('hits', 'misses', 'expired'):
+				totals[f'{status}_ratio'] = totals[status] / lookups if lookups else None
+			result[name] = totals
+		return result
+
+	def get_host_statistics(self):
+		"""
+		:rtype: dict[str, dict]
+		"""
+		with self._lock:
+			return {
+				host: {
+					'requests': host_metrics.requests, 'responses': host_metrics.responses,
+					'errors': dict(host_metrics.errors), 'retries': host_metrics.retries, 'bytes': host_metrics.bytes,
+					'status_codes': {str(code): count for code, count in sorted(host_metrics.status_codes.items())},
+					'latency': host_metrics.latency.to_dict(),
+					'time_to_first_byte': host_metrics.time_to_first_byte.to_dict()
+				}
+				for host, host_metrics in self._hosts.items()
+			}
+
+	def to_dict(self):
+		"""
+		:rtype: dict
+		"""
+		return {'hosts': self.get_host_statistics(), 'caches': self.get_cache_statistics()}
+
+	def to_json(self, path=None, **kwargs):
+		"""
+		:param str or NoneType path: if provided the json is also written to this file
+		:rtype: str
+		"""
+		result = json.dumps(self.to_dict(), **kwargs)
+		if path is not None:
+			with open(path, 'w') as file:
+				file.write(result)
+		return result
+
+	def get_host_data(self):
+		"""
+		one row per host
+		:rtype: DataFrame
+		"""
+		rows = []
+		for host, statistics in self.get_host_statistics().items():
+			status_classes = {}
+			for code, count in statistics['status_codes'].items():
+				status_class = f'status_{code[0]}xx'
+				status_classes[status_class] = status_classes.get(status_class, 0) + count
+			rows.append({
+				'host': host, 'requests': statistics['requests'], 'responses': statistics['responses'],
+				'errors': sum(statistics['errors'].values()), 'retries': statistics['retries'],
+				'bytes': statistics['bytes'],
+				**{f'latency_{key}': statistics['latency'][key] for key in ('mean', 'p50', 'p90', 'p99', 'max')},
+				**{f'ttfb_{key}': statistics['time_to_first_byte'][key] for key in ('mean', 'p50', 'p90', 'p99')},
+				**status_classes
+			})
+		return DataFrame(rows)
+
+	def get_histogram_data(self, kind='latency'):
+		"""
+		one row per host and bucket
+		:param str kind: 'latency' or 'time_to_first_byte'
+		:rtype: DataFrame
+		"""
+		return DataFrame([
+			{'host': host, 'bucket': bucket, 'count': count}
+			for host, statistics in self.get_host_statistics().items()
+			for bucket, count in statistics[kind]['buckets'].items()
+		])
+
+	def get_cache_data(self):
+		"""
+		one row per cached function
+		:rtype: DataFrame
+		"""
+		return DataFrame([{'name': name, **statistics} for name, statistics in self.get_cache_statistics().items()])
+
+	def reset(self):
+		with self._lock:
+			self._hosts = {}
+
+
+METRICS = Metrics()
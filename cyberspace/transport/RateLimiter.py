@@ -0,0 +1,162 @@
+from .get_host import get_host
+
+import threading
+import time
+
+
+class TokenBucket:
+	def __init__(self, rate, burst=1):
+		"""
+		:param float rate: tokens added per second, i.e., the sustained number of requests per second
+		:param int burst: maximum number of tokens, i.e., requests that can be sent at once after a quiet period
+		"""
+		if rate <= 0:
+			raise ValueError(f'rate should be positive, not {rate}!')
+		if burst < 1:
+			raise ValueError(f'burst should be at least 1, not {burst}!')
+		self._rate = float(rate)
+		self._burst = burst
+		self._tokens = float(burst)
+		self._last_update = time.monotonic()
+		self._lock = threading.Lock()
+
+	def __repr__(self):
+		return f'<TokenBucket rate={self._rate} burst={self._burst}>'
+
+	@property
+	def rate(self):
+		return self._rate
+
+	@property
+	def burst(self):
+		return self._burst
+
+	def _refill(self):
+		now = time.monotonic()
+		self._tokens = min(self._burst, self._tokens + (now - self._last_update) * self._rate)
+		self._last_update = now
+
+	def slow_down(self, rate, burst=None):
+		"""
+		lowers the rate and burst to the given ones if they are lower, tokens already added are kept
+		:param float rate: tokens added per second
+		:param int or NoneType burst: maximum number of tokens
+		"""
+		with self._lock:
+			self._refill()
+			self._rate = min(self._rate, float(rate))
+			self._burst = min(self._burst, burst or self._burst)
+			self._tokens = min(self._tokens, float(self._burst))
+
+	def reserve(self):
+		"""
+		takes a token, possibly one that will only be available in the future
+		:rtype: float
+		:return: number of seconds to wait before the token can be used
+		"""
+		with self._lock:
+			self._refill()
+			self._tokens -= 1
+			if self._tokens >= 0:
+				return 0.0
+			else:
+				return -self._tokens / self._rate
+
+
+class RateLimiter:
+	"""
+	keeps a token bucket per host, shared by every client whose transport uses this rate limiter
+	"""
+	def __init__(self, rate=None, burst=1):
+		"""
+		:param float or NoneType rate: requests per second for hosts without a rate, None means no limit
+		:param int burst: burst size for hosts without a rate
+		"""
+		self._default_rate = rate
+		self._default_burst = burst
+		self._buckets = {}
+		self._fixed_hosts = set()
+		self._lock = threading.Lock()
+
+	def __reduce__(self):
+		# the shared rate limiter stays shared after unpickling
+		if self is RATE_LIMITER:
+			return 'RATE_LIMITER'
+		else:
+			return super().__reduce__()
+
+	def __getstate__(self):
+		return {
+			'default_rate': self._default_rate, 'default_burst': self._default_burst,
+			'rates': {host: (self._buckets[host].rate, self._buckets[host].burst) for host in self._fixed_hosts}
+		}
+
+	def __setstate__(self, state):
+		self.__init__(rate=state['default_rate'], burst=state['default_burst'])
+		for host, (rate, burst) in state['rates'].items():
+			self.set_rate(host=host, rate=rate, burst=burst)
+
+	def set_rate(self, host, rate, burst=1):
+		"""
+		fixes the rate of a host, clients asking for another rate for this host are ignored
+		:param str host: such as 'en.wikipedia.org'
+		:param float rate: requests per second
+		:param int burst: number of requests that can be sent at once
+		"""
+		host = host.lower()
+		with self._lock:
+			self._buckets[host] = TokenBucket(rate=rate, burst=burst)
+			self._fixed_hosts.add(host)
+
+	def get_bucket(self, host, rate=None, burst=None):
+		"""
+		the bucket of a host, whose rate is the lowest any client asked for unless it was fixed with set_rate
+		:param str host: such as 'en.wikipedia.org'
+		:param float or NoneType rate: requests per second the client asks for
+		:param int or NoneType burst: burst size the client asks for
+		:rtype: TokenBucket or NoneType
+		"""
+		host = host.lower()
+		with self._lock:
+			bucket = self._buckets.get(host)
+			if bucket is None:
+				rate = rate or self._default_rate
+				if rate is None:
+					return None
+				bucket = self._buckets[host] = TokenBucket(rate=rate, burst=burst or self._default_burst)
+			elif rate is not None and host not in self._fixed_hosts:
+				bucket.slow_down(rate=rate, burst=burst)
+			return bucket
+
+	def reserve(self, url, rate=None, burst=None):
+		"""
+		:param str url: the url about to be requested
+		:param float or NoneType rate: requests per second the client asks for
+		:param int or NoneType burst: burst size the client asks for
+		:rtype: float
+		:return: number of seconds to wait before sending the request
+		"""
+		bucket = self.get_bucket(host=get_host(url), rate=rate, burst=burst)
+		if bucket is None:
+			return 0.0
+		else:
+			return bucket.reserve()
+
+	def wait(self, url, rate=None, burst=None):
+		"""
+		blocks until a request to url is allowed
+		"""
+		wait_time = self.reserve(url=url, rate=rate, burst=burst)
+		if wait_time > 0:
+			time.sleep(wait_time)
+
+	@property
+	def rates(self):
+		"""
+		:rtype: dict[str, dict[str, float]]
+		"""
+		with self._lock:
+			return {host: {'rate': bucket.rate, 'burst': bucket.burst} for host, bucket in self._buckets.items()}
+
+
+RATE_LIMITER = RateLimiter()
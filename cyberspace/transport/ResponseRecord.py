@@ -0,0 +1,198 @@
+from requests.structures import CaseInsensitiveDict
+from requests.exceptions import HTTPError
+from requests import Response
+from datetime import timedelta
+import hashlib
+import json
+import gzip
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+
+class ResponseRecord:
+	"""
+	the part of a requests.Response worth caching,
+	with the same status_code, headers, url, encoding, content, text, ok and json() as the response
+	"""
+
+	# headers needed to read the body and to revalidate or expire it later
+	SELECTED_HEADERS = (
+		'Content-Type', 'Content-Language', 'ETag', 'Last-Modified',
+		'Cache-Control', 'Expires', 'Date', 'Location', 'Retry-After'
+	)
+	# headers that describe the body as it was sent, which do not hold for the decoded content that is kept
+	WIRE_HEADERS = ('Content-Encoding', 'Content-Length', 'Transfer-Encoding')
+
+	# 'zstd', 'gzip' or None, zstd falls back to gzip when zstandard is not installed
+	COMPRESSION = 'zstd'
+	COMPRESSION_MIN_SIZE = 1024
+
+	def __init__(self, status_code, content, url=None, headers=None, encoding=None, reason=None, body_hash=None):
+		"""
+		:type status_code: int
+		:type content: bytes
+		:type url: str or NoneType
+		:type headers: dict[str, str] or NoneType
+		:type encoding: str or NoneType
+		:type reason: str or NoneType
+		:param str or NoneType body_hash: if provided the content is kept elsewhere under this hash and is empty here
+		"""
+		self.status_code = status_code
+		self._content = content or b''
+		self.url = url
+		self.headers = CaseInsensitiveDict(headers or {})
+		# records cached before they were dropped still have them
+		for name in self.WIRE_HEADERS:
+			self.headers.pop(name, None)
+		self.encoding = encoding
+		self.reason = reason
+		self.body_hash = body_hash
+
+	@classmethod
+	def from_response(cls, response):
+		"""
+		:type response: requests.Response or ResponseRecord
+		:rtype: ResponseRecord
+		"""
+		if isinstance(response, cls):
+			return response
+
+		headers = {key: response.headers[key] for key in cls.SELECTED_HEADERS if key in response.headers}
+		content = response.content
+		encoding = response.encoding
+		if encoding is None and content:
+			encoding = response.apparent_encoding
+
+		return cls(
+			status_code=response.status_code, content=content, url=response.url, headers=headers,
+			encoding=encoding, reason=response.reason
+		)
+
+	def __repr__(self):
+		return f'<ResponseRecord [{self.status_code}]>'
+
+	@staticmethod
+	def get_body_hash(content):
+		"""
+		:type content: bytes
+		:rtype: str
+		"""
+		return hashlib.sha256(content).hexdigest()
+
+	def to_response(self, elapsed=None):
+		"""
+		a requests.Response with the same status code, headers, url, encoding and content
+		:param float or NoneType elapsed: seconds the response took
+		:rtype: requests.Response
+		"""
+		response = Response()
+		response.status_code = self.status_code
+		response._content = self._content
+		# the content is all there, as if it had been read from the connection
+		response._content_consumed = True
+		response.headers = CaseInsensitiveDict(self.headers)
+		response.url = self.url
+		response.encoding = self.encoding
+		response.reason = self.reason
+		if elapsed is not None:
+			response.elapsed = timedelta(seconds=elapsed)
+		return response
+
+	def without_content(self, body_hash):
+		"""
+		a copy whose content is replaced by the hash it is kept under
+		:rtype: ResponseRecord
+		"""
+		return self.__class__(
+			status_code=self.status_code, content=b'', url=self.url, headers=self.headers, encoding=self.encoding,
+			reason=self.reason, body_hash=body_hash
+		)
+
+	def with_content(self, content):
+		"""
+		a copy of a record made by without_content with its content put back
+		:rtype: ResponseRecord
+		"""
+		return self.__class__(
+			status_code=self.status_code, content=content, url=self.url, headers=self.headers, encoding=self.encoding,
+			reason=self.reason
+		)
+
+	@classmethod
+	def _get_compression(cls):
+		if cls.COMPRESSION == 'zstd' and zstandard is None:
+			return 'gzip'
+		else:
+			return cls.COMPRESSION
+
+	@staticmethod
+	def _compress(content, compression):
+		if compression == 'zstd':
+			return zstandard.ZstdCompressor().compress(content)
+		elif compression == 'gzip':
+			return gzip.compress(content, compresslevel=6)
+		else:
+			return content
+
+	@staticmethod
+	def _decompress(content, compression):
+		if compression == 'zstd':
+			if zstandard is None:
+				raise ImportError('zstandard is needed to read this cached response!')
+			return zstandard.ZstdDecompressor().decompress(content)
+		elif compression == 'gzip':
+			return gzip.decompress(content)
+		else:
+			return content
+
+	def __getstate__(self):
+		compression = self._get_compression() if len(self._content) >= self.COMPRESSION_MIN_SIZE else None
+		return {
+			'status_code': self.status_code,
+			'url': self.url,
+			'headers': dict(self.headers),
+			'encoding': self.encoding,
+			'reason': self.reason,
+			'compression': compression,
+			'content': self._compress(content=self._content, compression=compression),
+			'body_hash': self.body_hash
+		}
+
+	def __setstate__(self, state):
+		self.__init__(
+			status_code=state['status_code'], url=state['url'], headers=state['headers'],
+			encoding=state['encoding'], reason=state['reason'],
+			content=self._decompress(content=state['content'], compression=state['compression']),
+			body_hash=state.get('body_hash')
+		)
+
+	@property
+	def content(self):
+		"""
+		:rtype: bytes
+		"""
+		return self._content
+
+	@property
+	def text(self):
+		"""
+		:rtype: str
+		"""
+		return self._content.decode(self.encoding or 'utf-8', errors='replace')
+
+	def json(self, **kwargs):
+		return json.loads(self.text, **kwargs)
+
+	@property
+	def ok(self):
+		"""
+		:rtype: bool
+		"""
+		return self.status_code < 400
+
+	def raise_for_status(self):
+		if not self.ok:
+			raise HTTPError(f'{self.status_code} {self.reason} for url: {self.url}', response=self)
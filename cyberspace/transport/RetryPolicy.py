@@ -0,0 +1,141 @@
+from requests.exceptions import ConnectionError, Timeout, ChunkedEncodingError
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import random
+
+
+class DeadlineExceededError(Timeout):
+	pass
+
+
+class RetryPolicy:
+	"""
+	how long a request may take and which failures are retried after how long:
+	connection errors, timeouts and retryable status codes (429 and 5xx) are retried with exponential backoff
+	and full jitter, a Retry-After header sets the wait instead when present, and no attempt or wait goes
+	beyond the deadline of the whole request
+	"""
+	def __init__(
+			self, max_tries=4, connect_timeout=5, read_timeout=30, deadline=120,
+			backoff=0.1, multiplier=2, max_backoff=30, jitter=True,
+			retry_statuses=(429, 500, 502, 503, 504), retry_errors=(ConnectionError, Timeout, ChunkedEncodingError),
+			respect_retry_after=True, max_retry_after=120
+	):
+		"""
+		:param int max_tries: number of attempts, including the first one
+		:param float connect_timeout: seconds to wait for a connection
+		:param float read_timeout: seconds to wait for the server to send data
+		:param float or NoneType deadline: seconds the request may take in total, including retries and waits
+		:param float backoff: wait before the second attempt, before jitter
+		:param float multiplier: each wait is this many times longer than the previous one
+		:param float max_backoff: longest wait, before jitter
+		:param bool jitter: if True, each wait is a random fraction of the exponential backoff (full jitter)
+		:param tuple[int] retry_statuses: status codes that are retried
+		:param tuple[type] retry_errors: exceptions that are retried, SSLError is a ConnectionError
+		:param bool respect_retry_after: wait as long as the Retry-After header of a response asks
+		:param float max_retry_after: a longer Retry-After is not honored and the response is returned instead
+		"""
+		if max_tries < 1:
+			raise ValueError(f'max_tries should be at least 1, not {max_tries}!')
+		self._max_tries = max_tries
+		self._connect_timeout = connect_timeout
+		self._read_timeout = read_timeout
+		self._deadline = deadline
+		self._backoff = backoff
+		self._multiplier = multiplier
+		self._max_backoff = max_backoff
+		self._jitter = jitter
+		self._retry_statuses = frozenset(retry_statuses)
+		self._retry_errors = tuple(retry_errors)
+		self._respect_retry_after = respect_retry_after
+		self._max_retry_after = max_retry_after
+
+	def __repr__(self):
+		return f'<RetryPolicy max_tries={self._max_tries} timeout={self.timeout} deadline={self._deadline}>'
+
+	@property
+	def max_tries(self):
+		return self._max_tries
+
+	@property
+	def deadline(self):
+		return self._deadline
+
+	@property
+	def timeout(self):
+		"""
+		:rtype: tuple[float, float]
+		:return: (connect timeout, read timeout) as requests expects it
+		"""
+		return self._connect_timeout, self._read_timeout
+
+	def get_timeout(self, remaining=None):
+		"""
+		the timeout of an attempt that has remaining seconds until the deadline
+		:type remaining: float or NoneType
+		:rtype: tuple[float, float]
+		"""
+		if remaining is None:
+			return self.timeout
+		return min(self._connect_timeout, remaining), min(self._read_timeout, remaining)
+
+	def get_backoff(self, attempt):
+		"""
+		:param int attempt: number of attempts made so far
+		:rtype: float
+		"""
+		backoff = min(self._max_backoff, self._backoff * self._multiplier ** (attempt - 1))
+		if self._jitter:
+			return random.uniform(0, backoff)
+		return backoff
+
+	@staticmethod
+	def get_retry_after(response):
+		"""
+		:type response: requests.Response or ResponseRecord
+		:rtype: float or NoneType
+		:return: the number of seconds the Retry-After header of response asks to wait, if it has one
+		"""
+		value = response.headers.get('Retry-After')
+		if value is None:
+			return None
+		value = value.strip()
+		if value.isdigit():
+			return float(value)
+		try:
+			date = parsedate_to_datetime(value)
+		except (TypeError, ValueError):
+			return None
+		if date.tzinfo is None:
+			date = date.replace(tzinfo=timezone.utc)
+		return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+	def is_retryable_error(self, error):
+		"""
+		:type error: Exception
+		:rtype: bool
+		"""
+		return isinstance(error, self._retry_errors) and not isinstance(error, DeadlineExceededError)
+
+	def is_retryable_response(self, response):
+		"""
+		:type response: requests.Response
+		:rtype: bool
+		"""
+		return response.status_code in self._retry_statuses
+
+	def get_wait(self, attempt, response=None):
+		"""
+		seconds to wait before the next attempt, None if the Retry-After of response is too long to honor
+		:param int attempt: number of attempts made so far
+		:type response: requests.Response or NoneType
+		:rtype: float or NoneType
+		"""
+		if response is not None and self._respect_retry_after:
+			retry_after = self.get_retry_after(response)
+			if retry_after is not None:
+				return retry_after if retry_after <= self._max_retry_after else None
+		return self.get_backoff(attempt=attempt)
+
+
+RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,288 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import functools
+import threading
+import warnings
+import time
+
+from .get_host import get_host
+from .RateLimiter import RATE_LIMITER
+from .RetryPolicy import RETRY_POLICY, DeadlineExceededError
+from .CircuitBreaker import CIRCUIT_BREAKER, CircuitOpenError
+from .Metrics import METRICS
+
+
+def _make_counting_pool_class(pool_class, on_new_connection):
+	class CountingConnectionPool(pool_class):
+		def _new_conn(self):
+			on_new_connection(self.host)
+			return super()._new_conn()
+
+	return CountingConnectionPool
+
+
+class _CountingAdapter(HTTPAdapter):
+	def __init__(self, on_new_connection, **kwargs):
+		self._on_new_connection = on_new_connection
+		super().__init__(**kwargs)
+
+	def init_poolmanager(self, *args, **kwargs):
+		super().init_poolmanager(*args, **kwargs)
+		self.poolmanager.pool_classes_by_scheme = {
+			'http': _make_counting_pool_class(HTTPConnectionPool, self._on_new_connection),
+			'https': _make_counting_pool_class(HTTPSConnectionPool, self._on_new_connection)
+		}
+
+
+class Transport:
+	def __init__(
+			self, pool_connections=16, pool_maxsize=16, pool_block=False, headers=None, rate_limiter=None,
+			retry_policy=None, circuit_breaker=None, metrics=None
+	):
+		"""
+		:param int pool_connections: number of hosts to keep a pool of keep-alive connections for
+		:param int pool_maxsize: maximum number of keep-alive connections kept in each host's pool
+		:param bool pool_block: if True, wait for a free connection instead of opening one that will not be kept
+		:param dict or NoneType headers: headers sent with every request
+		:param RateLimiter or NoneType rate_limiter: the shared rate limiter is used if not provided
+		:param RetryPolicy or NoneType retry_policy: the shared retry policy is used if not provided
+		:param CircuitBreaker or NoneType circuit_breaker: the shared circuit breaker is used if not provided
+		:param Metrics or NoneType metrics: the shared metrics are used if not provided
+		"""
+		self._pool_connections = pool_connections
+		self._pool_maxsize = pool_maxsize
+		self._pool_block = pool_block
+		self._headers = headers
+		self._rate_limiter = rate_limiter or RATE_LIMITER
+		self._retry_policy = retry_policy or RETRY_POLICY
+		self._circuit_breaker = circuit_breaker or CIRCUIT_BREAKER
+		self._metrics = metrics or METRICS
+		self._lock = threading.Lock()
+		self._statistics = {}
+		self._session = self._create_session()
+
+	_STATE_ATTRIBUTES_ = [
+		'_pool_connections', '_pool_maxsize', '_pool_block', '_headers', '_rate_limiter', '_retry_policy',
+		'_circuit_breaker', '_metrics'
+	]
+
+	def __reduce__(self):
+		# the shared transport stays shared after unpickling
+		if self is TRANSPORT:
+			return 'TRANSPORT'
+		else:
+			return super().__reduce__()
+
+	def __getstate__(self):
+		return {key: getattr(self, key) for key in self._STATE_ATTRIBUTES_}
+
+	def __setstate__(self, state):
+		for key, value in state.items():
+			setattr(self, key, value)
+		if not hasattr(self, '_retry_policy'):
+			self._retry_policy = RETRY_POLICY
+		if not hasattr(self, '_circuit_breaker'):
+			self._circuit_breaker = CIRCUIT_BREAKER
+		if not hasattr(self, '_metrics'):
+			self._metrics = METRICS
+		self._lock = threading.Lock()
+		self._statistics = {}
+		self._session = self._create_session()
+
+	def __repr__(self):
+		return f'<Transport pool_connections={self._pool_connections} pool_maxsize={self._pool_maxsize}>'
+
+	def _create_session(self):
+		session = requests.Session()
+		if self._headers:
+			session.headers.update(self._headers)
+		for prefix in ['http://', 'https://']:
+			session.mount(prefix, _CountingAdapter(
+				on_new_connection=self._count_new_connection,
+				pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize,
+				pool_block=self._pool_block
+			))
+		return session
+
+	@property
+	def session(self):
+		"""
+		:rtype: requests.Session
+		"""
+		return self._session
+
+	@property
+	def rate_limiter(self):
+		"""
+		:rtype: RateLimiter
+		"""
+		return self._rate_limiter
+
+	@property
+	def retry_policy(self):
+		"""
+		:rtype: RetryPolicy
+		"""
+		return self._retry_policy
+
+	@property
+	def circuit_breaker(self):
+		"""
+		:rtype: CircuitBreaker
+		"""
+		return self._circuit_breaker
+
+	@property
+	def metrics(self):
+		"""
+		:rtype: Metrics
+		"""
+		return self._metrics
+
+	def _get_host_statistics(self, host):
+		if host not in self._statistics:
+			self._statistics[host] = {'requests': 0, 'new_connections': 0, 'retries': 0}
+		return self._statistics[host]
+
+	def _count_new_connection(self, host):
+		with self._lock:
+			self._get_host_statistics(host=host.lower())['new_connections'] += 1
+
+	def _count_request(self, url):
+		with self._lock:
+			self._get_host_statistics(host=get_host(url))['requests'] += 1
+		self._metrics.record_request(url=url)
+
+	def _count_retry(self, url):
+		with self._lock:
+			self._get_host_statistics(host=get_host(url))['retries'] += 1
+		self._metrics.record_retry(url=url)
+
+	@property
+	def statistics(self):
+		"""
+		number of requests, retries, newly opened connections and reused connections per host
+		:rtype: dict[str, dict[str, int]]
+		"""
+		with self._lock:
+			return {
+				host: {
+					'requests': counts['requests'],
+					'retries': counts['retries'],
+					'new_connections': counts['new_connections'],
+					'reused_connections': max(0, counts['requests'] - counts['new_connections'])
+				}
+				for host, counts in self._statistics.items()
+			}
+
+	def get(
+			self, url, params=None, headers=None, verify=True, rate=None, burst=None, retry_policy=None,
+			max_tries=None, deadline=None, hedging=None, **kwargs
+	):
+		"""
+		sends a get request, retrying it as the retry policy allows,
+		CircuitOpenError is raised without sending it if the circuit of its host is open
+		:type url: str
+		:param dict or NoneType params: query parameters
+		:param dict or NoneType headers: headers added to the default headers of the transport
+		:param bool verify: verify the ssl certificate, InsecureRequestWarnings are ignored if False
+		:param float or NoneType rate: requests per second allowed for the host if the rate limiter has no rate for it
+		:param int or NoneType burst: burst size for the host if the rate limiter has no rate for it
+		:param RetryPolicy or NoneType retry_policy: the retry policy of the transport is used if not provided
+		:param int or NoneType max_tries: overrides the max_tries of the retry policy
+		:param float or NoneType deadline: overrides the deadline of the retry policy, in seconds
+		:param Hedging or NoneType hedging: if provided, slow attempts are hedged with a second identical request
+		:rtype: requests.Response
+		:return: the last response, which can have a retryable status code if the retries ran out
+		"""
+		policy = retry_policy or self._retry_policy
+		max_tries = max_tries or policy.max_tries
+		deadline = deadline if deadline is not None else policy.deadline
+		end = None if deadline is None else time.monotonic() + deadline
+		timeout = kwargs.pop('timeout', None)
+
+		attempt = 0
+		while True:
+			attempt += 1
+			self._rate_limiter.wait(url=url, rate=rate, burst=burst)
+			remaining = None if end is None else end - time.monotonic()
+			if remaining is not None and remaining <= 0:
+				raise DeadlineExceededError(f'deadline of {deadline} seconds exceeded for url: {url}')
+
+			response = None
+			send = functools.partial(
+				self._send_recorded, url=url, policy=policy, send=functools.partial(
+					self._send, url=url, params=params, headers=headers, verify=verify,
+					timeout=timeout or policy.get_timeout(remaining=remaining), **kwargs
+				)
+			)
+			try:
+				if hedging is None:
+					response = send()
+				else:
+					# the hedge waits for the rate limiter like any other request
+					hedge = functools.partial(self._send_rate_limited, url=url, rate=rate, burst=burst, send=send)
+					response = hedging.send(url=url, send=send, hedge=hedge)
+			except Exception as error:
+				if isinstance(error, CircuitOpenError) or attempt >= max_tries or not policy.is_retryable_error(error):
+					raise
+				wait = policy.get_wait(attempt=attempt)
+			else:
+				is_retryable = policy.is_retryable_response(response)
+				if attempt >= max_tries or not is_retryable:
+					return response
+				wait = policy.get_wait(attempt=attempt, response=response)
+				if wait is None:
+					return response
+
+			if end is not None and time.monotonic() + wait >= end:
+				if response is not None:
+					return response
+				raise DeadlineExceededError(f'deadline of {deadline} seconds exceeded for url: {url}')
+
+			if not self._circuit_breaker.is_available(url=url):
+				if response is not None:
+					return response
+				raise CircuitOpenError(f'circuit of {get_host(url)} opened while retrying url: {url}')
+
+			if response is not None:
+				response.close()
+			self._count_retry(url=url)
+			time.sleep(wait)
+
+	def _send_recorded(self, url, send, policy):
+		"""
+		sends one request through the circuit breaker and records it, whether it is an attempt or the hedge of one
+		:rtype: requests.Response
+		"""
+		self._circuit_breaker.before_request(url=url)
+		self._count_request(url=url)
+		start = time.monotonic()
+		try:
+			response = send()
+		except Exception as error:
+			self._metrics.record_error(url=url, error=error, latency=time.monotonic() - start)
+			self._circuit_breaker.record(url=url, success=False if policy.is_retryable_error(error) else None)
+			raise
+		self._metrics.record_response(url=url, response=response, latency=time.monotonic() - start)
+		self._circuit_breaker.record(url=url, success=not policy.is_retryable_response(response))
+		return response
+
+	def _send_rate_limited(self, url, rate, burst, send):
+		self._rate_limiter.wait(url=url, rate=rate, burst=burst)
+		return send()
+
+	def _send(self, url, params, headers, verify, **kwargs):
+		if verify:
+			return self._session.get(url, params=params, headers=headers, verify=verify, **kwargs)
+		else:
+			with warnings.catch_warnings():
+				warnings.simplefilter('ignore')
+				return self._session.get(url, params=params, headers=headers, verify=verify, **kwargs)
+
+	def close(self):
+		self._session.close()
+
+
+TRANSPORT = Transport()
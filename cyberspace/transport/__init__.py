@@ -0,0 +1,12 @@
+from .Transport import Transport, TRANSPORT
+from .RateLimiter import RateLimiter, TokenBucket, RATE_LIMITER
+from .get_host import get_host
+from .get_conditional_headers import get_conditional_headers
+from .ResponseRecord import ResponseRecord
+from .canonicalize import get_canonical_url, get_canonical_parameters
+from .RetryPolicy import RetryPolicy, RETRY_POLICY, DeadlineExceededError
+from .CircuitBreaker import CircuitBreaker, CircuitOpenError, CIRCUIT_BREAKER
+from .Hedging import Hedging
+from .Metrics import Metrics, Histogram, METRICS
+from .Archive import Archive
+from .ArchiveTransport import ArchiveTransport, ReplayMissError
@@ -0,0 +1,78 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote
+import re
+
+
+_SAFE_PATH_CHARACTERS = "/:@!$&'()*+,;=-._~%"
+_UNRESERVED_CHARACTERS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+_PERCENT_ENCODING_REGEX = re.compile(r'%([0-9A-Fa-f]{2})')
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+# the hosts that serve the same pages over http and https and on their mobile hosts
+_EQUIVALENT_HOST_REGEX = re.compile(
+	r'^(?:.+\.)?(?:wikipedia|wiktionary|wikibooks|wikiquote|wikisource|wikinews|wikiversity|'
+	r'wikivoyage|wikidata|wikimedia|mediawiki)\.org$'
+)
+_MOBILE_HOST_REGEX = re.compile(r'^(.+\.)m\.([^.]+\.org)$')
+
+
+def _get_canonical_percent_encoding(match):
+	character = chr(int(match.group(1), 16))
+	return character if character in _UNRESERVED_CHARACTERS else f'%{match.group(1).upper()}'
+
+
+def get_canonical_url(url):
+	"""
+	a form of url shared by urls that point to the same resource:
+	the host is lower case, default ports, fragments and needless percent-encoding are removed and
+	query parameters are sorted by key, keeping the order of repeated keys.
+	On wikimedia hosts, which serve the same pages either way, http becomes https and the host is not mobile.
+	:type url: str
+	:rtype: str
+	"""
+	if url is None:
+		return None
+
+	parts = urlsplit(url.strip())
+	scheme = parts.scheme.lower()
+	host = (parts.hostname or '').lower()
+	if parts.port is not None and parts.port != _DEFAULT_PORTS.get(scheme):
+		host = f'{host}:{parts.port}'
+	elif _EQUIVALENT_HOST_REGEX.match(host):
+		host = _MOBILE_HOST_REGEX.sub(r'\1\2', host)
+		if scheme == 'http':
+			scheme = 'https'
+
+	# only unreserved characters are decoded, an encoded character such as %2F is not the same as the character
+	path = _PERCENT_ENCODING_REGEX.sub(_get_canonical_percent_encoding, parts.path)
+	path = quote(path, safe=_SAFE_PATH_CHARACTERS) or '/'
+	pairs = parse_qsl(parts.query, keep_blank_values=True)
+	query = urlencode(sorted(pairs, key=lambda pair: pair[0]), quote_via=quote)
+	return urlunsplit((scheme, host, path, query, ''))
+
+
+def _get_canonical_value(value):
+	if isinstance(value, (list, tuple, set)):
+		values = sorted(value, key=str) if isinstance(value, set) else value
+		return '|'.join(str(x) for x in values)
+	elif isinstance(value, bool):
+		return value
+	else:
+		return str(value)
+
+
+def get_canonical_parameters(parameters, defaults=None):
+	"""
+	a new dictionary with the defaults added, values as the strings sent to the server and keys sorted,
+	parameters is not changed
+	:type parameters: dict or NoneType
+	:param dict or NoneType defaults: values used for keys missing from parameters
+	:rtype: dict or NoneType
+	"""
+	if parameters is None and defaults is None:
+		return None
+
+	merged = {**(defaults or {}), **(parameters or {})}
+	return {
+		key: _get_canonical_value(merged[key])
+		for key in sorted(merged)
+		if merged[key] is not None
+	}
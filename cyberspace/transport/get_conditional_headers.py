@@ -0,0 +1,20 @@
+def get_conditional_headers(response):
+	"""
+	headers that ask the server to send the body again only if it has changed since response was received
+	:param requests.Response response: a previous response
+	:rtype: dict[str, str]
+	"""
+	headers = {}
+	response_headers = getattr(response, 'headers', None)
+	if not response_headers:
+		return headers
+
+	etag = response_headers.get('ETag')
+	if etag:
+		headers['If-None-Match'] = etag
+
+	last_modified = response_headers.get('Last-Modified')
+	if last_modified:
+		headers['If-Modified-Since'] = last_modified
+
+	return headers
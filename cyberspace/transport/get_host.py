@@ -0,0 +1,9 @@
+from urllib.parse import urlparse
+
+
+def get_host(url):
+	"""
+	:type url: str
+	:rtype: str
+	"""
+	return (urlparse(url).hostname or '').lower()
@@ -0,0 +1,179 @@
+from queue import Queue, Full
+import threading
+import pickle
+import gzip
+import os
+
+
+class CrawlJournal:
+	"""
+	the state of a crawl kept in a directory as a compressed checkpoint of the whole state and a write-ahead log
+	of the numbered records added since, both written by a background thread so that the crawl never waits for
+	the disk, the log is emptied at each checkpoint so it never grows past max_records.
+	The writer keeps its own copy of the state and applies each record to it, so a checkpoint
+	never needs the crawl to copy its state
+	"""
+	CHECKPOINT_FILE = 'checkpoint.pickle.gz'
+	LOG_FILE = 'journal.log'
+
+	def __init__(self, path, max_records=1000, max_pending=10000):
+		"""
+		:param str path: the directory of the journal, created if it does not exist
+		:param int max_records: records in the log after which the crawl should checkpoint
+		:param int max_pending: records and checkpoints waiting for the writer, after which adding waits
+		"""
+		self._path = str(path)
+		self._max_records = max_records
+		self._queue = Queue(maxsize=max_pending)
+		self._thread = None
+		self._has_state = False
+		self._error = None
+		self._sequence = 0
+		self._num_records = 0
+
+	def __repr__(self):
+		return f'<CrawlJournal {self._path} records={self._num_records}>'
+
+	@property
+	def path(self):
+		return self._path
+
+	@property
+	def needs_checkpoint(self):
+		"""
+		:rtype: bool
+		"""
+		return self._num_records >= self._max_records
+
+	def _get_file_path(self, name):
+		return os.path.join(self._path, name)
+
+	def load(self):
+		"""
+		the last checkpoint and the records added after it
+		:rtype: tuple[dict or NoneType, list[tuple]]
+		"""
+		state = None
+		checkpoint_sequence = 0
+		checkpoint_path = self._get_file_path(self.CHECKPOINT_FILE)
+		if os.path.exists(checkpoint_path):
+			with gzip.open(checkpoint_path, 'rb') as file:
+				checkpoint_sequence, state = pickle.load(file)
+
+		records = []
+		log_path = self._get_file_path(self.LOG_FILE)
+		if os.path.exists(log_path):
+			with open(log_path, 'rb') as file:
+				while True:
+					try:
+						sequence, record = pickle.load(file)
+					except EOFError:
+						break
+					except (pickle.UnpicklingError, ValueError, TypeError):
+						# the last record of a crawl that stopped while writing it
+						break
+					# records of a log that was not emptied after its checkpoint are in the checkpoint
+					if sequence > checkpoint_sequence:
+						records.append(record)
+						checkpoint_sequence = sequence
+
+		self._sequence = checkpoint_sequence
+		self._num_records = len(records)
+		return state, records
+
+	def _start(self):
+		if self._thread is None:
+			os.makedirs(self._path, exist_ok=True)
+			self._thread = threading.Thread(target=self._write, daemon=True, name='crawl_journal')
+			self._thread.start()
+
+	def _check(self):
+		if self._error is not None:
+			raise self._error
+
+	def _put(self, item):
+		while True:
+			try:
+				self._queue.put(item, timeout=1)
+				return
+			except Full:
+				# a writer that failed would never make room
+				self._check()
+
+	def add(self, record):
+		"""
+		:param tuple record: a picklable record of something that happened in the crawl
+		"""
+		self._check()
+		self._start()
+		self._sequence += 1
+		self._num_records += 1
+		self._put(('record', self._sequence, record))
+
+	def checkpoint(self, state=None):
+		"""
+		writes a checkpoint of the state with every record added so far applied to it
+		:param CrawlState or NoneType state: the whole state of the crawl, with apply(record) and get_state(),
+		which the writer owns from then on and applies the records added after it to, it must not be used by the crawl;
+		the state of the last checkpoint if None
+		"""
+		self._check()
+		if state is None and not self._has_state:
+			raise ValueError('the first checkpoint needs a state!')
+		self._start()
+		self._has_state = True
+		self._num_records = 0
+		self._put(('checkpoint', self._sequence, state))
+
+	def _write_checkpoint(self, sequence, state):
+		temporary_path = self._get_file_path(self.CHECKPOINT_FILE + '.tmp')
+		with gzip.open(temporary_path, 'wb', compresslevel=3) as file:
+			pickle.dump((sequence, state), file, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(temporary_path, self._get_file_path(self.CHECKPOINT_FILE))
+
+	def _write(self):
+		log = open(self._get_file_path(self.LOG_FILE), 'ab')
+		state = None
+		try:
+			while True:
+				kind, sequence, data = self._queue.get()
+				if kind == 'record':
+					pickle.dump((sequence, data), log, protocol=pickle.HIGHEST_PROTOCOL)
+					if state is not None:
+						state.apply(data)
+				elif kind == 'checkpoint':
+					state = data if data is not None else state
+					log.flush()
+					self._write_checkpoint(sequence=sequence, state=state.get_state())
+					log.close()
+					log = open(self._get_file_path(self.LOG_FILE), 'wb')
+				else:
+					break
+				if self._queue.empty():
+					log.flush()
+		except Exception as error:
+			self._error = error
+		finally:
+			log.close()
+
+	def close(self):
+		"""
+		waits for everything added to be written
+		"""
+		if self._thread is not None:
+			if self._thread.is_alive() and self._error is None:
+				self._queue.put(('close', None, None))
+			self._thread.join()
+			self._thread = None
+		# the writer's state goes with it
+		self._has_state = False
+		self._check()
+
+	def remove(self):
+		"""
+		deletes the files of the journal
+		"""
+		self.close()
+		for name in (self.CHECKPOINT_FILE, self.LOG_FILE):
+			if os.path.exists(self._get_file_path(name)):
+				os.remove(self._get_file_path(name))
@@ -0,0 +1,131 @@
+class CrawlState:
+	"""
+	the frontier and the pages and links found by a breadth first crawl, as plain data that records of the crawl
+	are applied to, so that a copy of it can be kept up to date from the records alone, e.g., by a journal's writer
+	"""
+	def __init__(self, max_depth, max_pages=None):
+		"""
+		:param int max_depth: the depth of the farthest pages from the first page
+		:param int or NoneType max_pages: the maximum number of pages, no limit if None
+		"""
+		self._max_depth = max_depth
+		self._max_pages = max_pages
+		self.root_url = None
+		self.depth = 0
+		self.level = {}
+		self.next_level = {}
+		self.done = set()
+		self.expanded = set()
+		self.failed = set()
+		self.num_pages = 0
+		# urls and titles of the pages, and the links between them, in the order they were found
+		self.nodes = {}
+		self.edges = {}
+
+	def __repr__(self):
+		return f'<CrawlState depth={self.depth} pages={self.num_pages} nodes={len(self.nodes)}>'
+
+	def copy(self):
+		"""
+		:rtype: CrawlState
+		"""
+		state = self.__class__(max_depth=self._max_depth, max_pages=self._max_pages)
+		state.set_state(self.get_state())
+		return state
+
+	def get_state(self):
+		"""
+		the state as a dictionary of the structures themselves, not copies of them
+		:rtype: dict
+		"""
+		return {
+			'root_url': self.root_url, 'depth': self.depth, 'level': self.level, 'next_level': self.next_level,
+			'done': self.done, 'expanded': self.expanded, 'failed': self.failed, 'num_pages': self.num_pages,
+			'nodes': list(self.nodes.items()), 'edges': list(self.edges)
+		}
+
+	def set_state(self, state):
+		"""
+		:param dict state: a state from get_state, which is copied
+		"""
+		self.root_url = state['root_url']
+		self.depth = state['depth']
+		self.level = {url: list(parent_urls) for url, parent_urls in state['level'].items()}
+		self.next_level = {url: list(parent_urls) for url, parent_urls in state['next_level'].items()}
+		self.done = set(state['done'])
+		self.expanded = set(state['expanded'])
+		self.failed = set(state['failed'])
+		self.num_pages = state['num_pages']
+		self.nodes = dict(state['nodes'])
+		self.edges = dict.fromkeys(tuple(edge) for edge in state['edges'])
+
+	def can_add_page(self):
+		"""
+		:rtype: bool
+		"""
+		return self._max_pages is None or self.num_pages < self._max_pages
+
+	def add_failure(self, url):
+		self.failed.add(url)
+		self.done.add(url)
+
+	def _connect(self, start, end, new_edges):
+		if (start, end) not in self.edges:
+			self.edges[(start, end)] = None
+			new_edges.append((start, end))
+
+	def add_page(self, url, title, child_urls):
+		"""
+		adds a page of the level, its links to the pages found so far and its children to the next level
+		:type url: str
+		:type title: str
+		:param list[str] child_urls: the urls the page links to, only used if the page is expanded
+		:rtype: tuple[bool, list[tuple[str, str]]]
+		:return: whether the page is a new node and the links that were added
+		"""
+		is_new = url not in self.nodes
+		if is_new:
+			self.nodes[url] = title
+		new_edges = []
+		for parent_url in self.level[url]:
+			self._connect(start=parent_url, end=url, new_edges=new_edges)
+
+		if self.depth < self._max_depth and url not in self.expanded:
+			self.expanded.add(url)
+			for child_url in child_urls:
+				if child_url in self.nodes:
+					self._connect(start=url, end=child_url, new_edges=new_edges)
+				elif child_url in self.failed:
+					continue
+				# a page of this level that is not loaded yet is connected when it is
+				elif child_url in self.level:
+					self.level[child_url].append(url)
+				elif child_url in self.next_level:
+					self.next_level[child_url].append(url)
+				elif self.can_add_page():
+					self.next_level[child_url] = [url]
+					self.num_pages += 1
+		self.done.add(url)
+		return is_new, new_edges
+
+	def start_next_level(self):
+		self.level = self.next_level
+		self.next_level = {}
+		self.done = set()
+		self.depth += 1
+
+	def apply(self, record):
+		"""
+		:param tuple record: ('page', url, title, child_urls), ('failed', url) or ('level',)
+		:rtype: tuple[bool, list[tuple[str, str]]]
+		:return: whether a page was added as a new node and the links that were added
+		"""
+		kind = record[0]
+		if kind == 'page':
+			_, url, title, child_urls = record
+			return self.add_page(url=url, title=title, child_urls=child_urls)
+		elif kind == 'failed':
+			self.add_failure(url=record[1])
+		elif kind == 'level':
+			self.start_next_level()
+		return False, []
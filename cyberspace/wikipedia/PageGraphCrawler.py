@@ -0,0 +1,236 @@
+from chronometry.progress import ProgressBar
+from abstract import Graph
+import warnings
+
+from ..fetch_many import fetch_many
+from .WikipediaPage import WikipediaPage
+from .CrawlJournal import CrawlJournal
+from .CrawlState import CrawlState
+from .exceptions import PageError
+from .Page_helpers import get_url_title
+
+
+class PageGraphCrawler:
+	"""
+	crawls a page and the pages it links to breadth first, one depth level at a time, loading the pages of each
+	level in a bounded pool of threads, into a Graph whose nodes are the urls of the pages,
+	with a journal the crawl is checkpointed as it goes and resumed from where it stopped
+	"""
+	BATCH_SIZE = 50
+
+	def __init__(
+			self, wikipedia, max_depth=1, max_pages=None, max_workers=8, redirect=True, journal=None, source=None,
+			echo=1
+	):
+		"""
+		:type wikipedia: cyberspace.Wikipedia
+		:param int max_depth: the depth of the farthest pages from the first page
+		:param int or NoneType max_pages: the maximum number of pages in the graph, no limit if None
+		:param int max_workers: the maximum number of pages loaded at the same time
+		:type redirect: bool
+		:param CrawlJournal or str or NoneType journal: a journal or the directory of one
+		:param str or NoneType source: 'html' to load the body of each page for its links, 'api' to get the links
+		of BATCH_SIZE pages at a time from prop=links|categories queries, the link_source of wikipedia if None
+		:type echo: int
+		"""
+		self._wikipedia = wikipedia
+		self._max_depth = max_depth
+		self._max_pages = max_pages
+		self._max_workers = max_workers
+		self._redirect = redirect
+		self._journal = CrawlJournal(path=journal) if isinstance(journal, str) else journal
+		self._journal_contents = None
+		self._source = source or wikipedia.link_source
+		self._echo = echo
+		self._graph = None
+		self._state = CrawlState(max_depth=max_depth, max_pages=max_pages)
+
+	def __repr__(self):
+		return f'<PageGraphCrawler max_depth={self._max_depth} max_pages={self._max_pages} pages={self._state.num_pages}>'
+
+	@property
+	def graph(self):
+		"""
+		:rtype: Graph or NoneType
+		"""
+		return self._graph
+
+	@property
+	def journal(self):
+		"""
+		:rtype: CrawlJournal or NoneType
+		"""
+		return self._journal
+
+	def _load_journal(self):
+		if self._journal_contents is None:
+			self._journal_contents = self._journal.load() if self._journal is not None else (None, [])
+		return self._journal_contents
+
+	@property
+	def can_resume(self):
+		"""
+		whether the journal has a crawl to resume, which does not need a first page
+		:rtype: bool
+		"""
+		state, _ = self._load_journal()
+		return state is not None
+
+	def _make_node(self, url, title, page=None):
+		if page is None:
+			# pages are loaded again only if their attributes are used
+			page = WikipediaPage(wikipedia=self._wikipedia, url=url, redirect=self._redirect)
+		self._graph.add_node(name=url, label=title, value=page)
+
+	def _set_state(self, state):
+		self._state.set_state(state)
+		existing_urls = {node.name for node in self._graph.nodes}
+		for url, title in self._state.nodes.items():
+			if url not in existing_urls:
+				self._make_node(url=url, title=title)
+		for start, end in self._state.edges:
+			self._graph.connect(start=start, end=end, if_edge_exists='ignore')
+
+	def _record(self, record):
+		if self._journal is not None:
+			self._journal.add(record)
+			if self._journal.needs_checkpoint:
+				self._journal.checkpoint()
+
+	def _apply(self, record):
+		kind = record[0]
+		if kind == 'page':
+			_, url, title, child_urls = record
+			self._add_page(url=url, title=title, child_urls=child_urls)
+		elif kind == 'failed':
+			self._state.add_failure(url=record[1])
+		elif kind == 'level':
+			self._state.start_next_level()
+
+	def _load(self, url, expand, page=None):
+		"""
+		:rtype: tuple[WikipediaPage, str, list[str], Exception or NoneType]
+		"""
+		try:
+			if page is None:
+				page = WikipediaPage(wikipedia=self._wikipedia, url=url, redirect=self._redirect)
+			title = page['title']
+			child_urls = page.get_child_urls() if expand else []
+			return page, title, child_urls, None
+		except Exception as error:
+			return page, None, [], error
+
+	def _load_batch(self, urls, expand, pages):
+		"""
+		the titles and child urls of pages from one query that does not load their body,
+		their links are only requested if they are expanded
+		:rtype: list[tuple[WikipediaPage, str, list[str], Exception or NoneType]]
+		"""
+		titles = [get_url_title(url) for url in urls]
+		try:
+			results = self._wikipedia.get_links_and_categories(titles=titles, links=expand)
+		except Exception as error:
+			return [(None, None, [], error) for _ in urls]
+
+		loaded = []
+		for url, title in zip(urls, titles):
+			result = results.get(title)
+			if result is None:
+				loaded.append((None, None, [], PageError(title=title)))
+				continue
+			page = pages.get(url) or WikipediaPage(wikipedia=self._wikipedia, url=url, redirect=self._redirect)
+			if expand:
+				page.pensieve['links_and_categories'] = result
+			loaded.append((page, result['title'], result['links'], None))
+		return loaded
+
+	def _add_page(self, url, title, child_urls, page=None):
+		is_new, edges = self._state.add_page(url=url, title=title, child_urls=child_urls)
+		if is_new:
+			self._make_node(url=url, title=title, page=page)
+		for start, end in edges:
+			self._graph.connect(start=start, end=end, if_edge_exists='ignore')
+
+	def _crawl_level(self, pages=None):
+		"""
+		loads the pages of the level that are not done and adds them to the graph
+		:param dict[str, WikipediaPage] or NoneType pages: pages of the level that are already made
+		"""
+		pages = pages or {}
+		expand = self._state.depth < self._max_depth
+		urls = [url for url in self._state.level if url not in self._state.done]
+		progress_bar = ProgressBar(total=len(urls), echo=self._echo)
+		if self._source == 'api':
+			batches = [urls[start:start + self.BATCH_SIZE] for start in range(0, len(urls), self.BATCH_SIZE)]
+			kwargs_list = ({'urls': batch, 'expand': expand, 'pages': pages} for batch in batches)
+			results = (
+				(url, result)
+				for kwargs, batch_results in fetch_many(
+					function=self._load_batch, kwargs_list=kwargs_list, max_workers=self._max_workers
+				)
+				for url, result in zip(kwargs['urls'], batch_results)
+			)
+		else:
+			kwargs_list = ({'url': url, 'expand': expand, 'page': pages.get(url)} for url in urls)
+			results = (
+				(kwargs['url'], result)
+				for kwargs, result in fetch_many(
+					function=self._load, kwargs_list=kwargs_list, max_workers=self._max_workers
+				)
+			)
+
+		for number, (url, (page, title, child_urls, error)) in enumerate(results):
+			if error is not None:
+				if url == self._state.root_url:
+					raise error
+				warnings.warn(f'failed to load "{url}": {error}')
+				self._state.add_failure(url=url)
+				self._record(('failed', url))
+			else:
+				self._add_page(url=url, title=title, child_urls=child_urls, page=page)
+				self._record(('page', url, title, child_urls if expand else []))
+			progress_bar.show(amount=number + 1, text=f'depth {self._state.depth}: {url}')
+
+	def crawl(self, page=None, graph=None):
+		"""
+		crawls from page, or resumes the crawl of the journal if it has one
+		:param WikipediaPage or NoneType page: the first page, not needed to resume
+		:param Graph or NoneType graph: a graph to add the pages to, a new one if not provided
+		:rtype: Graph
+		"""
+		self._graph = graph if graph is not None else Graph(obj=None, strict=True, ordering=True)
+		state, records = self._load_journal()
+		pages = {}
+		if state is not None:
+			self._set_state(state)
+			for record in records:
+				self._apply(record)
+			if self._journal is not None:
+				# the writer folds the records into its own copy of the state, made once when the crawl starts
+				self._journal.checkpoint(state=self._state.copy())
+		elif page is None:
+			raise ValueError('page is needed when there is no crawl to resume!')
+		else:
+			self._state.nodes = {node.name: node.label for node in self._graph.nodes}
+			self._state.edges = dict.fromkeys((edge.start.name, edge.end.name) for edge in self._graph.edges)
+			self._state.root_url = page['url']
+			self._state.level = {self._state.root_url: []}
+			self._state.num_pages = len(self._state.nodes.keys() | {self._state.root_url})
+			pages = {self._state.root_url: page}
+			if self._journal is not None:
+				self._journal.checkpoint(state=self._state.copy())
+
+		try:
+			while True:
+				self._crawl_level(pages=pages)
+				pages = {}
+				if self._state.depth >= self._max_depth or not self._state.next_level:
+					break
+				self._state.start_next_level()
+				self._record(('level',))
+			if self._journal is not None:
+				self._journal.checkpoint()
+		finally:
+			if self._journal is not None:
+				self._journal.close()
+		return self._graph
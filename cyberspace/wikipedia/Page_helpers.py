@@ -1,3 +1,5 @@
+from urllib.parse import urlsplit, parse_qs, quote, unquote
+from html import escape
 import functools
 import operator
 
@@ -21,6 +23,108 @@ def get_search_parameters(id, title):
 	return query_parameters
 
 
+BATCH_PROPERTIES = {
+	'prop': 'info|pageprops|extracts',
+	'inprop': 'url',
+	'ppprop': 'disambiguation',
+	'redirects': '',
+	'exintro': '',
+	'explaintext': '',
+	'exlimit': 'max'
+}
+
+
+def get_batch_parameters(ids=None, titles=None):
+	"""
+	the parameters of one query for the info, disambiguation pageprops and intro extracts of many pages
+	:param list[int or str] or NoneType ids: at most 50 page ids
+	:param list[str] or NoneType titles: at most 50 titles, not with ids, which the api does not allow
+	:rtype: dict
+	"""
+	query_parameters = dict(BATCH_PROPERTIES)
+
+	if ids and titles:
+		raise ValueError('a query can have ids or titles, not both!')
+	elif ids:
+		query_parameters['pageids'] = '|'.join(str(id) for id in ids)
+	else:
+		query_parameters['titles'] = '|'.join(titles)
+
+	return query_parameters
+
+
+def get_links_and_categories_parameters(ids=None, titles=None, links=True):
+	"""
+	the parameters of one query for the article links and categories of many pages
+	:param list[int or str] or NoneType ids: at most 50 page ids
+	:param list[str] or NoneType titles: at most 50 titles, not with ids, which the api does not allow
+	:param bool links: if False only the categories are requested
+	:rtype: dict
+	"""
+	query_parameters = {
+		'prop': 'links|categories' if links else 'categories',
+		'plnamespace': 0,
+		'pllimit': 'max',
+		'cllimit': 'max',
+		'redirects': ''
+	}
+
+	if ids and titles:
+		raise ValueError('a query can have ids or titles, not both!')
+	elif ids:
+		query_parameters['pageids'] = '|'.join(str(id) for id in ids)
+	else:
+		query_parameters['titles'] = '|'.join(titles)
+
+	return query_parameters
+
+
+def get_page_url(title, language):
+	"""
+	the url of a page, with the characters that wikipedia leaves unescaped in its links
+	:type title: str
+	:type language: str
+	:rtype: str
+	"""
+	return f'https://{language}.wikipedia.org/wiki/' + quote(title.replace(' ', '_'), safe=";@$!*(),/~:")
+
+
+def get_search_generator_parameters(query, num_results, redirect=True):
+	"""
+	the parameters of one query for the search results of query with their info, disambiguation pageprops and
+	intro extracts
+	:type query: str
+	:param int num_results: at most 50
+	:param bool redirect: if False redirect pages are returned as they are
+	:rtype: dict
+	"""
+	query_parameters = {
+		**BATCH_PROPERTIES,
+		'generator': 'search',
+		'gsrsearch': query,
+		'gsrlimit': num_results,
+		'gsrprop': ''
+	}
+	if not redirect:
+		del query_parameters['redirects']
+	return query_parameters
+
+
+def get_search_result(page, redirected_from=None):
+	"""
+	the search result of a page as _search_page returns it
+	:param dict page: a page of the pages of a query with prop=info|pageprops and inprop=url
+	:param str or NoneType redirected_from: the title the page was redirected from
+	:rtype: dict
+	"""
+	return {
+		'id': int(page['pageid']), 'title': page['title'], 'page': page, 'redirected_from': redirected_from,
+		'full_url': page['fullurl'], 'language': page['pagelanguage'], 'namespace': page['ns'],
+		# since we only ask for disambiguation in pageprops, a page with pageprops is a disambiguation page
+		'disambiguation': 'pageprops' in page
+	}
+
+
 def get_disambiguation_results(disambiguation, html, base_url):
 	if disambiguation:
 		original_content = html.find(attrs={'id': 'bodyContent'}).find(attrs={'id': 'mw-content-text'})
@@ -37,20 +141,89 @@ def get_disambiguation_results(disambiguation, html, base_url):
 		return []
 
 
-def get_html_parameters(id, title):
+def get_parse_parameters(id=None, title=None):
+	"""
+	the parameters of one parse request for the rendered body, categories and page properties of a page
+	:param int or str or NoneType id: the page id
+	:param str or NoneType title: the title, used if id is not provided
+	:rtype: dict
+	"""
 	query_params = {
-		'prop': 'revisions',
-		'rvprop': 'content',
-		'rvparse': '',
-		'rvlimit': 1
+		'action': 'parse',
+		'prop': 'text|categories|properties|revid|displaytitle',
+		'redirects': '',
+		'disableeditsection': ''
 	}
 	if id:
-		query_params['pageids'] = id
+		query_params['pageid'] = id
 	else:
-		query_params['titles'] = title
+		query_params['page'] = title
 	return query_params
 
 
+def get_url_title(url):
+	"""
+	the title in the url of a page, e.g., Steve Jobs in https://en.wikipedia.org/wiki/Steve_Jobs
+	:type url: str
+	:rtype: str
+	"""
+	parts = urlsplit(url)
+	if '/wiki/' in parts.path:
+		title = parts.path[parts.path.find('/wiki/') + len('/wiki/'):]
+	else:
+		title = parse_qs(parts.query).get('title', [''])[0]
+	return unquote(title).replace('_', ' ')
+
+
+def get_url_language(url):
+	"""
+	the language in the host of the url of a page, e.g., en in https://en.wikipedia.org/wiki/Steve_Jobs
+	:type url: str
+	:rtype: str
+	"""
+	return urlsplit(url).hostname.split('.')[0]
+
+
+def get_parse_text(parse_result):
+	"""
+	:param dict parse_result: the parse of a parse request
+	:rtype: str
+	"""
+	text = parse_result['text']
+	return text['*'] if isinstance(text, dict) else text
+
+
+def get_parse_html(parse_result):
+	"""
+	the html of a page made of the rendered body and the categories of a parse request,
+	with the body and the category box where they are in the html of the article
+	:param dict parse_result: the parse of a parse request
+	:rtype: str
+	"""
+	category_items = []
+	for category in parse_result.get('categories', []):
+		name = category['*'] if isinstance(category, dict) else category
+		# the body is html already but category names are text
+		text = escape(name.replace('_', ' '), quote=True)
+		href = escape(f'/wiki/Category:{quote(name)}', quote=True)
+		category_items.append(f'<li><a href="{href}" title="Category:{text}">{text}</a></li>')
+	return (
+		f'<html><body><div id="bodyContent"><div id="mw-content-text">{get_parse_text(parse_result)}</div></div>'
+		f'<div id="catlinks" class="catlinks"><ul>{"".join(category_items)}</ul></div></body></html>'
+	)
+
+
+def get_parse_properties(parse_result):
+	"""
+	:param dict parse_result: the parse of a parse request
+	:rtype: dict[str, str]
+	"""
+	properties = parse_result.get('properties', [])
+	if isinstance(properties, dict):
+		return properties
+	return {item['name']: item.get('*', '') for item in properties}
+
+
 def get_summary_parameters(id, title):
 	query_params = {
 		'prop': 'extracts',
@@ -88,8 +261,12 @@ def get_content_parameters(id, title):
 	return query_params
 
 
-def separate_body_from_navigation_and_info_box(url_response):
-	html = BeautifulSoup(url_response.text, 'lxml')
+def separate_body_from_navigation_and_info_box(html):
+	"""
+	:param str html: the html of a page, e.g., from get_parse_html
+	:rtype: dict
+	"""
+	html = BeautifulSoup(html, 'lxml')
 
 	vertical_navigation_box = html.find(name='table', attrs={'class': 'vertical-navbox'})
 	info_box = html.find(name='table', attrs={'class': 'infobox'})
@@ -1,18 +1,23 @@
 # p
 from copy import deepcopy
-import requests
-from requests.adapters import SSLError
-import time
+import asyncio
 import warnings
 import re
 from disk import Cache, HardFolder
 
 # i
-from chronometry import MeasurementSet, get_elapsed, get_now
+from chronometry import MeasurementSet
 from abstract import Graph
 
-from .exceptions import HTTPTimeoutError, WikipediaException
+from ..transport import TRANSPORT, Hedging, ResponseRecord, get_conditional_headers, get_canonical_url, get_canonical_parameters
+from ..AsyncRunner import AsyncRunner
+from ..caching import make_cached, get_cache, SingleFlight
+from .exceptions import HTTPTimeoutError, WikipediaException, PageError, RedirectError
 from .WikipediaPage import WikipediaPage
+from .PageGraphCrawler import PageGraphCrawler
+from .CrawlJournal import CrawlJournal
+from .Page_helpers import get_batch_parameters, get_search_generator_parameters, get_search_result
+from .Page_helpers import get_links_and_categories_parameters, get_page_url
 from .WikipediaMemory import WikipediaMemory
 from .get_special_data import get_special_data
 
@@ -23,37 +28,68 @@ class Wikipedia:
 			user_agent='wikipedia (https://github.com/goldsmith/Wikipedia/)',
 			rate_limit_wait_seconds=0.01,
 			cache=None,
-			num_request_tries=4
+			num_request_tries=4,
+			transport=None,
+			max_concurrency=32,
+			expire_in=None,
+			hedging=None,
+			link_source='html'
 	):
 		"""
 		:param str language: such as 'en'
 		:param str user_agent:
 		:param float rate_limit_wait_seconds: wait between requests
-		:param disk.Cache.Cache cache:
+		:param str or disk.Cache.Cache or cyberspace.caching.SQLiteCache or cyberspace.caching.MemoryCache cache:
+		a path ending with .sqlite selects an SQLiteCache
+		:param cyberspace.transport.Transport or NoneType transport: the shared transport is used if not provided
+		:param int max_concurrency: maximum number of requests in flight for the async methods
+		:param str or NoneType expire_in: if provided cached requests expire and pages are revalidated, e.g., '30 days'
+		:param cyberspace.transport.Hedging or bool or NoneType hedging: hedges slow requests if provided or True
+		:param str link_source: where the child urls and categories of pages come from, 'html' for the links and
+		category box of their body, 'api' for a prop=links|categories query that does not load their body
 		"""
+		if link_source not in ('html', 'api'):
+			raise ValueError(f'link_source should be html or api, not {link_source}!')
 		self._language = language
 		self._user_agent = user_agent
 		self._rate_limit_wait = rate_limit_wait_seconds
-		self._rate_limit_last_call = None
 		self._num_request_tries = num_request_tries
+		self._expire_in = expire_in
+		self._transport = transport or TRANSPORT
+		self._hedging = Hedging() if hedging is True else (hedging or None)
+		self._link_source = link_source
+		self._async_runner = AsyncRunner(max_concurrency=max_concurrency)
 
 		self._has_memory = False
 		# if self.has_memory():
 		# 	self._memory = WikipediaMemory(path=self._pickle_path)
 
-		self._cache = cache
+		self._cache = get_cache(cache)
+		self._create_cached_functions()
+
+		self._function_durations = MeasurementSet()
+
+	def _create_cached_functions(self):
+		self._single_flight = SingleFlight()
 		if self._cache:
-			self.request = self._cache.make_cached(
+			self.request = make_cached(
+				cache=self._cache,
 				id='wikipedia_request_function',
 				function=self._request,
 				condition_function=self._request_result_valid,
-				sub_directory='request'
+				sub_directory='request',
+				expire_in=self._expire_in,
+				revalidate=self._revalidate,
+				single_flight=self._single_flight,
+				key_function=self._get_canonical_request,
+				raw_key_function=self._get_raw_request
 			)
 
 		else:
-			self.request = self._request
-
-		self._function_durations = MeasurementSet()
+			self.request = self._single_flight.make_coalesced(
+				function=self._request, id='wikipedia_request_function'
+			)
+		self._transport.metrics.add_cached_function(self.request, name='wikipedia_request_function')
 
 	def __hashkey__(self):
 		return (self.__class__.__name__, self._language, self._user_agent, self._rate_limit_wait, self._cache)
@@ -63,8 +99,13 @@ class Wikipedia:
 			'language': self._language,
 			'user_agent': self._user_agent,
 			'rate_limit_wait': self._rate_limit_wait,
-			'rate_limit_last_call': self._rate_limit_last_call,
+			'num_request_tries': self._num_request_tries,
+			'expire_in': self._expire_in,
 			'cache': self._cache,
+			'transport': self._transport,
+			'hedging': self._hedging,
+			'link_source': self._link_source,
+			'async_runner': self._async_runner,
 			'function_durations': self._function_durations
 		}
 
@@ -72,19 +113,16 @@ class Wikipedia:
 		self._language = state['language']
 		self._user_agent = state['user_agent']
 		self._rate_limit_wait = state['rate_limit_wait']
-		self._rate_limit_last_call = state['rate_limit_last_call']
+		self._num_request_tries = state.get('num_request_tries', 4)
+		self._expire_in = state.get('expire_in')
+		self._has_memory = False
 		self._cache = state['cache']
+		self._transport = state.get('transport', TRANSPORT)
+		self._hedging = state.get('hedging')
+		self._link_source = state.get('link_source', 'html')
+		self._async_runner = state.get('async_runner') or AsyncRunner()
 		self._function_durations = state['function_durations']
-		if self._cache:
-			self.request = self._cache.make_cached(
-				id='wikipedia_request_function',
-				function=self._request,
-				condition_function=self._request_result_valid,
-				sub_directory='request'
-			)
-
-		else:
-			self.request = self._request
+		self._create_cached_functions()
 
 	def __eq__(self, other):
 		"""
@@ -110,6 +148,28 @@ class Wikipedia:
 		"""
 		return self._cache
 
+	@property
+	def single_flight(self):
+		"""
+		:rtype: SingleFlight
+		"""
+		return self._single_flight
+
+	@property
+	def transport(self):
+		"""
+		:rtype: cyberspace.transport.Transport
+		"""
+		return self._transport
+
+	@property
+	def metrics(self):
+		"""
+		http metrics of the transport and hit ratios of the cached requests
+		:rtype: cyberspace.transport.Metrics
+		"""
+		return self._transport.metrics
+
 	@property
 	def function_durations(self):
 		"""
@@ -121,15 +181,82 @@ class Wikipedia:
 	def language(self):
 		return self._language.lower()
 
+	@property
+	def link_source(self):
+		"""
+		:rtype: str
+		"""
+		return self._link_source
+
 	@property
 	def api_url(self):
 		return 'http://' + self.language + '.wikipedia.org/w/api.php'
 
+	@property
+	def _requests_per_second(self):
+		if self._rate_limit_wait:
+			return 1 / self._rate_limit_wait
+		else:
+			return None
+
 	@staticmethod
 	def _request_result_valid(result, **kwargs):
 		return result is not None
 
-	def _request(self, parameters=None, url=None, format='json'):
+	def _revalidate(self, result, parameters=None, url=None, format='json', headers=None):
+		"""
+		asks the server whether an expired cached page has changed and returns it if it has not,
+		api results are requested again because they do not carry validators
+		:rtype: dict or ResponseRecord
+		"""
+		conditional_headers = get_conditional_headers(response=result) if format != 'json' else None
+		if not conditional_headers:
+			return self._request(parameters=parameters, url=url, format=format, headers=headers)
+
+		headers = {**(headers or {}), **conditional_headers}
+		response = self._request(parameters=parameters, url=url, format=format, headers=headers)
+		if response.status_code == 304:
+			return result
+		else:
+			return response
+
+	@staticmethod
+	def _get_canonical_request(parameters=None, url=None, format='json', headers=None):
+		"""
+		the arguments of _request that make its cache key, only the parameters matter for json requests
+		and only the url for other formats
+		:rtype: dict
+		"""
+		if format == 'json':
+			parameters = get_canonical_parameters(parameters, defaults={'format': 'json', 'action': 'query'})
+			url = None
+		else:
+			parameters = None
+			url = get_canonical_url(url)
+		return {'parameters': parameters, 'url': url, 'format': format, 'headers': headers}
+
+	@staticmethod
+	def _get_raw_request(*args, **kwargs):
+		"""
+		the arguments of a call as they were in its cache key before canonical keys,
+		when _request added format and action to the parameters of a json request before the key was made
+		:rtype: tuple[tuple, dict]
+		"""
+		format = kwargs.get('format', args[2] if len(args) > 2 else 'json')
+		parameters = kwargs.get('parameters', args[0] if args else None)
+		if format != 'json' or not isinstance(parameters, dict):
+			return args, kwargs
+
+		parameters = dict(parameters)
+		parameters['format'] = 'json'
+		if 'action' not in parameters:
+			parameters['action'] = 'query'
+		if 'parameters' in kwargs:
+			return args, {**kwargs, 'parameters': parameters}
+		else:
+			return (parameters, *args[1:]), kwargs
+
+	def _request(self, parameters=None, url=None, format='json', headers=None):
 		"""
 		:type parameters: dict
 		:rtype: dict
@@ -142,50 +269,25 @@ class Wikipedia:
 				print('getting request from memory!')
 				return results
 
-		_format = format
-		for i in range(1, self._num_request_tries + 1):
-
-			try:
-				if _format == 'json':
-					if parameters is None:
-						raise ValueError('parameters cannot be empty for json request!')
-					parameters['format'] = 'json'
-					if 'action' not in parameters:
-						parameters['action'] = 'query'
-				else:
-					if url is None:
-						raise ValueError('url cannot be empty for non-json request!')
-
-				headers = {'User-Agent': self._user_agent}
-
-				if self._rate_limit_wait and self._rate_limit_last_call:
-					wait_time = self._rate_limit_wait - get_elapsed(start=self._rate_limit_last_call, unit='s')
-					if wait_time > 0:
-						time.sleep(wait_time)
-
-				if _format == 'json':
-					r = requests.get(self.api_url, params=parameters, headers=headers)
-					result = r.json()
-
-				else:
-					result = requests.get(url, headers=headers)
-
-				break
-
-			except SSLError as e:
-				print(f'try {i}, error with get request with url="{url}", headers="{headers}", format="{_format}"')
-				warnings.warn(str(e))
-				time.sleep(0.001 * 10 ** i)
-
-
+		if format == 'json':
+			if parameters is None:
+				raise ValueError('parameters cannot be empty for json request!')
+			parameters = {'action': 'query', **parameters, 'format': 'json'}
+		elif url is None:
+			raise ValueError('url cannot be empty for non-json request!')
+
+		# the transport retries failed requests as its retry policy allows
+		headers = {'User-Agent': self._user_agent, **(headers or {})}
+		if format == 'json':
+			result = self.transport.get(
+				self.api_url, params=parameters, headers=headers, rate=self._requests_per_second,
+				max_tries=self._num_request_tries, hedging=self._hedging
+			).json()
 		else:
-			raise e
-
-			# result = html.document_fromstring(r.text)
-			# result = r.text
-
-		if self._rate_limit_wait:
-			self._rate_limit_last_call = get_now()
+			result = ResponseRecord.from_response(self.transport.get(
+				url, headers=headers, rate=self._requests_per_second, max_tries=self._num_request_tries,
+				hedging=self._hedging
+			))
 
 		if self.has_memory():
 			self.memory.set_request_result(key=memory_key, results=result)
@@ -222,52 +324,224 @@ class Wikipedia:
 
 		return page
 
+	def _request_all(self, parameters):
+		"""
+		requests a query and then the rest of its results for as long as the response has a continue
+		:type parameters: dict
+		:rtype: generator of dict
+		"""
+		parameters = dict(parameters)
+		while True:
+			result = self.request(parameters)
+			if 'error' in result:
+				if result['error']['info'] in ('HTTP request timed out.', 'Pool queue is full'):
+					raise HTTPTimeoutError(parameters)
+				else:
+					raise WikipediaException(result['error']['info'])
+			yield result
+			if 'continue' not in result:
+				break
+			parameters = {**parameters, **result['continue']}
+
+	def _request_batch(self, parameters):
+		"""
+		requests a query and then the rest of the properties of its pages until the batch is complete,
+		without moving on to the next pages of a generator
+		:type parameters: dict
+		:rtype: generator of dict
+		"""
+		for result in self._request_all(parameters):
+			yield result
+			if 'batchcomplete' in result:
+				break
+
+	@staticmethod
+	def _merge_query_pages(results):
+		"""
+		:param results: the results of a query and its continuations
+		:rtype: tuple[dict, dict, dict]
+		:return: pages by key, normalized titles and redirects
+		"""
+		query_pages = {}
+		normalized = {}
+		redirects = {}
+		for result in results:
+			query = result.get('query', {})
+			# extracts, links and categories continue separately, so the same page can come back in several parts
+			for key, page in query.get('pages', {}).items():
+				merged_page = query_pages.setdefault(key, {})
+				for name, value in page.items():
+					if isinstance(value, list) and isinstance(merged_page.get(name), list):
+						merged_page[name] = merged_page[name] + value
+					else:
+						merged_page[name] = value
+			normalized.update({item['from']: item['to'] for item in query.get('normalized', [])})
+			redirects.update({item['from']: item['to'] for item in query.get('redirects', [])})
+		return query_pages, normalized, redirects
+
+	def _get_page_batch(self, ids=None, titles=None, redirect=True, ignore_missing=True):
+		query_pages, normalized, redirects = self._merge_query_pages(
+			self._request_all(get_batch_parameters(ids=ids, titles=titles))
+		)
+
+		pages_by_id = {str(page['pageid']): page for page in query_pages.values() if 'pageid' in page}
+		pages_by_title = {page['title']: page for page in query_pages.values() if 'title' in page}
+
+		pages = []
+		for id in ids or []:
+			page = pages_by_id.get(str(id))
+			if page is None:
+				# the response does not say which of the requested ids were redirected, those load on their own
+				pages.append(WikipediaPage(wikipedia=self, id=id, redirect=redirect))
+			elif 'missing' in page:
+				if not ignore_missing:
+					raise PageError(id=id)
+			else:
+				pages.append(WikipediaPage(
+					wikipedia=self, id=page['pageid'], namespace=page['ns'], redirect=redirect,
+					search_result=get_search_result(page=page)
+				))
+
+		for title in titles or []:
+			title = normalized.get(title, title)
+			redirected_from = None
+			if title in redirects:
+				if not redirect:
+					raise RedirectError(title)
+				redirected_from, title = title, redirects[title]
+			page = pages_by_title.get(title)
+			if page is None or 'missing' in page or 'invalid' in page:
+				if not ignore_missing:
+					raise PageError(title=title)
+			else:
+				pages.append(WikipediaPage(
+					wikipedia=self, id=page['pageid'], namespace=page['ns'], redirect=redirect,
+					search_result=get_search_result(page=page, redirected_from=redirected_from)
+				))
+		return pages
+
+	def _get_links_and_categories_batch(self, ids=None, titles=None, links=True):
+		query_pages, normalized, redirects = self._merge_query_pages(
+			self._request_all(get_links_and_categories_parameters(ids=ids, titles=titles, links=links))
+		)
+		pages_by_id = {}
+		pages_by_title = {}
+		for page in query_pages.values():
+			if 'pageid' in page and 'missing' not in page:
+				pages_by_id[str(page['pageid'])] = page
+				pages_by_title[page['title']] = page
+
+		def _get_result(page):
+			if page is None:
+				return None
+			return {
+				'id': page['pageid'], 'title': page['title'],
+				'url': get_page_url(title=page['title'], language=self.language),
+				'links': [get_page_url(title=link['title'], language=self.language) for link in page.get('links', [])],
+				'categories': [
+					category['title'][category['title'].find(':') + 1:] for category in page.get('categories', [])
+				]
+			}
+
+		results = {}
+		for id in ids or []:
+			results[id] = _get_result(pages_by_id.get(str(id)))
+		for title in titles or []:
+			resolved_title = normalized.get(title, title)
+			resolved_title = redirects.get(resolved_title, resolved_title)
+			results[title] = _get_result(pages_by_title.get(resolved_title))
+		return results
+
+	def get_links_and_categories(self, ids=None, titles=None, links=True, batch_size=50):
+		"""
+		the urls of the articles that pages link to and the names of their categories, from prop=links|categories
+		queries of batch_size pages each, without loading the body of any page
+		:param list[int or str] or NoneType ids:
+		:param list[str] or NoneType titles: redirects are followed
+		:param bool links: if False only the categories are requested and links are empty
+		:param int batch_size: pages per query, the api allows 50 (500 for bots)
+		:rtype: dict[int or str, dict or NoneType]
+		:return: for each id or title, a dictionary of id, title, url, links and categories,
+		or None if the page does not exist or an id is a redirect
+		"""
+		ids = list(ids or [])
+		titles = list(titles or [])
+		results = {}
+		for start in range(0, len(ids), batch_size):
+			results.update(self._get_links_and_categories_batch(ids=ids[start:start + batch_size], links=links))
+		for start in range(0, len(titles), batch_size):
+			results.update(self._get_links_and_categories_batch(titles=titles[start:start + batch_size], links=links))
+		return results
+
+	def get_pages(self, ids=None, titles=None, redirect=True, ignore_missing=True, batch_size=50):
+		"""
+		loads many pages with one query per batch that gets their info, disambiguation, redirects, normalized titles
+		and summaries, the rest of each page is loaded when it is first accessed
+		:param list[int or str] or NoneType ids:
+		:param list[str] or NoneType titles:
+		:param bool redirect: if False a title that redirects raises RedirectError
+		:param bool ignore_missing: if False a page that does not exist raises PageError instead of being left out
+		:param int batch_size: pages per query, the api allows 50 (500 for bots)
+		:rtype: list[WikipediaPage]
+		:return: the pages of ids, then the pages of titles, in the same order
+		"""
+		ids = list(ids or [])
+		titles = list(titles or [])
+		pages = []
+		for start in range(0, len(ids), batch_size):
+			pages += self._get_page_batch(
+				ids=ids[start:start + batch_size], redirect=redirect, ignore_missing=ignore_missing
+			)
+		for start in range(0, len(titles), batch_size):
+			pages += self._get_page_batch(
+				titles=titles[start:start + batch_size], redirect=redirect, ignore_missing=ignore_missing
+			)
+		return pages
+
 	def get_page_graph(
 			self, graph=None, id=None, url=None, title=None, namespace=0, redirect=True,
-			max_depth=1, strict=True, ordering=True, echo=1
+			max_depth=1, strict=True, ordering=True, echo=1, max_pages=None, max_workers=8,
+			journal=None, checkpoint_every=1000, source=None
 	):
+		"""
+		crawls a page and the pages it links to, breadth first and a level at a time, into a graph of page urls
+		:param Graph or NoneType graph: a graph to add to, it is copied
+		:param int max_depth: the depth of the farthest pages from the first page
+		:param int or NoneType max_pages: the maximum number of pages in the graph, no limit if None
+		:param int max_workers: the maximum number of pages loaded at the same time
+		:param str or CrawlJournal or NoneType journal: a directory where the crawl is checkpointed,
+		if it already has a crawl that crawl is resumed instead of starting from id, url or title
+		:param int checkpoint_every: pages crawled between checkpoints of the journal
+		:param str or NoneType source: 'html' or 'api', where the links of pages come from, link_source if None
+		:rtype: Graph
+		"""
+		if graph:
+			graph = deepcopy(graph)
+		else:
+			graph = Graph(obj=None, strict=strict, ordering=ordering)
+
+		if isinstance(journal, str):
+			journal = CrawlJournal(path=journal, max_records=checkpoint_every)
+		crawler = PageGraphCrawler(
+			wikipedia=self, max_depth=max_depth, max_pages=max_pages, max_workers=max_workers,
+			redirect=redirect, journal=journal, source=source, echo=echo
+		)
 		try:
-			if graph:
-				graph = deepcopy(graph)
+			if crawler.can_resume:
+				page = None
 			else:
-				graph = Graph(obj=None, strict=strict, ordering=ordering)
-
-			def _crawl(_graph, _page, _parent_page, _max_depth, _depth, _echo, _crawl_completed):
-				if _page['url'] not in _graph:
-					_graph.add_node(name=_page['url'], label=_page['title'], value=_page)
-
-				if _parent_page is not None:
-					_graph.connect(start=_parent_page['url'], end=_page['url'], if_edge_exists='ignore')
-
-				# to avoid crawling the children of a page for a second time we add the url of the parent page in
-				# crawl_completed at the end
-				if _page['url'] not in _crawl_completed and _depth < _max_depth:
-					for child in _page.get_children(echo=_echo):
-						_crawl(
-							_graph=_graph, _page=child,
-							_parent_page=_page, _max_depth=_max_depth, _depth=_depth + 1, _echo=_echo,
-							_crawl_completed=_crawl_completed
-						)
-					_crawl_completed.append(_page['url'])
-
-			page = self.get_page(id=id, url=url, title=title, namespace=namespace, redirect=redirect)
-			_crawl(
-				_graph=graph, _page=page, _parent_page=None,
-				_max_depth=max_depth, _echo=echo, _depth=0, _crawl_completed=[]
-			)
-			return graph
+				page = self.get_page(id=id, url=url, title=title, namespace=namespace, redirect=redirect)
+			return crawler.crawl(page=page, graph=graph)
 		except KeyboardInterrupt:
 			warnings.warn('get_page_graph was interrupted by keyboard!')
 			return graph
 
-	def search(self, query, num_results=10, redirect=True):
+	def _get_search_results(self, query, num_results):
 		"""
-		Do a Wikipedia search for `query`.
 		:type query: str
-		:param int num_results: the maxmimum number of results returned
-		:type redirect: bool
+		:type num_results: int
+		:rtype: list[dict]
 		"""
-
 		search_params = {
 			'list': 'search',
 			'srprop': '',
@@ -284,15 +558,14 @@ class Wikipedia:
 			else:
 				raise WikipediaException(raw_results['error']['info'])
 
-		results = raw_results['query']['search']
-		try:
-			pages = [
-				WikipediaPage(wikipedia=self, id=d['pageid'], title=d['title'], namespace=d['ns'], redirect=redirect) for d in results
-			]
-		except Exception as e:
-			print('\n'*5, 'error in:\n', results, '\n'*5)
-			raise e
+		return raw_results['query']['search']
 
+	def _get_disambiguation_results(self, pages, num_results):
+		"""
+		:type pages: list[WikipediaPage]
+		:type num_results: int
+		:rtype: list[WikipediaPage]
+		"""
 		already_captured_urls = [page['url'] for page in pages]
 		disambiguation_pages = [page for page in pages if page['disambiguation']]
 		disambiguation_results = []
@@ -309,10 +582,212 @@ class Wikipedia:
 						)
 						disambiguation_results.append(page)
 						total_num_results += 1
-		return pages + disambiguation_results
+		return disambiguation_results
+
+	def _get_search_batch(self, parameters, redirect=True):
+		"""
+		one batch of the results of a generator=search query
+		:type parameters: dict
+		:type redirect: bool
+		:rtype: tuple[list[dict], dict or NoneType]
+		:return: the search results in rank order and the parameters of the next batch if there is one
+		"""
+		results = list(self._request_batch(parameters))
+		query_pages, _, redirects = self._merge_query_pages(results)
+		redirected_from = {to_title: from_title for from_title, to_title in redirects.items()}
+
+		# the pages of a generator come by id, their index is their rank in the search results
+		pages = sorted(
+			(page for page in query_pages.values() if 'pageid' in page and 'missing' not in page),
+			key=lambda page: page.get('index', 0)
+		)
+		search_results = []
+		for page in pages:
+			if 'redirect' in page and not redirect:
+				raise RedirectError(page['title'])
+			search_results.append(get_search_result(page=page, redirected_from=redirected_from.get(page['title'])))
+
+		if results and 'batchcomplete' in results[-1] and 'continue' in results[-1]:
+			next_parameters = {**parameters, **results[-1]['continue']}
+		else:
+			next_parameters = None
+		return search_results, next_parameters
+
+	def _get_search_page(self, search_result, redirect=True):
+		return WikipediaPage(
+			wikipedia=self, id=search_result['id'], namespace=search_result['namespace'], redirect=redirect,
+			search_result=search_result
+		)
+
+	def _get_search_pages(self, query, num_results, redirect=True):
+		"""
+		searches with one generator query that also gets the info, disambiguation and summary of every result,
+		the api returns at most 20 intro extracts per request so the query is continued until the batch is complete
+		:type query: str
+		:type num_results: int
+		:type redirect: bool
+		:rtype: list[WikipediaPage]
+		"""
+		parameters = get_search_generator_parameters(query=query, num_results=num_results, redirect=redirect)
+		search_results, _ = self._get_search_batch(parameters=parameters, redirect=redirect)
+		return [self._get_search_page(search_result=result, redirect=redirect) for result in search_results]
+
+	def iter_search(self, query, max_results=None, batch_size=50, redirect=True, prefetch=True):
+		"""
+		yields the results of a search for query for as long as there are more, one generator query per batch,
+		while a batch is consumed the next one is requested in the background and pages are only created as they
+		are yielded, so that a large number of results streams in constant memory
+		:type query: str
+		:param int or NoneType max_results: the maximum number of results, all of them if None
+		:param int batch_size: results per query, the api allows 50 (500 for bots)
+		:type redirect: bool
+		:param bool prefetch: if False the next batch is only requested when the current one is consumed
+		:rtype: generator of WikipediaPage
+		"""
+		def _get_parameters(_parameters, _num_requested):
+			if _parameters is None or (max_results is not None and _num_requested >= max_results):
+				return None
+			limit = batch_size if max_results is None else min(batch_size, max_results - _num_requested)
+			return {**_parameters, 'gsrlimit': limit}
+
+		parameters = _get_parameters(
+			get_search_generator_parameters(query=query, num_results=batch_size, redirect=redirect), 0
+		)
+		num_requested = 0
+		future = None
+		try:
+			while parameters is not None:
+				if future is None:
+					search_results, next_parameters = self._get_search_batch(parameters=parameters, redirect=redirect)
+				else:
+					search_results, next_parameters = future.result()
+					future = None
+				num_requested += parameters['gsrlimit']
+				parameters = _get_parameters(next_parameters, num_requested)
+
+				if prefetch and parameters is not None:
+					future = self._async_runner.executor.submit(
+						self._get_search_batch, parameters=parameters, redirect=redirect
+					)
+
+				for search_result in search_results:
+					yield self._get_search_page(search_result=search_result, redirect=redirect)
+		finally:
+			if future is not None:
+				future.cancel()
+
+	def search(self, query, num_results=10, redirect=True, batch=False):
+		"""
+		Do a Wikipedia search for `query`.
+		:type query: str
+		:param int num_results: the maxmimum number of results returned
+		:type redirect: bool
+		:param bool batch: if True one generator query gets the results with their urls, disambiguation and
+		summaries, the api returns at most 20 summaries per request so it is continued for every 20 results after
+		the first 20, otherwise each result is looked up on its own
+		"""
+		if batch:
+			pages = self._get_search_pages(query=query, num_results=num_results, redirect=redirect)
+			return pages + self._get_disambiguation_results(pages=pages, num_results=num_results)
+
+		results = self._get_search_results(query=query, num_results=num_results)
+		try:
+			pages = [
+				WikipediaPage(wikipedia=self, id=d['pageid'], title=d['title'], namespace=d['ns'], redirect=redirect) for d in results
+			]
+		except Exception as e:
+			print('\n'*5, 'error in:\n', results, '\n'*5)
+			raise e
+
+		return pages + self._get_disambiguation_results(pages=pages, num_results=num_results)
+
+	async def arequest(self, parameters=None, url=None, format='json'):
+		"""
+		:type parameters: dict or NoneType
+		:type url: str or NoneType
+		:type format: str
+		:rtype: dict or ResponseRecord
+		"""
+		return await self._async_runner.run_cached(self.request, parameters=parameters, url=url, format=format)
+
+	async def aget_page(self, url=None, id=None, title=None, namespace=0, redirect=True):
+		"""
+		loads a page without blocking the event loop,
+		attributes that are not loaded with the page are still fetched when they are first accessed
+		:type id: int or str or NoneType
+		:type url: str or NoneType
+		:type title: str or NoneType
+		:rtype: WikipediaPage
+		"""
+		return await self._async_runner.run(
+			self._load_page, url=url, id=id, title=title, namespace=namespace, redirect=redirect
+		)
+
+	def _load_page(self, url=None, id=None, title=None, namespace=0, redirect=True):
+		page = self.get_page(url=url, id=id, title=title, namespace=namespace, redirect=redirect)
+		# url and disambiguation are needed by almost every caller and would otherwise block on first access
+		page['url']
+		page['disambiguation']
+		return page
+
+	async def asearch(self, query, num_results=10, redirect=True, batch=False):
+		"""
+		Do a Wikipedia search for `query` without blocking the event loop,
+		the pages are loaded concurrently and yielded in the order of the search results.
+		:type query: str
+		:param int num_results: the maxmimum number of results returned
+		:type redirect: bool
+		:param bool batch: if True one generator query gets the results with their urls, disambiguation and
+		summaries, continued for every 20 results after the first 20
+		:rtype: async generator of WikipediaPage
+		"""
+		if batch:
+			pages = await self._async_runner.run(
+				self._get_search_pages, query=query, num_results=num_results, redirect=redirect
+			)
+			for page in pages:
+				yield page
+			disambiguation_results = await self._async_runner.run(
+				self._get_disambiguation_results, pages=pages, num_results=num_results
+			)
+			for page in disambiguation_results:
+				yield page
+			return
+
+		results = await self._async_runner.run(self._get_search_results, query=query, num_results=num_results)
+		loop = asyncio.get_event_loop()
+		tasks = [
+			loop.create_task(self.aget_page(id=d['pageid'], title=d['title'], namespace=d['ns'], redirect=redirect))
+			for d in results
+		]
+		pages = []
+		try:
+			for task in tasks:
+				page = await task
+				pages.append(page)
+				yield page
+		finally:
+			for task in tasks:
+				task.cancel()
+
+		disambiguation_results = await self._async_runner.run(
+			self._get_disambiguation_results, pages=pages, num_results=num_results
+		)
+		for page in disambiguation_results:
+			yield page
 
 	def get_performance(self):
-		return self.function_durations.summary_data
+		"""
+		:rtype: DataFrame
+		"""
+		return self.function_durations.performance_summary
+
+	def get_http_performance(self):
+		"""
+		requests, errors, retries, bytes, latency and time to first byte percentiles and status codes per host
+		:rtype: DataFrame
+		"""
+		return self.metrics.get_host_data()
 
 	def get_data(self, name, echo=1):
 		return get_special_data(wikipedia=self, name=name, echo=echo)
@@ -1,6 +1,5 @@
-from .exceptions import PageError, RedirectError, ODD_ERROR_MESSAGE
+from .exceptions import WikipediaException, PageError, RedirectError, ODD_ERROR_MESSAGE
 from .InfoBox import InfoBox
-from .get_wikipedia_id import get_wikipedia_id, get_page_title, get_page_language, get_page_namespace
 from .Page_helpers import *
 from .is_wikipedia_page_url import is_wikipedia_page_url
 from .is_wikipedia_page_url import is_mobile_wikipedia_page_url
@@ -23,14 +22,19 @@ from multiprocessing.pool import ThreadPool
 class WikipediaPage:
 	def __init__(
 			self, wikipedia, id=None, url=None, title=None, namespace=None, redirect=True, disambiguation_url=None,
-			ignore_error=False, n_jobs=1
+			ignore_error=False, n_jobs=1, search_result=None
 	):
+		"""
+		:param dict or NoneType search_result: what _search_page would return for the page, if already known,
+		e.g., from a batched query of Wikipedia.get_pages
+		"""
 		self._wikipedia = wikipedia
 		self._id = id
 		self._url = url
 		self._title = title
 		self._ignore_error = ignore_error
 		self._n_jobs = n_jobs
+		self._search_result = search_result
 		self._setup_pensieve()
 		self.pensieve['namespace'] = namespace
 		self.pensieve['redirect'] = redirect
@@ -44,6 +48,10 @@ class WikipediaPage:
 			if not ignore_error:
 				raise e
 
+		if search_result is not None and 'extract' in search_result['page']:
+			self.pensieve['summary'] = search_result['page']['extract']
+		self._search_result = None
+
 	_STATE_ATTRIBUTES_ = ['_id', '_url', '_title', '_ignore_error']
 
 	@property
@@ -62,6 +70,7 @@ class WikipediaPage:
 		for key, value in state.items():
 			setattr(self, key, value)
 		self._pensieve = state['_pensieve']
+		self._search_result = None
 		self._load_primary()
 		try:
 			self._load_the_rest()
@@ -204,16 +213,29 @@ class WikipediaPage:
 		"""
 		self._wikipedia = wikipedia
 
-	def get_children(self, echo=1):
+	def get_child_urls(self, source=None):
+		"""
+		urls of the wikipedia pages in the lists of links of this page, or of all the articles it links to
+		:param str or NoneType source: 'html' or 'api', the link_source of wikipedia if not provided
+		:rtype: list[str]
+		"""
+		if (source or self.wikipedia.link_source) == 'api':
+			return self['api_links']
+
 		link_lists = self['link_list']
 		if link_lists:
 			urls = remove_list_duplicates([link.url for link in flatten(link_lists)])
 			wikipedia_urls = [url for url in urls if re.match('^https://.+\.wikipedia.org/', url)]
-			non_php_urls = [url for url in wikipedia_urls if '/index.php?' not in url]
+			return [url for url in wikipedia_urls if '/index.php?' not in url]
+		else:
+			return []
 
+	def get_children(self, echo=1):
+		child_urls = self.get_child_urls()
+		if child_urls:
 			pages = ProgressBar.map(
 				function=lambda x: self.__class__(url=x, redirect=self['redirect'], wikipedia=self.wikipedia),
-				iterable=non_php_urls, echo=echo, text=self['url']
+				iterable=child_urls, echo=echo, text=self['url']
 			)
 			return pages
 		else:
@@ -240,9 +262,6 @@ class WikipediaPage:
 		id = list(query['pages'].keys())[0]
 		page = query['pages'][id]
 		title = page['title']
-		full_url = page['fullurl']
-		language = page['pagelanguage']
-		namespace = page['ns']
 
 		# missing is present if the page is missing
 
@@ -276,113 +295,109 @@ class WikipediaPage:
 			else:
 				raise RedirectError(getattr(self, 'title', page['title']))
 
-		# since we only asked for disambiguation in pageprop,
-		# if a pageprop is returned,
-		# then the page must be a disambiguation page
-		elif 'pageprops' in page:
-			return {
-				'id': int(id), 'title': title, 'page': page, 'redirected_from': redirected_from,
-				'full_url': full_url, 'language': language, 'namespace': namespace, 'disambiguation': True
-			}
-
 		else:
-			return {
-				'id': int(id), 'title': title, 'page': page, 'redirected_from': redirected_from,
-				'full_url': full_url, 'language': language, 'namespace': namespace, 'disambiguation': False
-			}
+			return get_search_result(page=page, redirected_from=redirected_from)
 
-	def _get_url_response(self):
-		self.pensieve.store(
-			key='url_response', precursors='url', evaluate=False,
-			function=lambda x: self.request(url=x, format='response')
-		)
+	def _parse(self, id, title):
+		parse_request = self.request(parameters=get_parse_parameters(id=id, title=title), format='json')
+		if 'error' in parse_request:
+			if parse_request['error'].get('code') in ('missingtitle', 'nosuchpageid'):
+				raise PageError(id=id, title=title)
+			raise WikipediaException(parse_request['error'].get('info'))
+		return parse_request['parse']
 
 	def _load_from_url(self):
-		self._get_url_response()
-
+		# the parse of the title in the url has the id, title and body of the page,
+		# so the html of the article is not downloaded to find its id
 		self.pensieve.store(
-			key='original_id', precursors=['url_response'], evaluate=False,
-			function=lambda x: get_wikipedia_id(x.text)
+			key='parse_result', precursors=['url'], evaluate=False,
+			function=lambda x: self._parse(id=None, title=get_url_title(x))
 		)
 
 		self.pensieve.store(
-			key='search_result', precursors=['original_id', 'redirect'], evaluate=False,
-			function=lambda x: self._search_page(
-				title=None, id=x['original_id'], redirect=x['redirect'],
-				redirected_from=None
-			)
+			key='original_id', precursors=['parse_result'], evaluate=False,
+			function=lambda x: x['pageid']
 		)
 
 		self.pensieve.store(
-			key='id', precursors=['url_response'], evaluate=False,
-			function=lambda x: get_wikipedia_id(x.text)
+			key='id', precursors=['parse_result'], evaluate=False,
+			function=lambda x: x['pageid']
 		)
 		self.pensieve.store(
-			key='title', precursors=['url_response'], evaluate=False,
-			function=lambda x: get_page_title(x.text)
+			key='title', precursors=['parse_result'], evaluate=False,
+			function=lambda x: x['title']
 		)
+		# the language is in the host of the url and a parse without a namespace is of the namespace asked for
 		self.pensieve.store(
-			key='language', precursors=['url_response'], evaluate=False,
-			function=lambda x: get_page_language(x.text)
+			key='language', precursors=['url'], evaluate=False,
+			function=lambda x: get_url_language(x)
 		)
+		namespace = self.pensieve['namespace']
 		self.pensieve.store(
-			key='namespace', precursors=['url_response'], evaluate=False,
-			function=lambda x: get_page_namespace(x.text)
+			key='namespace', precursors=['parse_result'], evaluate=False,
+			function=lambda x: x.get('ns', namespace)
 		)
 		self.pensieve.store(
 			key='full_url', precursors=['url'], evaluate=False,
 			function=lambda x: x
 		)
-		self.pensieve['disambiguation'] = False
-		self.pensieve['redirected_from'] = None
+		self.pensieve.store(
+			key='disambiguation', precursors=['parse_result'], evaluate=False,
+			function=lambda x: 'disambiguation' in get_parse_properties(x)
+		)
+		self.pensieve.store(
+			key='redirected_from', precursors=['parse_result'], evaluate=False,
+			function=lambda x: x['redirects'][0]['from'] if x.get('redirects') else None
+		)
 
-	def _load_from_id(self):
+	def _store_parse_result(self):
 		self.pensieve.store(
-			key='search_result', precursors=['original_id', 'redirect'], evaluate=False,
-			function=lambda x: self._search_page(
-				title=None, id=x['original_id'], redirect=x['redirect'],
-				redirected_from=None
-			)
+			key='parse_result', precursors=['search_result'], evaluate=False,
+			function=lambda x: self._parse(id=x['id'], title=None)
 		)
-		self.pensieve.decouple(key='search_result', prefix='')
 
-		try:
+	def _load_from_id(self):
+		if self._search_result is not None:
+			self.pensieve['search_result'] = self._search_result
+		else:
 			self.pensieve.store(
-				key='json', precursors=['id', 'title'], evaluate=False,
-				function=lambda x: self._get_json(id=x['id'], title=x['title'])
+				key='search_result', precursors=['original_id', 'redirect'], evaluate=False,
+				function=lambda x: self._search_page(
+					title=None, id=x['original_id'], redirect=x['redirect'],
+					redirected_from=None
+				)
 			)
-		except Exception as e:
-			display(self.pensieve)
-			raise e
-
+		self.pensieve.decouple(key='search_result', prefix='')
+		self._store_parse_result()
 		self.pensieve.store(key='url', precursors=['page'], function=lambda x: x['fullurl'], evaluate=False)
-		self._get_url_response()
 
 	def _load_from_title(self):
-		self.pensieve.store(
-			key='search_result', precursors=['original_title', 'redirect'], evaluate=False,
-			function=lambda x: self._search_page(
-				title=x['original_title'], id=None, redirect=x['redirect'],
-				redirected_from=None
+		if self._search_result is not None:
+			self.pensieve['search_result'] = self._search_result
+		else:
+			self.pensieve.store(
+				key='search_result', precursors=['original_title', 'redirect'], evaluate=False,
+				function=lambda x: self._search_page(
+					title=x['original_title'], id=None, redirect=x['redirect'],
+					redirected_from=None
+				)
 			)
-		)
-		self.pensieve.decouple(key='search_result')
-		self.pensieve.store(
-			key='json', precursors=['id', 'title'], evaluate=False,
-			function=lambda x: self._get_json(id=x['id'], title=x['title'])
-		)
+		self.pensieve.decouple(key='search_result', prefix='')
+		self._store_parse_result()
 		self.pensieve.store(
 			key='url', precursors=['page'],
 			function=lambda x: x['fullurl'], evaluate=False
 		)
-		self._get_url_response()
 
 	def _load_the_rest(self):
 		self.pensieve['base_url'] = lambda url: url[:url.find('/wiki/')]
 
-		self.pensieve['separated_body'] = lambda url_response: separate_body_from_navigation_and_info_box(
-			url_response=url_response
-		)
+		# the body, info box, tables and categories all come from the one parse of the page
+		self.pensieve['html'] = lambda parse_result: get_parse_html(parse_result=parse_result)
+
+		self.pensieve['json'] = lambda parse_result: get_parse_text(parse_result=parse_result)
+
+		self.pensieve['separated_body'] = lambda html: separate_body_from_navigation_and_info_box(html=html)
 
 		self.pensieve['body'] = lambda separated_body: separated_body['body']
 
@@ -537,6 +552,16 @@ class WikipediaPage:
 
 		self.pensieve['anchor_list'] = lambda link_and_anchor_list: _remove_nonanchors(link_lists=link_and_anchor_list)
 
+		# links and categories without the body of the page, by the title in its url
+		self.pensieve['links_and_categories'] = lambda url: self._get_links_and_categories(url=url)
+
+		self.pensieve['api_links'] = lambda links_and_categories: links_and_categories['links']
+
+		self.pensieve['api_categories'] = lambda links_and_categories: {
+			Link(url=get_page_url(title=f'Category:{name}', language=self.wikipedia.language), text=name)
+			for name in links_and_categories['categories']
+		}
+
 		self.pensieve['summary'] = lambda id, title: get_page_summary(page=self, id=id, title=title)
 
 		self.pensieve['content'] = lambda id, title: self._get_content(id=id, title=title)
@@ -550,11 +575,12 @@ class WikipediaPage:
 	def keys(self):
 		return self.pensieve.keys()
 
-	def _get_json(self, id, title):
-		id = str(id)
-		html_query_parameters = get_html_parameters(id=id, title=title)
-		html_request = self.request(parameters=html_query_parameters, format='json')
-		return html_request['query']['pages'][id]['revisions'][0]['*']
+	def _get_links_and_categories(self, url):
+		title = get_url_title(url)
+		result = self.wikipedia.get_links_and_categories(titles=[title])[title]
+		if result is None:
+			raise PageError(title=title)
+		return result
 
 	def _get_content(self, id, title):
 		id = str(id)
@@ -579,8 +605,10 @@ class WikipediaPage:
 	@property
 	def categories(self):
 		"""
-		:rtype: set[str]
+		:rtype: set[Link]
 		"""
+		if self.wikipedia.link_source == 'api':
+			return self['api_categories']
 		return self['categories']
 
 	def __hashkey__(self):
@@ -1,3 +1,5 @@
 from .Wikipedia import Wikipedia, WikipediaPage, WIKIPEDIA
 from .InfoBox import InfoBox
+from .PageGraphCrawler import PageGraphCrawler
+from .CrawlJournal import CrawlJournal
 from .is_wikipedia_page_url import is_wikipedia_page_url
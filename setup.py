@@ -28,12 +28,13 @@ setup(
 		'Topic :: Software Development :: Libraries :: Python Modules'
 	],
 
-	packages=find_packages(exclude=["jupyter_tests", ".idea", ".git"]),
+	packages=find_packages(exclude=["jupyter_tests", "benchmarks", ".idea", ".git"]),
 	install_requires=[
 		'IMDbPy', 'bs4', 'requests_ntlm',
 		'pandas', 'requests', 'memoria', 'disk',
 		'chronometry', 'slytherin', 'abstract', 'pensieve', 'ravenclaw', 'soupspoon'
 	],
+	extras_require={'zstd': ['zstandard']},
 	python_requires='~=3.6',
 	zip_safe=False
 )
@@ -0,0 +1,96 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import threading
+
+import pytest
+
+from cyberspace.transport import Transport, RateLimiter, CircuitBreaker, Metrics
+from benchmarks.StandInServer import StandInServer
+from benchmarks.SyntheticWiki import SyntheticWiki
+from benchmarks.RoutingTransport import RoutingTransport
+
+
+class ETagServer:
+	"""
+	a local server that answers every path with the same page and its ETag,
+	and with 304 when the request has that ETag, it keeps the headers of the requests
+	"""
+	ETAG = '"v1"'
+	BODY = b'<html><body>hello</body></html>'
+
+	def __init__(self):
+		self.requests = []
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = 'HTTP/1.1'
+
+			def do_GET(self):
+				server.requests.append(dict(self.headers))
+				if self.headers.get('If-None-Match') == server.ETAG:
+					self.send_response(304)
+					self.send_header('ETag', server.ETAG)
+					self.send_header('Content-Length', '0')
+					self.end_headers()
+					return
+				self.send_response(200)
+				self.send_header('ETag', server.ETAG)
+				self.send_header('Content-Type', 'text/html')
+				self.send_header('Content-Length', str(len(server.BODY)))
+				self.end_headers()
+				self.wfile.write(server.BODY)
+
+			def log_message(self, *args):
+				pass
+
+		self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+	@property
+	def base_url(self):
+		return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+	def start(self):
+		self._thread.start()
+
+	def stop(self):
+		self._server.shutdown()
+		self._server.server_close()
+
+
+@pytest.fixture
+def etag_server():
+	server = ETagServer()
+	server.start()
+	yield server
+	server.stop()
+
+
+@pytest.fixture
+def transport():
+	"""
+	a transport of its own, so that tests do not share rate limits, circuits or metrics
+	"""
+	transport = Transport(rate_limiter=RateLimiter(), circuit_breaker=CircuitBreaker(), metrics=Metrics())
+	yield transport
+	transport.close()
+
+
+@pytest.fixture
+def wiki_server():
+	"""
+	a stand-in server of a synthetic wiki of 100 articles
+	"""
+	with StandInServer(wiki=SyntheticWiki(num_pages=100)) as server:
+		yield server
+
+
+@pytest.fixture
+def wiki_transport(wiki_server):
+	"""
+	a transport of its own that sends every request to the stand-in wiki server
+	"""
+	transport = RoutingTransport(
+		base_url=wiki_server.base_url, rate_limiter=RateLimiter(), circuit_breaker=CircuitBreaker(), metrics=Metrics()
+	)
+	yield transport
+	transport.close()
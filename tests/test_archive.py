@@ -0,0 +1,33 @@
+from cyberspace.transport import ArchiveTransport, RateLimiter, CircuitBreaker, Metrics
+
+
+def _make_transport(path, mode):
+	return ArchiveTransport(
+		path=path, mode=mode, rate_limiter=RateLimiter(), circuit_breaker=CircuitBreaker(), metrics=Metrics()
+	)
+
+
+def test_revalidation_is_not_archived_over_the_whole_response(etag_server, tmp_path):
+	path = str(tmp_path / 'archive.pickle')
+	url = f'{etag_server.base_url}/page'
+	recorder = _make_transport(path=path, mode='record')
+	assert recorder.get(url).status_code == 200
+	assert recorder.get(url, headers={'If-None-Match': etag_server.ETAG}).status_code == 304
+	recorder.close()
+
+	replayer = _make_transport(path=path, mode='replay')
+	response = replayer.get(url)
+	assert response.status_code == 200
+	assert response.content == etag_server.BODY
+
+
+def test_replayed_bytes_are_counted(etag_server, tmp_path):
+	path = str(tmp_path / 'archive.pickle')
+	url = f'{etag_server.base_url}/page'
+	recorder = _make_transport(path=path, mode='record')
+	recorder.get(url)
+	recorder.close()
+
+	replayer = _make_transport(path=path, mode='replay')
+	replayer.get(url)
+	assert replayer.metrics.get_host_statistics()['127.0.0.1']['bytes'] == len(etag_server.BODY)
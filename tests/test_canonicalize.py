@@ -0,0 +1,20 @@
+from cyberspace.transport import get_canonical_url
+
+
+def test_equivalent_wikipedia_urls_share_a_form():
+	urls = [
+		'http://en.m.wikipedia.org/wiki/Caf%c3%a9#History', 'https://EN.wikipedia.org:443/wiki/Café',
+		'https://en.wikipedia.org/wiki/Caf%C3%A9'
+	]
+	assert {get_canonical_url(url) for url in urls} == {'https://en.wikipedia.org/wiki/Caf%C3%A9'}
+
+
+def test_urls_of_different_resources_are_kept_apart():
+	assert get_canonical_url('https://example.com/a%2Fb') != get_canonical_url('https://example.com/a/b')
+	assert get_canonical_url('https://example.com/?b=2&b=1') != get_canonical_url('https://example.com/?b=1&b=2')
+	assert get_canonical_url('http://example.com/') != get_canonical_url('https://example.com/')
+	assert get_canonical_url('https://en.m.example.org/') == 'https://en.m.example.org/'
+
+
+def test_query_parameters_are_sorted_by_key_only():
+	assert get_canonical_url('https://example.com/?b=2&a=1&b=1') == 'https://example.com/?a=1&b=2&b=1'
@@ -0,0 +1,18 @@
+from cyberspace.transport import RateLimiter
+
+
+def test_a_host_is_limited_to_the_lowest_rate_asked_for():
+	rate_limiter = RateLimiter()
+	url = 'https://en.wikipedia.org/w/api.php'
+	assert rate_limiter.reserve(url=url, rate=100) == 0
+	assert rate_limiter.reserve(url=url, rate=1) > 0.5
+	# a faster client does not speed the host up again
+	rate_limiter.reserve(url=url, rate=100)
+	assert rate_limiter.rates == {'en.wikipedia.org': {'rate': 1.0, 'burst': 1}}
+
+
+def test_a_fixed_rate_is_kept():
+	rate_limiter = RateLimiter()
+	rate_limiter.set_rate(host='en.wikipedia.org', rate=50, burst=10)
+	rate_limiter.reserve(url='https://en.wikipedia.org/w/api.php', rate=1)
+	assert rate_limiter.rates == {'en.wikipedia.org': {'rate': 50.0, 'burst': 10}}
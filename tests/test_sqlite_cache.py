@@ -0,0 +1,67 @@
+import sqlite3
+import weakref
+import pickle
+import gc
+
+from cyberspace.caching import SQLiteCache
+from cyberspace.caching.SQLiteCache import _CACHES
+from cyberspace.transport import ResponseRecord
+
+
+def _count(path, table):
+	connection = sqlite3.connect(path)
+	try:
+		return connection.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+	finally:
+		connection.close()
+
+
+def test_bodies_are_committed_with_their_entries(tmp_path):
+	path = str(tmp_path / 'cache.sqlite')
+	cache = SQLiteCache(path=path, batch_size=64)
+	store = cache.get_store(sub_directory='request')
+	records = {f'key {index}': ResponseRecord(status_code=200, content=bytes([index]) * 2048) for index in range(10)}
+	for key, record in records.items():
+		store[key] = record
+
+	# nothing is written before the batch is full or flushed, bodies included
+	assert _count(path, 'entries') == 0
+	assert _count(path, 'bodies') == 0
+	assert store['key 3'].content == records['key 3'].content
+
+	cache.flush()
+	assert _count(path, 'entries') == 10
+	assert _count(path, 'bodies') == 10
+	assert _count(path, 'body_references') == 10
+	assert all(store[key].content == record.content for key, record in records.items())
+
+
+def test_deleting_a_pending_entry_drops_its_body(tmp_path):
+	path = str(tmp_path / 'cache.sqlite')
+	cache = SQLiteCache(path=path)
+	store = cache.get_store()
+	store['key'] = ResponseRecord(status_code=200, content=b'x' * 2048)
+	del store['key']
+	cache.flush()
+	assert _count(path, 'bodies') == 0
+
+
+def test_unpickled_caches_are_not_kept_alive(tmp_path):
+	path = str(tmp_path / 'cache.sqlite')
+	cache = SQLiteCache(path=path)
+	copies = [pickle.loads(pickle.dumps(cache)) for _ in range(10)]
+	assert all(copy in _CACHES for copy in copies)
+	references = [weakref.ref(copy) for copy in copies]
+	del copies
+	gc.collect()
+	assert all(reference() is None for reference in references)
+
+
+def test_a_collected_cache_commits_its_writes(tmp_path):
+	path = str(tmp_path / 'cache.sqlite')
+	cache = SQLiteCache(path=path)
+	cache.get_store()['key'] = ResponseRecord(status_code=200, content=b'x' * 2048)
+	del cache
+	gc.collect()
+	assert _count(path, 'entries') == 1
+	assert _count(path, 'bodies') == 1
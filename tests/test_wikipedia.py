@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+from cyberspace.wikipedia import Wikipedia
+
+
+def test_expired_request_with_headers_is_revalidated(etag_server, transport, tmp_path):
+	wikipedia = Wikipedia(
+		cache=str(tmp_path / 'cache.sqlite'), expire_in='1 second', transport=transport, rate_limit_wait_seconds=None
+	)
+	url = f'{etag_server.base_url}/wiki/Page'
+	first = wikipedia.request(url=url, format='html', headers={'X-Token': 'abc'})
+	time.sleep(1.5)
+	second = wikipedia.request(url=url, format='html', headers={'X-Token': 'abc'})
+
+	assert second.content == first.content
+	assert [(headers.get('X-Token'), headers.get('If-None-Match')) for headers in etag_server.requests] == [
+		('abc', None), ('abc', etag_server.ETAG)
+	]
+
+
+
+def test_page_from_url_is_loaded_with_one_parse(wiki_server, wiki_transport):
+	wikipedia = Wikipedia(cache=False, transport=wiki_transport, rate_limit_wait_seconds=None)
+	page = wikipedia.get_page(url=wiki_server.wiki.get_url(7))
+
+	assert (page['id'], page['title'], page['language'], page['namespace']) == (8, 'Page 7', 'en', 0)
+	assert page['body'] is not None
+	assert wiki_server.statistics['requests'] == 1
+
+
+def test_pages_of_both_ids_and_titles_are_loaded(wiki_server, wiki_transport):
+	wikipedia = Wikipedia(cache=False, transport=wiki_transport, rate_limit_wait_seconds=None)
+	wiki = wiki_server.wiki
+	pages = wikipedia.get_pages(ids=[wiki.get_id(1), wiki.get_id(2)], titles=[wiki.get_title(3)])
+	assert [page['search_result']['title'] for page in pages] == [wiki.get_title(1), wiki.get_title(2), wiki.get_title(3)]
+
+	results = wikipedia.get_links_and_categories(ids=[wiki.get_id(1)], titles=[wiki.get_title(3)])
+	assert {key: result['title'] for key, result in results.items()} == {
+		wiki.get_id(1): wiki.get_title(1), wiki.get_title(3): wiki.get_title(3)
+	}
+
+
+def test_a_batch_of_both_ids_and_titles_is_refused(wiki_transport):
+	wikipedia = Wikipedia(cache=False, transport=wiki_transport, rate_limit_wait_seconds=None)
+	with pytest.raises(ValueError):
+		wikipedia._get_page_batch(ids=[1], titles=['Page 2'])
+	with pytest.raises(ValueError):
+		wikipedia._get_links_and_categories_batch(ids=[1], titles=['Page 2'])